@@ -0,0 +1,38 @@
+"""Keyset pagination indexes for the admin user and admin lists
+
+Revision ID: 002_keyset_indexes
+Revises: 001_initial
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '002_keyset_indexes'
+down_revision: Union[str, None] = '001_initial'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LAST_LOGIN_KEY = sa.text("coalesce(last_login, '1970-01-01 00:00:00+00'::timestamptz)")
+
+
+def upgrade() -> None:
+    # CONCURRENTLY cannot run inside the migration transaction.
+    with op.get_context().autocommit_block():
+        op.create_index('idx_user_active_created', 'users', ['is_active', 'created_at', 'id'], postgresql_concurrently=True)
+        op.create_index('idx_user_active_phone', 'users', ['is_active', 'phone_number', 'id'], postgresql_concurrently=True)
+        op.create_index('idx_user_active_last_login', 'users', ['is_active', LAST_LOGIN_KEY, 'id'], postgresql_concurrently=True)
+        op.create_index('idx_admin_active_created', 'admins', ['is_active', 'created_at', 'id'], postgresql_concurrently=True)
+        op.create_index('idx_admin_active_username', 'admins', ['is_active', 'username', 'id'], postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('idx_admin_active_username', table_name='admins', postgresql_concurrently=True)
+        op.drop_index('idx_admin_active_created', table_name='admins', postgresql_concurrently=True)
+        op.drop_index('idx_user_active_last_login', table_name='users', postgresql_concurrently=True)
+        op.drop_index('idx_user_active_phone', table_name='users', postgresql_concurrently=True)
+        op.drop_index('idx_user_active_created', table_name='users', postgresql_concurrently=True)
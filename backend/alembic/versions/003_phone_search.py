@@ -0,0 +1,42 @@
+"""Normalized phone digits and search indexes for the admin user lookup
+
+Revision ID: 003_phone_search
+Revises: 002_keyset_indexes
+Create Date: 2026-10-17
+
+Adding the stored generated columns rewrites ``users`` under an exclusive
+lock; run it in a quiet window. The indexes are built concurrently.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '003_phone_search'
+down_revision: Union[str, None] = '002_keyset_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PHONE_DIGITS_SQL = "regexp_replace(phone_number, '[^0-9]', '', 'g')"
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.add_column('users', sa.Column('phone_digits', sa.String(20), sa.Computed(PHONE_DIGITS_SQL, persisted=True), nullable=False))
+    op.add_column('users', sa.Column('phone_digits_rev', sa.String(20), sa.Computed(f"reverse({PHONE_DIGITS_SQL})", persisted=True), nullable=False))
+
+    # CONCURRENTLY cannot run inside the migration transaction.
+    with op.get_context().autocommit_block():
+        op.create_index('idx_user_digits_prefix', 'users', ['phone_digits'], postgresql_ops={'phone_digits': 'text_pattern_ops'}, postgresql_concurrently=True)
+        op.create_index('idx_user_digits_suffix', 'users', ['phone_digits_rev'], postgresql_ops={'phone_digits_rev': 'text_pattern_ops'}, postgresql_concurrently=True)
+        op.create_index('idx_user_digits_trgm', 'users', ['phone_digits'], postgresql_using='gin', postgresql_ops={'phone_digits': 'gin_trgm_ops'}, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('idx_user_digits_trgm', table_name='users', postgresql_concurrently=True)
+        op.drop_index('idx_user_digits_suffix', table_name='users', postgresql_concurrently=True)
+        op.drop_index('idx_user_digits_prefix', table_name='users', postgresql_concurrently=True)
+    op.drop_column('users', 'phone_digits_rev')
+    op.drop_column('users', 'phone_digits')
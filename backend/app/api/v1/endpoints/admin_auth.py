@@ -7,10 +7,9 @@ from app.core.config import settings
 from app.core.database import get_db
 from app.core.redis import RedisClient, get_redis
 from app.dependencies.auth import get_client_ip, get_current_admin, get_user_agent
-from app.models.admin import Admin
-from app.models.admin_session import AdminSession
 from app.schemas.auth import AdminLoginRequest, AdminLoginResponse, AdminLogoutResponse, AdminResponse
 from app.services.admin_auth_service import AdminAuthService
+from app.services.admin_session_cache import CachedAdmin, CachedSession
 
 router = APIRouter(prefix="/admin/auth", tags=["Admin Authentication"])
 
@@ -58,7 +57,7 @@ async def admin_login(
 @router.post("/logout", response_model=AdminLogoutResponse)
 async def admin_logout(
     response: Response,
-    admin_data: tuple[Admin, AdminSession] = Depends(get_current_admin),
+    admin_data: tuple[CachedAdmin, CachedSession] = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db),
     redis: RedisClient = Depends(get_redis),
 ):
@@ -71,7 +70,7 @@ async def admin_logout(
 
 @router.get("/me", response_model=AdminResponse)
 async def current_admin_info(
-    admin_data: tuple[Admin, AdminSession] = Depends(get_current_admin),
+    admin_data: tuple[CachedAdmin, CachedSession] = Depends(get_current_admin),
 ):
     admin, _ = admin_data
     return AdminResponse(
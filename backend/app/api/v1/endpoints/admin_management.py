@@ -1,14 +1,15 @@
 """Admin management endpoints — CRUD admins & permissions."""
 
+from typing import Optional
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
+from app.core.pagination import TotalMode
 from app.dependencies.auth import require_permission, verify_csrf_token
 from app.models.admin import Admin
-from app.models.admin_session import AdminSession
 from app.schemas.admin import (
     AdminCreateRequest,
     AdminDeleteResponse,
@@ -19,7 +20,8 @@ from app.schemas.admin import (
     AdminUpdateRequest,
 )
 from app.schemas.auth import PermissionResponse
-from app.services.admin_service import AdminService
+from app.services.admin_service import REVOKE_FAILED, AdminService
+from app.services.admin_session_cache import CachedAdmin, CachedSession
 
 router = APIRouter(prefix="/admin/admins", tags=["Admin Management"])
 
@@ -41,22 +43,33 @@ def _admin_detail(a: Admin) -> AdminDetailResponse:
 
 @router.get("/", response_model=AdminListResponse)
 async def list_admins(
-    page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
-    db: AsyncSession = Depends(get_db),
-    _: Admin = Depends(require_permission("can_view_admins")),
+    cursor: Optional[str] = Query(None, description="Oldingi javobdagi next_cursor"),
+    is_active: Optional[bool] = Query(None),
+    sort_by: str = Query("created_at", pattern="^(created_at|username)$"),
+    sort_order: str = Query("desc", pattern="^(asc|desc)$"),
+    total: TotalMode = Query("estimate"),
+    db: AsyncSession = Depends(get_read_db),
+    _: CachedAdmin = Depends(require_permission("can_view_admins")),
 ):
-    svc = AdminService(db)
-    admins, total = await svc.get_all(page, limit)
-    return AdminListResponse(admins=[_admin_detail(a) for a in admins], total=total, page=page, limit=limit)
+    ok, err, page = await AdminService(db).get_all(limit, cursor, is_active, sort_by, sort_order, total)
+    if not ok:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, err)
+    return AdminListResponse(
+        admins=[_admin_detail(a) for a in page.items],
+        total=page.total,
+        total_exact=page.total_exact,
+        limit=limit,
+        next_cursor=page.next_cursor,
+    )
 
 
 #  Permissions list 
 
 @router.get("/permissions", response_model=list[PermissionResponse])
 async def list_permissions(
-    db: AsyncSession = Depends(get_db),
-    _: Admin = Depends(require_permission("can_view_admins")),
+    db: AsyncSession = Depends(get_read_db),
+    _: CachedAdmin = Depends(require_permission("can_view_admins")),
 ):
     perms = await AdminService(db).all_permissions()
     return [PermissionResponse(id=p.id, name=p.name, description=p.description, resource=p.resource, action=p.action) for p in perms]
@@ -67,8 +80,8 @@ async def list_permissions(
 @router.get("/{admin_id}", response_model=AdminSingleResponse)
 async def get_admin(
     admin_id: UUID,
-    db: AsyncSession = Depends(get_db),
-    _: Admin = Depends(require_permission("can_view_admins")),
+    db: AsyncSession = Depends(get_read_db),
+    _: CachedAdmin = Depends(require_permission("can_view_admins")),
 ):
     admin = await AdminService(db).get_by_id(admin_id)
     if not admin:
@@ -82,7 +95,7 @@ async def get_admin(
 async def create_admin(
     data: AdminCreateRequest,
     db: AsyncSession = Depends(get_db),
-    _: Admin = Depends(require_permission("can_create_admin")),
+    _: CachedAdmin = Depends(require_permission("can_create_admin")),
 ):
     ok, err, admin = await AdminService(db).create(
         username=data.username,
@@ -103,8 +116,8 @@ async def update_admin(
     admin_id: UUID,
     data: AdminUpdateRequest,
     db: AsyncSession = Depends(get_db),
-    admin_data: tuple[Admin, AdminSession] = Depends(verify_csrf_token),
-    __: Admin = Depends(require_permission("can_edit_admin")),
+    admin_data: tuple[CachedAdmin, CachedSession] = Depends(verify_csrf_token),
+    __: CachedAdmin = Depends(require_permission("can_edit_admin")),
 ):
     me, _ = admin_data
     if admin_id == me.id and data.is_active is False:
@@ -114,7 +127,7 @@ async def update_admin(
         admin_id, data.username, data.email, data.password, data.is_active, data.is_super_admin
     )
     if not ok:
-        raise HTTPException(404 if "topilmadi" in err else 400, err)
+        raise HTTPException(404 if "topilmadi" in err else 503 if err == REVOKE_FAILED else 400, err)
     return AdminSingleResponse(admin=_admin_detail(admin))
 
 
@@ -125,7 +138,7 @@ async def update_permissions(
     admin_id: UUID,
     data: AdminPermissionsUpdateRequest,
     db: AsyncSession = Depends(get_db),
-    _: Admin = Depends(require_permission("can_manage_permissions")),
+    _: CachedAdmin = Depends(require_permission("can_manage_permissions")),
 ):
     svc = AdminService(db)
     target = await svc.get_by_id(admin_id)
@@ -136,7 +149,7 @@ async def update_permissions(
 
     ok, err, admin = await svc.update_permissions(admin_id, data.permission_ids)
     if not ok:
-        raise HTTPException(status.HTTP_400_BAD_REQUEST, err)
+        raise HTTPException(503 if err == REVOKE_FAILED else 400, err)
     return AdminSingleResponse(admin=_admin_detail(admin))
 
 
@@ -146,12 +159,12 @@ async def update_permissions(
 async def delete_admin(
     admin_id: UUID,
     db: AsyncSession = Depends(get_db),
-    admin_data: tuple[Admin, AdminSession] = Depends(verify_csrf_token),
-    __: Admin = Depends(require_permission("can_delete_admin")),
+    admin_data: tuple[CachedAdmin, CachedSession] = Depends(verify_csrf_token),
+    __: CachedAdmin = Depends(require_permission("can_delete_admin")),
 ):
     me, _ = admin_data
     ok, err = await AdminService(db).delete(admin_id, me.id)
     if not ok:
-        code = 404 if "topilmadi" in err else 403 if ("Super" in err or "O'zingiz" in err) else 400
+        code = 404 if "topilmadi" in err else 403 if ("Super" in err or "O'zingiz" in err) else 503 if err == REVOKE_FAILED else 400
         raise HTTPException(code, err)
     return AdminDeleteResponse(message="Admin muvaffaqiyatli o'chirildi")
@@ -0,0 +1,48 @@
+"""Monitoring endpoints — abuse signals and DB pool usage for super admins."""
+
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+
+from app.core.pool_monitor import pool_monitor
+from app.dependencies.auth import require_super_admin
+from app.schemas.monitoring import DBPoolResponse, HeavyHitter, HeavyHittersResponse, HeavyHitterStream
+from app.services.admin_session_cache import CachedAdmin
+from app.services.heavy_hitters import STREAMS, heavy_hitters
+
+router = APIRouter(prefix="/admin/monitoring", tags=["Monitoring"])
+
+
+@router.get("/heavy-hitters", response_model=HeavyHittersResponse)
+async def get_heavy_hitters(
+    stream: Optional[str] = Query(None, description=", ".join(STREAMS)),
+    limit: int = Query(20, ge=1, le=100),
+    _: CachedAdmin = Depends(require_super_admin()),
+):
+    if stream is not None and stream not in STREAMS:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "Bunday stream topilmadi")
+    snap = await heavy_hitters.shared_snapshot(limit, stream)
+    return HeavyHittersResponse(
+        scope=snap["scope"],
+        worker=snap["worker"],
+        window_seconds=snap["window_seconds"],
+        window_start=snap["window_start"],
+        streams=[
+            HeavyHitterStream(
+                stream=s["stream"],
+                total=s["total"],
+                current=[HeavyHitter(key=k, count=c) for k, c in s["current"]],
+                previous_total=s["previous_total"],
+                previous=[HeavyHitter(key=k, count=c) for k, c in s["previous"]],
+            )
+            for s in snap["streams"]
+        ],
+    )
+
+
+@router.get("/db-pool", response_model=DBPoolResponse)
+async def get_db_pool(
+    limit: int = Query(20, ge=1, le=200, description="Routes, by total connection hold time"),
+    _: CachedAdmin = Depends(require_super_admin()),
+):
+    return DBPoolResponse(**pool_monitor.snapshot(limit))
@@ -44,11 +44,12 @@ async def verify_otp(
     db: AsyncSession = Depends(get_db),
     redis: RedisClient = Depends(get_redis),
     tg: TelegramService = Depends(get_telegram_service),
+    ip: str = Depends(get_client_ip),
 ):
     svc = UserAuthService(db, redis, tg)
-    ok, err, user, access, refresh = await svc.verify_otp(body.phone_number, body.code)
+    ok, err, user, access, refresh = await svc.verify_otp(body.phone_number, body.code, ip)
     if not ok:
-        code = 403 if "bloklangan" in err.lower() else 400
+        code = 429 if "juda ko'p" in err.lower() else 403 if "bloklangan" in err.lower() else 400
         raise HTTPException(code, detail=err)
     return VerifyOTPResponse(
         success=True,
@@ -6,10 +6,9 @@ from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
+from app.core.pagination import TotalMode
 from app.dependencies.auth import require_permission, verify_csrf_token
-from app.models.admin import Admin
-from app.models.admin_session import AdminSession
 from app.schemas.user import (
     UserDeactivateResponse,
     UserDeleteResponse,
@@ -18,6 +17,7 @@ from app.schemas.user import (
     UserSingleResponse,
     UserUpdateRequest,
 )
+from app.services.admin_session_cache import CachedAdmin, CachedSession
 from app.services.user_service import UserService
 
 router = APIRouter(prefix="/admin/users", tags=["User Management"])
@@ -37,24 +37,33 @@ def _user_detail(u) -> UserDetailResponse:
 
 @router.get("/", response_model=UserListResponse)
 async def list_users(
-    page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
-    search: Optional[str] = Query(None),
+    cursor: Optional[str] = Query(None, description="Oldingi javobdagi next_cursor"),
+    search: Optional[str] = Query(None, max_length=32, description="+998…, 4567*, *4567 yoki 4567"),
     is_active: Optional[bool] = Query(None),
-    sort_by: str = Query("created_at"),
+    sort_by: str = Query("created_at", pattern="^(created_at|phone_number|last_login)$"),
     sort_order: str = Query("desc", pattern="^(asc|desc)$"),
-    db: AsyncSession = Depends(get_db),
-    _: Admin = Depends(require_permission("can_view_users")),
+    total: TotalMode = Query("estimate"),
+    db: AsyncSession = Depends(get_read_db),
+    _: CachedAdmin = Depends(require_permission("can_view_users")),
 ):
-    users, total = await UserService(db).get_all(page, limit, search, is_active, sort_by, sort_order)
-    return UserListResponse(users=[_user_detail(u) for u in users], total=total, page=page, limit=limit)
+    ok, err, page = await UserService(db).get_all(limit, cursor, search, is_active, sort_by, sort_order, total)
+    if not ok:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, err)
+    return UserListResponse(
+        users=[_user_detail(u) for u in page.items],
+        total=page.total,
+        total_exact=page.total_exact,
+        limit=limit,
+        next_cursor=page.next_cursor,
+    )
 
 
 @router.get("/{user_id}", response_model=UserSingleResponse)
 async def get_user(
     user_id: UUID,
-    db: AsyncSession = Depends(get_db),
-    _: Admin = Depends(require_permission("can_view_users")),
+    db: AsyncSession = Depends(get_read_db),
+    _: CachedAdmin = Depends(require_permission("can_view_users")),
 ):
     user = await UserService(db).get_by_id(user_id)
     if not user:
@@ -67,8 +76,8 @@ async def update_user(
     user_id: UUID,
     data: UserUpdateRequest,
     db: AsyncSession = Depends(get_db),
-    admin_data: tuple[Admin, AdminSession] = Depends(verify_csrf_token),
-    __: Admin = Depends(require_permission("can_edit_user")),
+    admin_data: tuple[CachedAdmin, CachedSession] = Depends(verify_csrf_token),
+    __: CachedAdmin = Depends(require_permission("can_edit_user")),
 ):
     ok, err, user = await UserService(db).update(user_id, data.phone_number, data.telegram_id, data.is_active)
     if not ok:
@@ -80,8 +89,8 @@ async def update_user(
 async def deactivate_user(
     user_id: UUID,
     db: AsyncSession = Depends(get_db),
-    admin_data: tuple[Admin, AdminSession] = Depends(verify_csrf_token),
-    __: Admin = Depends(require_permission("can_deactivate_user")),
+    admin_data: tuple[CachedAdmin, CachedSession] = Depends(verify_csrf_token),
+    __: CachedAdmin = Depends(require_permission("can_deactivate_user")),
 ):
     ok, err, user = await UserService(db).deactivate(user_id)
     if not ok:
@@ -93,8 +102,8 @@ async def deactivate_user(
 async def activate_user(
     user_id: UUID,
     db: AsyncSession = Depends(get_db),
-    admin_data: tuple[Admin, AdminSession] = Depends(verify_csrf_token),
-    __: Admin = Depends(require_permission("can_deactivate_user")),
+    admin_data: tuple[CachedAdmin, CachedSession] = Depends(verify_csrf_token),
+    __: CachedAdmin = Depends(require_permission("can_deactivate_user")),
 ):
     ok, err, user = await UserService(db).activate(user_id)
     if not ok:
@@ -102,12 +111,25 @@ async def activate_user(
     return UserDeactivateResponse(message="Foydalanuvchi aktivlashtirildi", user=_user_detail(user))
 
 
+@router.post("/{user_id}/logout", response_model=UserDeleteResponse)
+async def force_logout_user(
+    user_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    admin_data: tuple[CachedAdmin, CachedSession] = Depends(verify_csrf_token),
+    __: CachedAdmin = Depends(require_permission("can_deactivate_user")),
+):
+    ok, err = await UserService(db).force_logout(user_id)
+    if not ok:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, err)
+    return UserDeleteResponse(message="Foydalanuvchining barcha sessiyalari yakunlandi")
+
+
 @router.delete("/{user_id}", response_model=UserDeleteResponse)
 async def delete_user(
     user_id: UUID,
     db: AsyncSession = Depends(get_db),
-    admin_data: tuple[Admin, AdminSession] = Depends(verify_csrf_token),
-    __: Admin = Depends(require_permission("can_delete_user")),
+    admin_data: tuple[CachedAdmin, CachedSession] = Depends(verify_csrf_token),
+    __: CachedAdmin = Depends(require_permission("can_delete_user")),
 ):
     ok, err = await UserService(db).delete(user_id)
     if not ok:
@@ -0,0 +1,20 @@
+"""Well-known endpoints — JWKS for local access-token verification."""
+
+from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import Response
+
+from app.core.config import settings
+from app.core.security import access_keyring
+
+router = APIRouter(prefix="/.well-known", tags=["Well-known"])
+
+
+@router.get("/jwks.json")
+async def jwks() -> Response:
+    if not access_keyring:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "JWKS faqat asimmetrik imzo rejimida mavjud")
+    return Response(
+        content=access_keyring.jwks_bytes(),
+        media_type="application/json",
+        headers={"Cache-Control": f"public, max-age={settings.JWKS_CACHE_SECONDS}"},
+    )
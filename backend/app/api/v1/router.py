@@ -4,6 +4,7 @@ from fastapi import APIRouter
 
 from app.api.v1.endpoints.admin_auth import router as admin_auth
 from app.api.v1.endpoints.admin_management import router as admin_mgmt
+from app.api.v1.endpoints.monitoring import router as monitoring
 from app.api.v1.endpoints.user_auth import router as user_auth
 from app.api.v1.endpoints.user_management import router as user_mgmt
 
@@ -12,3 +13,4 @@ api_router.include_router(user_auth)
 api_router.include_router(admin_auth)
 api_router.include_router(admin_mgmt)
 api_router.include_router(user_mgmt)
+api_router.include_router(monitoring)
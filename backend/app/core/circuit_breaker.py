@@ -0,0 +1,62 @@
+"""Circuit breaker — stop calling a failing dependency, probe it, and close again when it recovers."""
+
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker; calls slower than ``slow_ms`` count as failures.
+
+    After ``failures`` bad calls in a row the circuit opens for
+    ``reset_seconds``; then a single probe is let through (half-open) and its
+    outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, name: str, failures: int, slow_ms: float, reset_seconds: float) -> None:
+        self.name = name
+        self.threshold = max(failures, 1)
+        self.slow = slow_ms / 1000
+        self.reset_seconds = reset_seconds
+        self.state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+
+    def allow(self) -> bool:
+        """Should this call go to the dependency? Claims the probe when one is due."""
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and time.monotonic() - self._opened_at >= self.reset_seconds:
+            self.state = HALF_OPEN
+            return True
+        return False
+
+    def record(self, elapsed: float) -> None:
+        if elapsed > self.slow:
+            self.failure(f"slow call ({elapsed * 1000:.0f} ms)")
+            return
+        self._failures = 0
+        if self.state != CLOSED:
+            logger.info("%s recovered — circuit closed", self.name)
+            self.state = CLOSED
+
+    def failure(self, reason: object = "") -> None:
+        self._failures += 1
+        if self.state == HALF_OPEN or (self.state == CLOSED and self._failures >= self.threshold):
+            logger.warning("%s unavailable (%s) — circuit open for %ss", self.name, reason, self.reset_seconds)
+            self.state = OPEN
+            self._opened_at = time.monotonic()
+
+    def abandon(self) -> None:
+        """The probe ended without an answer (cancelled); let the next call probe again."""
+        if self.state == HALF_OPEN:
+            self.state = OPEN
+
+    def trip(self, reason: object = "") -> None:
+        """Open immediately (e.g. the first connection attempt failed)."""
+        self._failures = self.threshold
+        self.state = HALF_OPEN
+        self.failure(reason)
@@ -24,11 +24,45 @@ class Settings(BaseSettings):
     DATABASE_USER: str = "postgres"
     DATABASE_PASSWORD: str = ""
     DATABASE_NAME: str = "secure_backend"
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_SLOW_CHECKOUT_MS: int = 100
+    # asyncpg prepared statements kept per connection (0 disables reuse)
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 500
+    # List endpoints: total=estimate counts exactly up to this many rows
+    PAGINATION_COUNT_CAP: int = 10000
+    # Read replicas for admin browsing: "host:port[:weight],…" (same user/password/database)
+    DB_REPLICAS: str = ""
+    DB_REPLICA_MAX_LAG_SECONDS: float = 5
+    DB_REPLICA_CHECK_SECONDS: int = 5
+    DB_REPLICA_POOL_SIZE: int = 5
+    DB_REPLICA_MAX_OVERFLOW: int = 10
 
     # Redis
     REDIS_HOST: str = "localhost"
     REDIS_PORT: int = 6379
     REDIS_PASSWORD: str = ""
+    # standalone: REDIS_HOST/PORT; sentinel/cluster: REDIS_NODES = "host:port,host:port"
+    REDIS_MODE: Literal["standalone", "sentinel", "cluster"] = "standalone"
+    REDIS_NODES: str = ""
+    REDIS_SENTINEL_MASTER: str = "mymaster"
+    REDIS_SENTINEL_PASSWORD: str = ""
+    REDIS_AUTO_PIPELINE: bool = False
+    REDIS_PIPELINE_MAX_BATCH: int = 256
+    # Outages: serve from a per-worker store while the breaker is open
+    REDIS_FALLBACK: bool = True
+    REDIS_FALLBACK_SIZE: int = 100000
+    # Revocation/invalidation writes kept for replay while Redis is unreachable
+    REDIS_REPLAY_MAX: int = 10000
+    REDIS_SOCKET_TIMEOUT_MS: int = 500
+    REDIS_BREAKER_FAILURES: int = 5
+    REDIS_BREAKER_SLOW_MS: int = 250
+    REDIS_BREAKER_RESET_SECONDS: int = 10
+    # Near-cache of GET results for hot keys, invalidated by Redis CLIENT TRACKING
+    REDIS_NEAR_CACHE: bool = False
+    REDIS_NEAR_CACHE_SIZE: int = 10000
+    REDIS_NEAR_CACHE_PREFIXES: str = "admin:session:"
 
     # JWT 
     JWT_ACCESS_SECRET: str = Field(default="change-this-secret-key-in-production-min-32-chars", min_length=32)
@@ -36,10 +70,26 @@ class Settings(BaseSettings):
     JWT_ACCESS_EXPIRATION_MINUTES: int = 15
     JWT_REFRESH_EXPIRATION_DAYS: int = 7
     JWT_ALGORITHM: str = "HS256"
+    JWT_VERIFY_CACHE_SIZE: int = 10000
+    # Access tokens only; HS256 keeps the shared secret. First "kid:path.pem" entry signs.
+    JWT_ACCESS_ALGORITHM: Literal["HS256", "EdDSA", "ES256"] = "HS256"
+    JWT_SIGNING_KEYS: str = ""
+    JWKS_CACHE_SECONDS: int = 300
 
     # Admin Session 
     ADMIN_SESSION_SECRET: str = Field(default="admin-session-secret-key-min-32-characters-long", min_length=32)
     ADMIN_SESSION_EXPIRATION_HOURS: int = 24
+    ADMIN_SESSION_CACHE_TTL: int = 300
+    # "opaque": random token looked up per request; "signed": HMAC cookie, admin_sessions is audit-only
+    ADMIN_SESSION_MODE: Literal["opaque", "signed"] = "opaque"
+
+    # User auth cache (local TTL LRU → Redis → Postgres)
+    USER_CACHE_LOCAL_SIZE: int = 10000
+    USER_CACHE_LOCAL_TTL: int = 30
+    USER_CACHE_REDIS_TTL: int = 300
+
+    # RBAC permission catalog
+    RBAC_CATALOG_CHECK_SECONDS: int = 30
 
     # Telegram 
     TELEGRAM_BOT_TOKEN: str = "your-telegram-bot-token"
@@ -55,6 +105,54 @@ class Settings(BaseSettings):
     OTP_LIMIT_DAY_PER_IP: int = 10
     LOGIN_LIMIT_ATTEMPTS: int = 5
     LOGIN_BLOCK_DURATION_SECONDS: int = 900
+    OTP_VERIFY_LIMIT_PER_PHONE: int = 10
+    OTP_VERIFY_LIMIT_PER_IP: int = 30
+    OTP_VERIFY_WINDOW_SECONDS: int = 600
+
+    # Local-first limiting: tokens a worker may spend per key between Redis syncs
+    RATE_LIMIT_LOCAL_BURST: int = 2
+    RATE_LIMIT_SYNC_MS: int = 250
+    RATE_LIMIT_LOCAL_SIZE: int = 100000
+
+    # Abuse heavy hitters (count-min sketch per stream, tumbling window)
+    HEAVY_HITTERS_WIDTH: int = 2048
+    HEAVY_HITTERS_DEPTH: int = 4
+    HEAVY_HITTERS_TOP_K: int = 50
+    HEAVY_HITTERS_WINDOW_SECONDS: int = 300
+    # Merged view across workers: flush period and exact keys kept per stream between flushes
+    HEAVY_HITTERS_SYNC_SECONDS: int = 5
+    HEAVY_HITTERS_SYNC_MAX_KEYS: int = 10000
+
+    # IP filter: comma-separated CIDRs, merged with Redis sets ipfilter:block / ipfilter:allow
+    IP_BLOCKLIST: str = ""
+    IP_ALLOWLIST: str = ""
+    IP_FILTER_RELOAD_SECONDS: int = 5
+
+    # Idempotency-Key replay for retried POSTs
+    IDEMPOTENCY_TTL_SECONDS: int = 86400
+    IDEMPOTENCY_LOCK_SECONDS: int = 30
+    IDEMPOTENCY_WAIT_SECONDS: int = 10
+
+    # Single-flight: coalesce concurrent identical lookups (optionally across workers via a Redis lock)
+    SINGLE_FLIGHT_REDIS: bool = False
+    SINGLE_FLIGHT_LOCK_SECONDS: int = 5
+    SINGLE_FLIGHT_WAIT_MS: int = 1000
+
+    # Pre-database rejection cache (negative lookups)
+    REJECT_UNKNOWN_ADMIN_TTL: int = 300
+    REJECT_NO_OTP_TTL: int = 10
+    REJECT_LOCAL_SIZE: int = 10000
+    REJECT_LOCAL_TTL: int = 5
+
+    # Password hashing (0 = one worker per CPU core)
+    PASSWORD_HASH_WORKERS: int = 0
+    PASSWORD_HASH_MAX_PENDING: int = 64
+    PASSWORD_HASH_SCHEME: Literal["bcrypt", "argon2id"] = "bcrypt"
+    PASSWORD_HASH_CALIBRATE: bool = True
+    PASSWORD_HASH_TARGET_MS: int = 250
+    BCRYPT_MIN_ROUNDS: int = 10
+    ARGON2_MIN_TIME_COST: int = 2
+    ARGON2_MEMORY_KB: int = 65536
 
     # Server 
     HOST: str = "0.0.0.0"
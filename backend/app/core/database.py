@@ -11,17 +11,23 @@ from sqlalchemy.ext.asyncio import (
 from sqlalchemy.orm import DeclarativeBase
 
 from app.core.config import settings
+from app.core.pool_monitor import InstrumentedPool, pool_monitor
+from app.core.replicas import replica_router
 
 logger = logging.getLogger(__name__)
 
 engine = create_async_engine(
     settings.DATABASE_URL,
     echo=settings.is_development,
-    pool_size=10,
-    max_overflow=20,
+    poolclass=InstrumentedPool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
     pool_pre_ping=True,
     pool_recycle=3600,
+    connect_args={"prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE},
 )
+pool_monitor.instrument(engine)
 
 async_session_maker = async_sessionmaker(
     bind=engine,
@@ -46,3 +52,17 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             raise
         finally:
             await session.close()
+
+
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """Like ``get_db`` for read-only endpoints — a healthy replica's session, else the primary's."""
+    replica = replica_router.pick()
+    maker = replica.sessions if replica else async_session_maker
+    async with maker() as session:
+        try:
+            yield session
+        except Exception:
+            await session.rollback()
+            raise
+        finally:
+            await session.close()
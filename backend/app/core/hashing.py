@@ -0,0 +1,61 @@
+"""Password hashing executor — runs bcrypt off the event loop in a process pool."""
+
+import asyncio
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class HashingOverloadedError(RuntimeError):
+    """Raised when too many hashing jobs are already queued."""
+
+
+class HashingExecutor:
+    """Bounded process pool for CPU-heavy password work.
+
+    At most ``workers`` jobs run at once; at most ``max_pending`` jobs may be
+    running or waiting — anything beyond that fails fast instead of queueing.
+    """
+
+    def __init__(self, workers: int = 0, max_pending: int = 64) -> None:
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max(max_pending, self.workers)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._sem: Optional[asyncio.Semaphore] = None
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def start(self) -> None:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            self._sem = asyncio.Semaphore(self.workers)
+            logger.info("Hashing pool started (%d workers, max %d pending)", self.workers, self.max_pending)
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+            self._sem = None
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if self._pending >= self.max_pending:
+            raise HashingOverloadedError("Password hashing queue is full")
+        self.start()
+        self._pending += 1
+        try:
+            async with self._sem:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self._pool, fn, *args)
+        finally:
+            self._pending -= 1
+
+
+hashing_executor = HashingExecutor(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_PENDING)
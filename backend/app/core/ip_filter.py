@@ -0,0 +1,157 @@
+"""IP allow/block lists — CIDRs compiled into path-compressed prefix trees, reloaded from Redis."""
+
+import asyncio
+import ipaddress
+import logging
+from typing import Iterable, Optional
+
+from app.core.config import settings
+from app.core.redis import RedisClient, redis_client
+
+logger = logging.getLogger(__name__)
+
+BLOCK, ALLOW = "block", "allow"
+BLOCK_KEY = "ipfilter:block"
+ALLOW_KEY = "ipfilter:allow"
+
+
+def forwarded_client_ip(forwarded_for: Optional[str], peer: Optional[str]) -> str:
+    """First ``X-Forwarded-For`` hop, else the socket peer — shared by the guards and the middleware."""
+    if forwarded_for:
+        return forwarded_for.split(",")[0].strip()
+    return peer or "unknown"
+
+
+class _Node:
+    __slots__ = ("prefix", "length", "action", "children")
+
+    def __init__(self, prefix: int, length: int) -> None:
+        self.prefix = prefix
+        self.length = length
+        self.action: Optional[str] = None
+        self.children: list[Optional["_Node"]] = [None, None]
+
+
+class PrefixTree:
+    """Longest-prefix match over one address family.
+
+    Built as a binary trie, then compressed so chains of single-child,
+    action-less nodes disappear; a lookup visits only branching nodes.
+    """
+
+    def __init__(self, bits: int, entries: Iterable[tuple[int, int, str]]) -> None:
+        self.bits = bits
+        root = _Node(0, 0)
+        for prefix, length, action in entries:
+            node = root
+            for depth in range(length):
+                bit = (prefix >> (length - depth - 1)) & 1
+                if node.children[bit] is None:
+                    node.children[bit] = _Node(prefix >> (length - depth - 1), depth + 1)
+                node = node.children[bit]
+            node.action = action
+        self.root = self._compress(root)
+
+    def _compress(self, node: Optional[_Node]) -> Optional[_Node]:
+        if node is None:
+            return None
+        node.children = [self._compress(c) for c in node.children]
+        if node.action is None and node.length:
+            only = [c for c in node.children if c is not None]
+            if len(only) == 1:
+                return only[0]
+            if not only:
+                return None
+        return node
+
+    def match(self, addr: int) -> Optional[str]:
+        best = None
+        node = self.root
+        bits = self.bits
+        while node is not None:
+            if node.length and addr >> (bits - node.length) != node.prefix:
+                break
+            if node.action is not None:
+                best = node.action
+            if node.length == bits:
+                break
+            node = node.children[(addr >> (bits - node.length - 1)) & 1]
+        return best
+
+
+def _parse(cidrs: Iterable[str], action: str) -> list[tuple[int, int, int, str]]:
+    out = []
+    for raw in cidrs:
+        try:
+            net = ipaddress.ip_network(raw.strip(), strict=False)
+        except ValueError:
+            logger.warning("Ignoring invalid CIDR %r", raw)
+            continue
+        out.append((net.version, int(net.network_address) >> (net.max_prefixlen - net.prefixlen), net.prefixlen, action))
+    return out
+
+
+def _split(spec: str) -> list[str]:
+    return [c for c in (s.strip() for s in spec.split(",")) if c]
+
+
+class IPFilter:
+    """Static lists from settings plus Redis sets ``ipfilter:block`` / ``ipfilter:allow``.
+
+    The most specific CIDR wins, so an allow entry can carve a hole in a
+    blocked range. Redis sets are polled and the trees rebuilt only when
+    their contents change.
+    """
+
+    def __init__(self, redis: RedisClient) -> None:
+        self.redis = redis
+        self._v4 = PrefixTree(32, [])
+        self._v6 = PrefixTree(128, [])
+        self._source: Optional[tuple[frozenset, frozenset]] = None
+        self._remote: tuple[frozenset, frozenset] = (frozenset(), frozenset())
+        self.size = 0
+
+    def install(self, block: Iterable[str], allow: Iterable[str]) -> None:
+        entries = _parse(block, BLOCK) + _parse(allow, ALLOW)
+        self._v4 = PrefixTree(32, [(p, n, a) for v, p, n, a in entries if v == 4])
+        self._v6 = PrefixTree(128, [(p, n, a) for v, p, n, a in entries if v == 6])
+        self.size = len(entries)
+
+    def is_blocked(self, ip: str) -> bool:
+        try:
+            addr = ipaddress.ip_address(ip)
+        except ValueError:
+            return False
+        if addr.version == 6 and addr.ipv4_mapped:
+            addr = addr.ipv4_mapped
+        tree = self._v4 if addr.version == 4 else self._v6
+        return tree.match(int(addr)) == BLOCK
+
+    async def load(self) -> None:
+        # During an outage keep the last sets Redis returned — lifting its
+        # blocks then would open the door exactly when an attack is likely.
+        remote_block = await self.redis.fetch_remote("smembers", BLOCK_KEY)
+        remote_allow = await self.redis.fetch_remote("smembers", ALLOW_KEY)
+        if remote_block is not None and remote_allow is not None:
+            self._remote = (frozenset(remote_block), frozenset(remote_allow))
+        block = frozenset(_split(settings.IP_BLOCKLIST)) | self._remote[0]
+        allow = frozenset(_split(settings.IP_ALLOWLIST)) | self._remote[1]
+        if (block, allow) == self._source:
+            return
+        self.install(block, allow)
+        self._source = (frozenset(block), frozenset(allow))
+        logger.info("IP filter loaded (%d CIDRs)", self.size)
+
+    async def watch(self) -> None:
+        """Background task: pick up Redis list changes without a restart."""
+        while True:
+            try:
+                await self.load()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.debug("IP filter reload skipped: %s", exc)
+            await asyncio.sleep(settings.IP_FILTER_RELOAD_SECONDS)
+
+
+ip_filter = IPFilter(redis_client)
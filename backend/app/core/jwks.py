@@ -0,0 +1,143 @@
+"""Asymmetric access-token signing (EdDSA / ES256) with key IDs and a JWKS document."""
+
+import base64
+import json
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Union
+
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+from cryptography.hazmat.primitives.asymmetric.utils import decode_dss_signature, encode_dss_signature
+
+from app.core.token_cache import b64url_decode, claims_current
+
+logger = logging.getLogger(__name__)
+
+PrivateKey = Union[ed25519.Ed25519PrivateKey, ec.EllipticCurvePrivateKey]
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def _json_segment(obj: dict) -> str:
+    return _b64encode(json.dumps(obj, separators=(",", ":")).encode())
+
+
+@dataclass
+class SigningKey:
+    kid: str
+    alg: str
+    private: PrivateKey
+
+    def sign(self, data: bytes) -> bytes:
+        if self.alg == "EdDSA":
+            return self.private.sign(data)
+        r, s = decode_dss_signature(self.private.sign(data, ec.ECDSA(hashes.SHA256())))
+        return r.to_bytes(32, "big") + s.to_bytes(32, "big")
+
+    def verify(self, sig: bytes, data: bytes) -> bool:
+        public = self.private.public_key()
+        try:
+            if self.alg == "EdDSA":
+                public.verify(sig, data)
+            else:
+                if len(sig) != 64:
+                    return False
+                der = encode_dss_signature(int.from_bytes(sig[:32], "big"), int.from_bytes(sig[32:], "big"))
+                public.verify(der, data, ec.ECDSA(hashes.SHA256()))
+            return True
+        except InvalidSignature:
+            return False
+
+    def jwk(self) -> dict:
+        public = self.private.public_key()
+        if self.alg == "EdDSA":
+            raw = public.public_bytes(serialization.Encoding.Raw, serialization.PublicFormat.Raw)
+            return {"kty": "OKP", "crv": "Ed25519", "x": _b64encode(raw), "kid": self.kid, "alg": self.alg, "use": "sig"}
+        nums = public.public_numbers()
+        return {
+            "kty": "EC",
+            "crv": "P-256",
+            "x": _b64encode(nums.x.to_bytes(32, "big")),
+            "y": _b64encode(nums.y.to_bytes(32, "big")),
+            "kid": self.kid,
+            "alg": self.alg,
+            "use": "sig",
+        }
+
+
+def generate_key(alg: str) -> PrivateKey:
+    if alg == "EdDSA":
+        return ed25519.Ed25519PrivateKey.generate()
+    return ec.generate_private_key(ec.SECP256R1())
+
+
+def _check_key(alg: str, key: object) -> PrivateKey:
+    if alg == "EdDSA" and isinstance(key, ed25519.Ed25519PrivateKey):
+        return key
+    if alg == "ES256" and isinstance(key, ec.EllipticCurvePrivateKey) and key.curve.name == "secp256r1":
+        return key
+    raise ValueError(f"Key does not match algorithm {alg}")
+
+
+class KeyRing:
+    """Active signing key plus older keys kept only for verification.
+
+    ``spec`` is ``"kid1:/path/new.pem,kid2:/path/old.pem"`` — the first entry
+    signs, every entry verifies and is published in the JWKS.
+    """
+
+    def __init__(self, alg: str, keys: list[SigningKey]) -> None:
+        if not keys:
+            raise ValueError("KeyRing needs at least one key")
+        self.alg = alg
+        self.keys = {k.kid: k for k in keys}
+        self.active = keys[0]
+        self._jwks = json.dumps({"keys": [k.jwk() for k in keys]}, separators=(",", ":")).encode()
+
+    @classmethod
+    def from_spec(cls, alg: str, spec: str, allow_ephemeral: bool = False) -> "KeyRing":
+        keys: list[SigningKey] = []
+        for entry in filter(None, (e.strip() for e in spec.split(","))):
+            kid, _, path = entry.partition(":")
+            pem = Path(path).read_bytes()
+            keys.append(SigningKey(kid, alg, _check_key(alg, serialization.load_pem_private_key(pem, password=None))))
+        if not keys:
+            if not allow_ephemeral:
+                raise ValueError("JWT_SIGNING_KEYS is empty")
+            logger.warning("No JWT signing keys configured — using an ephemeral %s key", alg)
+            keys.append(SigningKey("ephemeral", alg, generate_key(alg)))
+        return cls(alg, keys)
+
+    def encode(self, payload: dict) -> str:
+        header = _json_segment({"alg": self.alg, "typ": "JWT", "kid": self.active.kid})
+        body = _json_segment(payload)
+        signing_input = f"{header}.{body}".encode()
+        return f"{header}.{body}.{_b64encode(self.active.sign(signing_input))}"
+
+    def decode(self, token: str) -> Optional[dict]:
+        parts = token.split(".")
+        if len(parts) != 3:
+            return None
+        try:
+            header = json.loads(b64url_decode(parts[0]))
+            if not isinstance(header, dict) or not isinstance(header.get("kid"), str):
+                return None
+            key = self.keys.get(header["kid"])
+            if not key or header.get("alg") != self.alg:
+                return None
+            if not key.verify(b64url_decode(parts[2]), f"{parts[0]}.{parts[1]}".encode()):
+                return None
+            payload = json.loads(b64url_decode(parts[1]))
+        except ValueError:
+            return None
+        if not isinstance(payload, dict) or not claims_current(payload):
+            return None
+        return payload
+
+    def jwks_bytes(self) -> bytes:
+        return self._jwks
@@ -0,0 +1,208 @@
+"""Local-first rate limiting — per-worker token leases, reconciled with Redis in batches."""
+
+import asyncio
+import logging
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from app.core.config import settings
+from app.core.memory_store import MemoryStore, local_script
+from app.core.redis import RedisClient, redis_client
+
+logger = logging.getLogger(__name__)
+
+# KEYS[i] window counter; ARGV[2i-1] consumed since last sync, ARGV[2i] window_ms
+# Returns {count_1, pttl_1, count_2, pttl_2, ...}
+_SYNC_LUA = """
+local out = {}
+for i = 1, #KEYS do
+  local c = redis.call('INCRBY', KEYS[i], ARGV[2 * i - 1])
+  local t = redis.call('PTTL', KEYS[i])
+  if t < 0 then
+    redis.call('PEXPIRE', KEYS[i], ARGV[2 * i])
+    t = tonumber(ARGV[2 * i])
+  end
+  out[#out + 1] = c
+  out[#out + 1] = t
+end
+return out
+"""
+
+_SYNC_BATCH = 500
+
+# ``allow``: this worker's lease is spent; the global window may still have room.
+LEASE_SPENT = -1
+
+
+@local_script(_SYNC_LUA)
+def _local_sync(store: MemoryStore, keys: list, args: list) -> list:
+    out = []
+    for i, k in enumerate(keys):
+        count = store.incrby(k, int(args[2 * i]))
+        if store.pttl(k) < 0:
+            store.pexpire(k, int(args[2 * i + 1]))
+        out += [count, store.pttl(k)]
+    return out
+
+
+@dataclass
+class _Bucket:
+    limit: int
+    window: int
+    tokens: int
+    resets_at: float
+    pending: int = 0
+    blocked_until: float = 0.0
+
+
+class LocalRateLimiter:
+    """Fixed-window limits answered from memory.
+
+    Each worker holds at most ``burst`` tokens per key, leased from the
+    window's remaining budget at the last sync. Between syncs a worker admits
+    only its lease from memory — past that the caller counts in Redis — so
+    the global limit is exceeded by at most ``workers × burst`` per window. Consumption is flushed to the same Redis
+    counters every ``sync_ms``, in one script call per batch of keys (per
+    slot in cluster mode).
+
+    Buckets are kept in LRU order. One evicted with unsynced consumption or a
+    block is parked until the next sync instead of being dropped, so its count
+    still reaches Redis and a returning key gets its old lease back, not a
+    fresh one.
+    """
+
+    def __init__(self, redis: RedisClient, burst: int, sync_ms: int, maxsize: int) -> None:
+        self.redis = redis
+        self.burst = max(burst, 1)
+        self.sync_interval = sync_ms / 1000
+        self.maxsize = maxsize
+        self._buckets: OrderedDict[str, _Bucket] = OrderedDict()
+        self._parked: dict[str, _Bucket] = {}
+        self._dirty: set[str] = set()
+
+    def _find(self, key: str) -> Optional[_Bucket]:
+        b = self._buckets.get(key)
+        return b if b is not None else self._parked.get(key)
+
+    def _bucket(self, key: str, limit: int, window: int, now: float) -> _Bucket:
+        b = self._buckets.get(key)
+        if b is None and (b := self._parked.pop(key, None)) is not None:
+            self._buckets[key] = b
+        if b is not None and b.resets_at > now:
+            self._buckets.move_to_end(key)
+            return b
+        b = _Bucket(limit, window, min(self.burst, limit), now + window)
+        self._buckets[key] = b
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.maxsize:
+            old, ob = self._buckets.popitem(last=False)
+            if old in self._dirty or ob.blocked_until > now:
+                self._parked[old] = ob
+        return b
+
+    def allow(self, key: str, limit: int, window: int) -> int:
+        """Take one token. No I/O.
+
+        0 — admitted; ``LEASE_SPENT`` — no local token left, count this one in
+        Redis instead; otherwise seconds until the (globally full) window resets.
+        """
+        now = time.monotonic()
+        if (retry := self.blocked_for(key, now)):
+            return retry
+        b = self._bucket(key, limit, window, now)
+        self._dirty.add(key)
+        if b.tokens <= 0:
+            # The next sync renews the lease or blocks the key; until then the caller asks Redis.
+            return LEASE_SPENT
+        b.tokens -= 1
+        b.pending += 1
+        return 0
+
+    def refund(self, key: str) -> None:
+        """Give back a token taken by ``allow`` for a request that was rejected later."""
+        b = self._find(key)
+        if b and b.pending > 0:
+            b.pending -= 1
+            b.tokens += 1
+
+    def block(self, key: str, seconds: int) -> None:
+        """Reject ``key`` locally for ``seconds`` (e.g. after Redis said it is over)."""
+        now = time.monotonic()
+        b = self._find(key)
+        if b is None:
+            b = self._bucket(key, 0, seconds, now)
+        b.blocked_until = max(b.blocked_until, now + seconds)
+
+    def blocked_for(self, key: str, now: Optional[float] = None) -> int:
+        b = self._find(key)
+        if b is None:
+            return 0
+        remaining = b.blocked_until - (time.monotonic() if now is None else now)
+        return math.ceil(remaining) if remaining > 0 else 0
+
+    # Reconciliation
+    async def sync(self) -> None:
+        keys = [k for k in self._dirty if self._find(k) is not None]
+        self._dirty.clear()
+        batches = []
+        for group in self.redis.slot_groups(keys):
+            for i in range(0, len(group), _SYNC_BATCH):
+                batches.append([keys[j] for j in group[i : i + _SYNC_BATCH]])
+        await asyncio.gather(*(self._sync_batch(b) for b in batches))
+        # Parked buckets are kept only while they still have something to sync or enforce.
+        now = time.monotonic()
+        for k in [k for k, b in self._parked.items() if k not in self._dirty and b.blocked_until <= now]:
+            del self._parked[k]
+
+    async def _sync_batch(self, keys: list[str]) -> None:
+        sent: dict[str, int] = {}
+        args: list = []
+        for k in keys:
+            b = self._find(k)
+            sent[k], b.pending = b.pending, 0
+            args += [sent[k], b.window * 1000]
+        try:
+            raw = await self.redis.eval_script(_SYNC_LUA, keys, args)
+        except Exception as exc:
+            logger.debug("Rate limit sync skipped: %s", exc)
+            for k, n in sent.items():
+                if (b := self._find(k)) is not None:
+                    b.pending += n
+                    self._dirty.add(k)
+            return
+        now = time.monotonic()
+        for idx, k in enumerate(keys):
+            b = self._find(k)
+            if b is None:
+                continue
+            count, pttl = int(raw[2 * idx]), int(raw[2 * idx + 1])
+            b.resets_at = now + pttl / 1000
+            # Tokens taken while the sync was in flight count against the new lease.
+            b.tokens = max(min(self.burst, b.limit - count) - b.pending, 0)
+            if count >= b.limit:
+                b.blocked_until = max(b.blocked_until, b.resets_at)
+
+    async def run(self) -> None:
+        """Background task: flush local consumption every ``sync_interval``."""
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            try:
+                await self.sync()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("Rate limit sync failed: %s", exc)
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+local_limiter = LocalRateLimiter(
+    redis_client,
+    burst=settings.RATE_LIMIT_LOCAL_BURST,
+    sync_ms=settings.RATE_LIMIT_SYNC_MS,
+    maxsize=settings.RATE_LIMIT_LOCAL_SIZE,
+)
@@ -0,0 +1,169 @@
+"""In-process stand-in for Redis — bounded key/value store with timer-wheel expiry."""
+
+import math
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Set, Union
+
+Value = Union[str, set]
+LocalScript = Callable[["MemoryStore", list, list], Any]
+
+# Lua source → Python equivalent, registered by the modules that own the scripts.
+LOCAL_SCRIPTS: dict[str, LocalScript] = {}
+
+
+class UnregisteredScriptError(LookupError):
+    """A Lua script was run without a ``local_script`` equivalent."""
+
+
+def local_script(source: str) -> Callable[[LocalScript], LocalScript]:
+    """Register the in-memory equivalent of a Lua script used with ``eval_script``."""
+
+    def register(fn: LocalScript) -> LocalScript:
+        LOCAL_SCRIPTS[source] = fn
+        return fn
+
+    return register
+
+
+class MemoryStore:
+    """The subset of Redis commands ``RedisClient`` exposes, kept in this worker only.
+
+    Command names and return values follow Redis. Expired keys are removed
+    lazily on access and swept by a hashed timing wheel (one-second slots),
+    so expiry costs O(keys due) instead of a scan. When ``maxsize`` keys are
+    held the least recently written key is evicted.
+    """
+
+    def __init__(self, maxsize: int = 100000, wheel_slots: int = 3600) -> None:
+        self.maxsize = maxsize
+        self._data: OrderedDict[str, Value] = OrderedDict()
+        self._expires: dict[str, float] = {}
+        self._wheel: list[set[str]] = [set() for _ in range(wheel_slots)]
+        self._tick = int(time.monotonic())
+
+    # Expiry
+    def _advance(self, now: float) -> None:
+        target = int(now)
+        n = len(self._wheel)
+        for t in range(max(self._tick + 1, target - n + 1), target + 1):
+            slot = self._wheel[t % n]
+            for key in list(slot):
+                at = self._expires.get(key)
+                if at is None or math.ceil(at) % n != t % n:
+                    slot.discard(key)  # persisted or rescheduled elsewhere
+                elif at <= now:
+                    slot.discard(key)
+                    self._remove(key)
+        self._tick = max(self._tick, target)
+
+    def _schedule(self, key: str, at: float) -> None:
+        self._expires[key] = at
+        # Slot of the first whole second at or after ``at``, so a swept key is always due.
+        self._wheel[math.ceil(at) % len(self._wheel)].add(key)
+
+    def _remove(self, key: str) -> bool:
+        self._expires.pop(key, None)
+        return self._data.pop(key, None) is not None
+
+    def _live(self, key: str) -> Optional[Value]:
+        now = time.monotonic()
+        self._advance(now)
+        at = self._expires.get(key)
+        if at is not None and at <= now:
+            self._remove(key)
+            return None
+        return self._data.get(key)
+
+    def _store(self, key: str, value: Value) -> None:
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            old, _ = self._data.popitem(last=False)
+            self._expires.pop(old, None)
+
+    # Strings
+    def get(self, key: str) -> Optional[str]:
+        value = self._live(key)
+        return value if isinstance(value, str) else None
+
+    def set(self, key: str, value: Any, ex: Optional[int] = None, nx: bool = False) -> Optional[bool]:
+        if self._live(key) is not None and nx:
+            return None
+        self._store(key, str(value))
+        if ex:
+            self._schedule(key, time.monotonic() + ex)
+        else:
+            self._expires.pop(key, None)
+        return True
+
+    def setex(self, key: str, seconds: int, value: Any) -> bool:
+        return self.set(key, value, ex=seconds)
+
+    def incrby(self, key: str, amount: int) -> int:
+        value = int(self._live(key) or 0) + int(amount)
+        self._store(key, str(value))
+        return value
+
+    def incr(self, key: str) -> int:
+        return self.incrby(key, 1)
+
+    def mget(self, keys: Any) -> list[Optional[str]]:
+        return [self.get(k) for k in keys]
+
+    # Sets
+    def sadd(self, key: str, *members: str) -> int:
+        current = self._live(key)
+        members_set = current if isinstance(current, set) else set()
+        added = len(set(members) - members_set)
+        members_set.update(members)
+        self._store(key, members_set)
+        return added
+
+    def smembers(self, key: str) -> Set[str]:
+        value = self._live(key)
+        return set(value) if isinstance(value, set) else set()
+
+    # Keys
+    def pexpire(self, key: str, ms: int) -> bool:
+        if self._live(key) is None:
+            return False
+        self._schedule(key, time.monotonic() + int(ms) / 1000)
+        return True
+
+    def expire(self, key: str, seconds: int) -> bool:
+        return self.pexpire(key, int(seconds) * 1000)
+
+    def pttl(self, key: str) -> int:
+        if self._live(key) is None:
+            return -2
+        at = self._expires.get(key)
+        return -1 if at is None else max(math.ceil((at - time.monotonic()) * 1000), 0)
+
+    def ttl(self, key: str) -> int:
+        ms = self.pttl(key)
+        return ms if ms < 0 else math.ceil(ms / 1000)
+
+    def delete(self, *keys: str) -> int:
+        return sum(self._remove(k) for k in keys if self._live(k) is not None)
+
+    def exists(self, *keys: str) -> int:
+        return sum(self._live(k) is not None for k in keys)
+
+    def publish(self, channel: str, message: str) -> int:
+        return 0  # no subscribers outside this worker
+
+    def eval_script(self, source: str, keys: list, args: list) -> Any:
+        script = LOCAL_SCRIPTS.get(source)
+        if script is None:
+            raise UnregisteredScriptError("Lua script has no local_script equivalent")
+        return script(self, keys, args)
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._expires.clear()
+        for slot in self._wheel:
+            slot.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
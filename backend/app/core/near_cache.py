@@ -0,0 +1,73 @@
+"""Near-cache for hot Redis keys — kept coherent by server-assisted invalidation (CLIENT TRACKING)."""
+
+from collections import OrderedDict
+from typing import Any, Optional
+
+MISSING = object()
+
+
+class NearCache:
+    """Bounded LRU of ``GET`` results for keys under ``prefixes``.
+
+    Entries are only trusted while ``live`` — i.e. while the invalidation
+    stream from Redis is connected. A fill is dropped if any invalidation
+    arrived while its ``GET`` was in flight, so a racing write can never
+    leave a stale value behind. Absent keys are cached too (as ``None``).
+    """
+
+    def __init__(self, maxsize: int, prefixes: tuple[str, ...]) -> None:
+        self.maxsize = maxsize
+        self.prefixes = prefixes
+        self.live = False
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._data: OrderedDict[str, Optional[str]] = OrderedDict()
+
+    def tracks(self, key: str) -> bool:
+        return self.live and self.maxsize > 0 and key.startswith(self.prefixes)
+
+    def lookup(self, key: str) -> Any:
+        """Cached value (possibly ``None``), or ``MISSING``; counts the hit or miss."""
+        value = self._data.get(key, MISSING)
+        if value is MISSING:
+            self.misses += 1
+            return MISSING
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def fill(self, key: str, value: Optional[str], version: int) -> None:
+        if not self.live or version != self.version:
+            return
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def invalidate(self, keys: Optional[list[str]]) -> None:
+        """Drop ``keys``; ``None`` (a server-side flush) drops everything."""
+        self.version += 1
+        self.invalidations += 1
+        if keys is None:
+            self._data.clear()
+            return
+        for k in keys:
+            self._data.pop(k, None)
+
+    def reset(self, live: bool) -> None:
+        self.live = live
+        self.version += 1
+        self._data.clear()
+
+    def stats(self) -> dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "live": self.live,
+            "size": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "invalidations": self.invalidations,
+        }
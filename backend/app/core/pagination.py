@@ -0,0 +1,136 @@
+"""Keyset pagination — opaque cursors over whitelisted, index-backed sort keys."""
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Generic, Literal, Optional, Sequence, TypeVar
+from uuid import UUID
+
+from sqlalchemy import ColumnElement, Select, func, literal, select, text, tuple_, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+TotalMode = Literal["none", "estimate", "exact"]
+
+# Stand-in for NULL in nullable sort keys, so they sort last (desc) and stay comparable.
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+EPOCH_SQL = text("'1970-01-01 00:00:00+00'::timestamptz")
+
+
+@dataclass(frozen=True)
+class SortKey:
+    """A sortable expression; ``expr`` takes the entity (or an alias of it).
+
+    Every key must have a ``(is_active, <expr>, id)`` index — the page query
+    is an index range scan per ``is_active`` value.
+    """
+
+    expr: Callable[[Any], ColumnElement]
+    value: Callable[[Any], Any]
+    parse: Callable[[Any], Any] = datetime.fromisoformat
+
+
+@dataclass
+class Page(Generic[T]):
+    items: list[T]
+    next_cursor: Optional[str]
+    total: Optional[int] = None
+    total_exact: bool = False
+
+
+def _dump(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, datetime) else str(value)
+
+
+def encode_cursor(sort: str, order: str, value: Any, row_id: UUID) -> str:
+    raw = json.dumps([sort, order, _dump(value), str(row_id)], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, sort: str, order: str, key: SortKey) -> tuple[Any, UUID]:
+    """``(value, id)`` of the last row seen; ValueError if malformed or from another ordering."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        c_sort, c_order, value, row_id = json.loads(raw)
+        if (c_sort, c_order) != (sort, order):
+            raise ValueError("cursor belongs to another ordering")
+        return key.parse(value), UUID(row_id)
+    except (binascii.Error, json.JSONDecodeError, TypeError, ValueError) as exc:
+        raise ValueError("invalid cursor") from exc
+
+
+def keyset_query(
+    entity: Any,
+    key: SortKey,
+    descending: bool,
+    limit: int,
+    where: Sequence[ColumnElement],
+    after: Optional[tuple[Any, UUID]] = None,
+    is_active: Optional[bool] = None,
+    options: Callable[[Any], Sequence[Any]] = lambda ent: (),
+) -> Select:
+    """The next ``limit`` rows after ``after``, ordered by ``(key, id)``.
+
+    Without an ``is_active`` filter the two index partitions are read
+    separately and merged, so neither falls back to a sort over the table.
+    """
+
+    def ordered(ent: Any) -> list:
+        cols = (key.expr(ent), ent.id)
+        return [c.desc() if descending else c.asc() for c in cols]
+
+    def part(active: bool) -> Select:
+        stmt = select(entity).where(entity.is_active == active, *where)
+        if after is not None:
+            row = tuple_(key.expr(entity), entity.id)
+            bound = tuple_(literal(after[0], key.expr(entity).type), literal(after[1], entity.id.type))
+            stmt = stmt.where(row < bound if descending else row > bound)
+        return stmt.order_by(*ordered(entity)).limit(limit)
+
+    if is_active is not None:
+        return part(is_active).options(*options(entity))
+    merged = aliased(entity, union_all(part(True), part(False)).subquery())
+    return select(merged).order_by(*ordered(merged)).limit(limit).options(*options(merged))
+
+
+def cut(rows: list, limit: int, sort: str, order: str, key: SortKey) -> tuple[list, Optional[str]]:
+    """Trim a ``limit + 1`` fetch to ``limit`` rows and the cursor for the next page, if any."""
+    if len(rows) <= limit:
+        return rows, None
+    last = rows[limit - 1]
+    return rows[:limit], encode_cursor(sort, order, key.value(last), last.id)
+
+
+async def count_rows(
+    db: AsyncSession, entity: Any, where: Sequence[ColumnElement], mode: TotalMode
+) -> tuple[Optional[int], bool]:
+    """``(total, exact)``.
+
+    ``estimate`` counts up to ``PAGINATION_COUNT_CAP`` rows; past that it
+    returns the planner's table size when unfiltered, else the cap itself
+    (a lower bound).
+    """
+    if mode == "none":
+        return None, False
+    if mode == "exact":
+        stmt = select(func.count()).select_from(entity).where(*where)
+        return (await db.execute(stmt)).scalar() or 0, True
+
+    cap = settings.PAGINATION_COUNT_CAP
+    capped = select(func.count()).select_from(select(entity.id).where(*where).limit(cap + 1).subquery())
+    n = (await db.execute(capped)).scalar() or 0
+    if n <= cap:
+        return n, True
+    if not where:
+        estimate = await db.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:table AS regclass)"),
+            {"table": entity.__tablename__},
+        )
+        return max(estimate.scalar() or 0, cap + 1), False
+    return cap, False
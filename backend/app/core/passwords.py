@@ -0,0 +1,145 @@
+"""Password hashing schemes — bcrypt / argon2id, calibrated cost, rehash detection."""
+
+import logging
+import time
+from dataclasses import dataclass, replace
+from typing import Optional, Union
+
+import bcrypt
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+from argon2.low_level import Type
+
+logger = logging.getLogger(__name__)
+
+_CALIBRATION_PASSWORD = "Calibrate-Password-123!"
+
+
+@dataclass(frozen=True)
+class BcryptScheme:
+    rounds: int = 12
+    name: str = "bcrypt"
+
+    def hash(self, password: str) -> str:
+        return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=self.rounds)).decode()
+
+    def verify(self, plain: str, hashed: str) -> bool:
+        try:
+            return bcrypt.checkpw(plain.encode(), hashed.encode())
+        except Exception:
+            return False
+
+    def needs_rehash(self, hashed: str) -> bool:
+        try:
+            return int(hashed.split("$")[2]) < self.rounds
+        except (IndexError, ValueError):
+            return True
+
+    def tuned(self, target_ms: int, floor: int) -> "BcryptScheme":
+        # Each extra round doubles the cost, so one measurement is enough.
+        probe = replace(self, rounds=floor)
+        elapsed = _time_ms(probe)
+        rounds = floor
+        while rounds < 16 and elapsed * 2 <= target_ms:
+            elapsed *= 2
+            rounds += 1
+        return replace(self, rounds=rounds)
+
+
+@dataclass(frozen=True)
+class Argon2idScheme:
+    time_cost: int = 3
+    memory_cost: int = 65536
+    parallelism: int = 1
+    name: str = "argon2id"
+
+    def _hasher(self) -> PasswordHasher:
+        return PasswordHasher(
+            time_cost=self.time_cost,
+            memory_cost=self.memory_cost,
+            parallelism=self.parallelism,
+            type=Type.ID,
+        )
+
+    def hash(self, password: str) -> str:
+        return self._hasher().hash(password)
+
+    def verify(self, plain: str, hashed: str) -> bool:
+        try:
+            return self._hasher().verify(hashed, plain)
+        except (VerificationError, InvalidHashError):
+            return False
+
+    def needs_rehash(self, hashed: str) -> bool:
+        # "$argon2id$v=19$m=65536,t=3,p=1$salt$hash"
+        try:
+            params = dict(kv.split("=") for kv in hashed.split("$")[3].split(","))
+            return int(params["m"]) < self.memory_cost or int(params["t"]) < self.time_cost
+        except (IndexError, KeyError, ValueError):
+            return True
+
+    def tuned(self, target_ms: int, floor: int) -> "Argon2idScheme":
+        # Memory stays fixed; grow iterations until the target latency is reached.
+        t = max(floor, 1)
+        elapsed = _time_ms(replace(self, time_cost=t))
+        while t < 10 and elapsed * (t + 1) / t <= target_ms:
+            elapsed = elapsed * (t + 1) / t
+            t += 1
+        return replace(self, time_cost=t)
+
+
+Scheme = Union[BcryptScheme, Argon2idScheme]
+
+
+def _time_ms(scheme: Scheme) -> float:
+    hashed = scheme.hash(_CALIBRATION_PASSWORD)
+    start = time.perf_counter()
+    scheme.verify(_CALIBRATION_PASSWORD, hashed)
+    return (time.perf_counter() - start) * 1000
+
+
+def identify(hashed: str) -> Optional[str]:
+    """Scheme name for a stored hash, by its prefix."""
+    if hashed.startswith(("$2a$", "$2b$", "$2y$")):
+        return "bcrypt"
+    if hashed.startswith("$argon2id$"):
+        return "argon2id"
+    return None
+
+
+class PasswordEngine:
+    """Hashes with the active scheme, verifies any known scheme."""
+
+    def __init__(self, default: str = "bcrypt") -> None:
+        self.schemes: dict[str, Scheme] = {"bcrypt": BcryptScheme(), "argon2id": Argon2idScheme()}
+        self.default = default
+
+    @property
+    def active(self) -> Scheme:
+        return self.schemes[self.default]
+
+    def scheme_for(self, hashed: str) -> Optional[Scheme]:
+        name = identify(hashed)
+        return self.schemes.get(name) if name else None
+
+    def hash(self, password: str) -> str:
+        return self.active.hash(password)
+
+    def verify(self, plain: str, hashed: str) -> bool:
+        scheme = self.scheme_for(hashed)
+        return scheme.verify(plain, hashed) if scheme else False
+
+    def needs_rehash(self, hashed: str) -> bool:
+        if identify(hashed) != self.default:
+            return True
+        return self.active.needs_rehash(hashed)
+
+    def use(self, scheme: Scheme) -> None:
+        self.schemes[scheme.name] = scheme
+
+
+def calibrate(scheme: Scheme, target_ms: int, floor: int) -> Scheme:
+    """Pick the highest cost (>= floor) whose verify time stays within target_ms."""
+    tuned = scheme.tuned(target_ms, floor)
+    logger.info("Password hashing calibrated: %s", tuned)
+    return tuned
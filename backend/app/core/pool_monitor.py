@@ -0,0 +1,211 @@
+"""DB pool instrumentation — checkout waits, hold times per route, pool gauges."""
+
+import bisect
+import logging
+import os
+import time
+from contextvars import ContextVar
+from typing import Any, Optional
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, PoolProxiedConnection
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# ASGI scope of the request being served; set by ``DBPoolContextMiddleware``.
+request_scope: ContextVar[Optional[dict]] = ContextVar("request_scope", default=None)
+
+BACKGROUND = "background"
+OTHER = "other"
+BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+def current_route() -> str:
+    """``METHOD /route/{template}`` of the running request, or ``background``."""
+    scope = request_scope.get()
+    if scope is None:
+        return BACKGROUND
+    route = scope.get("route")
+    return f"{scope.get('method', '')} {getattr(route, 'path', None) or scope.get('path', '')}"
+
+
+class Histogram:
+    """Per-bucket (non-cumulative) counts with fixed upper bounds in milliseconds."""
+
+    def __init__(self, bounds: tuple[float, ...] = BUCKETS_MS) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, ms: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, ms)] += 1
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the ``q`` quantile (``None`` if empty or beyond the last bound)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(self.bounds, self.counts):
+            seen += n
+            if seen >= rank:
+                return float(bound)
+        return None
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max, 3),
+            "p50_ms": self.quantile(0.5),
+            "p95_ms": self.quantile(0.95),
+            "p99_ms": self.quantile(0.99),
+            "buckets": [
+                {"le_ms": le, "count": n}
+                for le, n in zip([*self.bounds, None], self.counts)
+            ],
+        }
+
+
+class _RouteStats:
+    __slots__ = ("checkouts", "wait_ms", "held_ms", "max_held_ms")
+
+    def __init__(self) -> None:
+        self.checkouts = 0
+        self.wait_ms = 0.0
+        self.held_ms = 0.0
+        self.max_held_ms = 0.0
+
+
+class PoolMonitor:
+    """Per-worker pool statistics, fed by ``InstrumentedPool`` and pool events.
+
+    Checkout wait is measured around ``Pool.connect`` (queueing, new
+    connections and pre-ping); hold time runs from the ``checkout`` to the
+    ``checkin`` event and is charged to the route that checked out.
+    """
+
+    def __init__(self, slow_ms: float, max_routes: int = 200) -> None:
+        self.slow_ms = slow_ms
+        self.max_routes = max_routes
+        self.worker = os.getpid()
+        self.engine: Optional[AsyncEngine] = None
+        self.wait = Histogram()
+        self.held = Histogram()
+        self.routes: dict[str, _RouteStats] = {}
+        self.slow_checkouts = 0
+        self.timeouts = 0
+        self.peak_checked_out = 0
+
+    def instrument(self, engine: AsyncEngine) -> None:
+        self.engine = engine
+        self.listen(engine.sync_engine)
+
+    def listen(self, target: Any) -> None:
+        """Attach the checkout/checkin handlers to an engine or pool."""
+        event.listen(target, "checkout", self._on_checkout)
+        event.listen(target, "checkin", self._on_checkin)
+
+    def _route(self, name: str) -> _RouteStats:
+        stats = self.routes.get(name)
+        if stats is None:
+            if len(self.routes) >= self.max_routes:
+                name = OTHER
+            stats = self.routes.setdefault(name, _RouteStats())
+        return stats
+
+    # Fed by InstrumentedPool.connect
+    def checkout_waited(self, pool: "InstrumentedPool", ms: float) -> None:
+        route = current_route()
+        self.wait.observe(ms)
+        self._route(route).wait_ms += ms
+        self.peak_checked_out = max(self.peak_checked_out, pool.checkedout())
+        if ms >= self.slow_ms:
+            self.slow_checkouts += 1
+            logger.warning(
+                "Slow DB checkout: %.1f ms for %s (checked out %d, overflow %d)",
+                ms, route, pool.checkedout(), pool.overflow(),
+            )
+
+    def checkout_timed_out(self, ms: float) -> None:
+        self.timeouts += 1
+        logger.error("DB pool exhausted: %s gave up after %.0f ms", current_route(), ms)
+
+    # Pool events
+    def _on_checkout(self, dbapi_conn: Any, record: Any, proxy: Any) -> None:
+        record.info["pool_monitor"] = (time.perf_counter(), current_route())
+
+    def _on_checkin(self, dbapi_conn: Any, record: Any) -> None:
+        started = record.info.pop("pool_monitor", None)
+        if started is None:
+            return
+        at, route = started
+        ms = (time.perf_counter() - at) * 1000
+        self.held.observe(ms)
+        stats = self._route(route)
+        stats.checkouts += 1
+        stats.held_ms += ms
+        stats.max_held_ms = max(stats.max_held_ms, ms)
+
+    def gauges(self) -> dict[str, int]:
+        pool = self.engine.sync_engine.pool if self.engine is not None else None
+        queued = isinstance(pool, AsyncAdaptedQueuePool)
+        return {
+            "size": pool.size() if queued else 0,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "checked_out": pool.checkedout() if queued else 0,
+            "checked_in": pool.checkedin() if queued else 0,
+            "overflow": max(pool.overflow(), 0) if queued else 0,
+            "peak_checked_out": self.peak_checked_out,
+        }
+
+    def snapshot(self, limit: int = 20) -> dict[str, Any]:
+        routes = sorted(self.routes.items(), key=lambda kv: -kv[1].held_ms)[:limit]
+        return {
+            "worker": self.worker,
+            "pool": self.gauges(),
+            "slow_checkout_ms": self.slow_ms,
+            "slow_checkouts": self.slow_checkouts,
+            "timeouts": self.timeouts,
+            "checkout_wait": self.wait.snapshot(),
+            "connection_held": self.held.snapshot(),
+            "routes": [
+                {
+                    "route": name,
+                    "checkouts": s.checkouts,
+                    "avg_wait_ms": round(s.wait_ms / s.checkouts, 3) if s.checkouts else 0.0,
+                    "avg_held_ms": round(s.held_ms / s.checkouts, 3) if s.checkouts else 0.0,
+                    "max_held_ms": round(s.max_held_ms, 3),
+                    "total_held_ms": round(s.held_ms, 3),
+                }
+                for name, s in routes
+            ],
+        }
+
+
+pool_monitor = PoolMonitor(slow_ms=settings.DB_POOL_SLOW_CHECKOUT_MS)
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Async queue pool that reports how long each checkout waited."""
+
+    monitor = pool_monitor
+
+    def connect(self) -> PoolProxiedConnection:
+        started = time.perf_counter()
+        try:
+            conn = super().connect()
+        except PoolTimeout:
+            self.monitor.checkout_timed_out((time.perf_counter() - started) * 1000)
+            raise
+        self.monitor.checkout_waited(self, (time.perf_counter() - started) * 1000)
+        return conn
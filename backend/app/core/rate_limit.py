@@ -0,0 +1,144 @@
+"""Atomic multi-window rate limiter — one Lua script call checks and counts every window."""
+
+import math
+from dataclasses import dataclass, field
+from typing import Optional, Sequence
+
+from app.core.memory_store import MemoryStore, local_script
+from app.core.redis import RedisClient
+
+# KEYS[i]   window counter
+# ARGV[1]   cost, ARGV[2] dry-run flag ("1" = check only)
+# ARGV[3+3(i-1)..]  limit, window_ms, sliding ("1" = refresh TTL on every hit)
+# Returns {denied_index (0-based, -1 = allowed), retry_ms, count_1..n, pttl_1..n}
+_LUA = """
+local cost = tonumber(ARGV[1])
+local dry = ARGV[2] == '1'
+local n = #KEYS
+local denied, retry = -1, 0
+local counts = {}
+for i = 1, n do
+  local limit = tonumber(ARGV[3 * i])
+  local c = tonumber(redis.call('GET', KEYS[i]) or '0')
+  counts[i] = c
+  if c + cost > limit then
+    if denied < 0 then denied = i - 1 end
+    local t = redis.call('PTTL', KEYS[i])
+    if t > retry then retry = t end
+  end
+end
+if denied < 0 and not dry then
+  for i = 1, n do
+    counts[i] = redis.call('INCRBY', KEYS[i], cost)
+    if ARGV[3 * i + 2] == '1' or redis.call('PTTL', KEYS[i]) < 0 then
+      redis.call('PEXPIRE', KEYS[i], ARGV[3 * i + 1])
+    end
+  end
+end
+local out = {denied, retry}
+for i = 1, n do out[#out + 1] = counts[i] end
+for i = 1, n do out[#out + 1] = redis.call('PTTL', KEYS[i]) end
+return out
+"""
+
+
+@local_script(_LUA)
+def _local_hit(store: MemoryStore, keys: list, args: list) -> list:
+    cost, dry = int(args[0]), str(args[1]) == "1"
+    denied, retry = -1, 0
+    counts = [int(store.get(k) or 0) for k in keys]
+    for i, k in enumerate(keys):
+        if counts[i] + cost > int(args[2 + 3 * i]):
+            denied = i if denied < 0 else denied
+            retry = max(retry, store.pttl(k))
+    if denied < 0 and not dry:
+        for i, k in enumerate(keys):
+            counts[i] = store.incrby(k, cost)
+            if str(args[4 + 3 * i]) == "1" or store.pttl(k) < 0:
+                store.pexpire(k, int(args[3 + 3 * i]))
+    return [denied, retry, *counts, *(store.pttl(k) for k in keys)]
+
+
+# Undo a hit on windows that still exist (cluster mode, a later slot denied).
+# KEYS[i] window counter, ARGV[1] cost
+_REFUND_LUA = """
+for i = 1, #KEYS do
+  if redis.call('EXISTS', KEYS[i]) == 1 then redis.call('DECRBY', KEYS[i], ARGV[1]) end
+end
+return 0
+"""
+
+
+@local_script(_REFUND_LUA)
+def _local_refund(store: MemoryStore, keys: list, args: list) -> int:
+    for k in keys:
+        if store.exists(k):
+            store.incrby(k, -int(args[0]))
+    return 0
+
+
+@dataclass(frozen=True)
+class Window:
+    key: str
+    limit: int
+    seconds: int
+    sliding: bool = False
+
+
+@dataclass
+class RateLimitResult:
+    allowed: bool
+    retry_after: int
+    denied: Optional[Window] = None
+    counts: list[int] = field(default_factory=list)
+    ttls: list[int] = field(default_factory=list)
+
+
+class RateLimiter:
+    def __init__(self, redis: RedisClient) -> None:
+        self.redis = redis
+
+    async def _run(self, windows: Sequence[Window], cost: int, dry: bool) -> RateLimitResult:
+        """One script call per cluster slot (a single call outside cluster mode).
+
+        Windows sharing a slot are checked and counted atomically; across
+        slots, groups run in order and stop at the first denial, and the
+        groups already counted are refunded so a denied hit counts nowhere.
+        """
+        n = len(windows)
+        denied_idx, retry_ms = -1, 0
+        counts, pttls = [0] * n, [0] * n
+        counted: list[list[int]] = []
+        for group in self.redis.slot_groups([w.key for w in windows]):
+            args: list = [cost, "1" if dry else "0"]
+            for i in group:
+                w = windows[i]
+                args += [w.limit, w.seconds * 1000, "1" if w.sliding else "0"]
+            raw = await self.redis.eval_script(_LUA, [windows[i].key for i in group], args)
+            m = len(group)
+            for j, i in enumerate(group):
+                counts[i], pttls[i] = int(raw[2 + j]), int(raw[2 + m + j])
+            if int(raw[0]) >= 0:
+                denied_idx, retry_ms = group[int(raw[0])], int(raw[1])
+                break
+            counted.append(group)
+        if denied_idx >= 0 and not dry:
+            for group in counted:
+                await self.redis.eval_script(_REFUND_LUA, [windows[i].key for i in group], [cost])
+                for i in group:
+                    counts[i] -= cost
+        return RateLimitResult(
+            allowed=denied_idx < 0,
+            retry_after=math.ceil(retry_ms / 1000) if denied_idx >= 0 else 0,
+            denied=windows[denied_idx] if denied_idx >= 0 else None,
+            counts=counts,
+            ttls=[max(math.ceil(t / 1000), 0) for t in pttls],
+        )
+
+    async def hit(self, windows: Sequence[Window], cost: int = 1) -> RateLimitResult:
+        """Count ``cost`` against every window, or none of them if any would overflow."""
+        return await self._run(windows, cost, dry=False)
+
+    async def peek(self, windows: Sequence[Window], cost: int = 1) -> RateLimitResult:
+        """Would ``hit`` succeed? Nothing is counted."""
+        return await self._run(windows, cost, dry=True)
@@ -1,24 +1,190 @@
 """Async Redis client wrapper for rate-limiting & caching."""
 
-from typing import Optional
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Optional, Set
 
 import redis.asyncio as aioredis
+from redis.exceptions import ConnectionError as RedisConnectionError, TimeoutError as RedisTimeoutError
+from redis.asyncio.cluster import ClusterNode, RedisCluster
+from redis.asyncio.sentinel import Sentinel
+from redis.crc import key_slot
 
+from app.core.circuit_breaker import CLOSED, CircuitBreaker
 from app.core.config import settings
+from app.core.memory_store import LOCAL_SCRIPTS, MemoryStore, UnregisteredScriptError
+from app.core.near_cache import MISSING, NearCache
+
+logger = logging.getLogger(__name__)
+
+INVALIDATE_CHANNEL = "__redis__:invalidate"
+
+# Errors that mean "Redis is unreachable", as opposed to a bad command.
+OUTAGE_ERRORS = (RedisConnectionError, RedisTimeoutError, ConnectionError, TimeoutError, OSError)
+
+
+def hash_tag(value: Any) -> str:
+    """``{value}`` — keys sharing a tag land on one Redis Cluster slot."""
+    return f"{{{value}}}"
+
+
+def _nodes(spec: str) -> list[tuple[str, int]]:
+    nodes = []
+    for entry in filter(None, (e.strip() for e in spec.split(","))):
+        host, _, port = entry.rpartition(":")
+        nodes.append((host, int(port)))
+    return nodes or [(settings.REDIS_HOST, settings.REDIS_PORT)]
+
+
+class _AutoPipeline:
+    """Batches commands issued within one event-loop tick into a single pipeline.
+
+    The first queued command schedules a flush with ``call_soon``; every
+    coroutine that runs before that callback joins the same round trip.
+    """
+
+    def __init__(self, client: aioredis.Redis, max_batch: int) -> None:
+        self.client = client
+        self.max_batch = max(max_batch, 1)
+        self._queue: list[tuple[str, tuple, dict, asyncio.Future]] = []
+        self._scheduled = False
+        self._inflight: set[asyncio.Task] = set()
+
+    def submit(self, name: str, args: tuple, kwargs: dict) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._queue.append((name, args, kwargs, fut))
+        if len(self._queue) >= self.max_batch:
+            self._flush()
+        elif not self._scheduled:
+            self._scheduled = True
+            loop.call_soon(self._flush)
+        return fut
+
+    def _flush(self) -> None:
+        self._scheduled = False
+        if not self._queue:
+            return
+        batch, self._queue = self._queue, []
+        task = asyncio.ensure_future(self._execute(batch))
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    async def _execute(self, batch: list[tuple[str, tuple, dict, asyncio.Future]]) -> None:
+        queued: list[asyncio.Future] = []
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for name, args, kwargs, fut in batch:
+                try:
+                    getattr(pipe, name)(*args, **kwargs)
+                except Exception as exc:
+                    # Rejected while queuing (e.g. DataError): only this command fails.
+                    if not fut.done():
+                        fut.set_exception(exc)
+                    continue
+                queued.append(fut)
+            results = await pipe.execute(raise_on_error=False) if queued else []
+        except Exception as exc:
+            for *_, fut in batch:
+                if not fut.done():
+                    fut.set_exception(exc)
+            return
+        except BaseException:
+            for *_, fut in batch:
+                fut.cancel()
+            raise
+        for fut, res in zip(queued, results):
+            if fut.done():
+                continue
+            if isinstance(res, Exception):
+                fut.set_exception(res)
+            else:
+                fut.set_result(res)
 
 
 class RedisClient:
-    def __init__(self) -> None:
+    """Redis behind a circuit breaker, with an in-process ``MemoryStore`` fallback.
+
+    With ``fallback`` on, commands that hit an outage — and every command
+    while the circuit is open — are answered by the local store, so limits
+    and caches degrade to per-worker state instead of failing requests.
+    """
+
+    def __init__(self, auto_pipeline: Optional[bool] = None, fallback: Optional[bool] = None) -> None:
         self._client: Optional[aioredis.Redis] = None
+        self._scripts: dict[str, Any] = {}
+        self.auto_pipeline = settings.REDIS_AUTO_PIPELINE if auto_pipeline is None else auto_pipeline
+        self._pipeline: Optional[_AutoPipeline] = None
+        self.fallback = settings.REDIS_FALLBACK if fallback is None else fallback
+        self.memory = MemoryStore(settings.REDIS_FALLBACK_SIZE)
+        # Durable writes Redis has not taken yet, replayed in order (see durable).
+        self._replay: deque[tuple[str, Callable[[Any], Awaitable[Any]]]] = deque()
+        self._replay_lock = asyncio.Lock()
+        self.breaker = CircuitBreaker(
+            "Redis",
+            failures=settings.REDIS_BREAKER_FAILURES,
+            slow_ms=settings.REDIS_BREAKER_SLOW_MS,
+            reset_seconds=settings.REDIS_BREAKER_RESET_SECONDS,
+        )
+        self.near_cache = NearCache(
+            settings.REDIS_NEAR_CACHE_SIZE if settings.REDIS_NEAR_CACHE else 0,
+            tuple(p.strip() for p in settings.REDIS_NEAR_CACHE_PREFIXES.split(",") if p.strip()),
+        )
+
+    @property
+    def degraded(self) -> bool:
+        """True while commands are being answered from the local store."""
+        return self.fallback and (self._client is None or self.breaker.state != CLOSED)
+
+    @property
+    def is_cluster(self) -> bool:
+        return isinstance(self._client, RedisCluster)
 
     async def connect(self) -> None:
-        self._client = aioredis.from_url(
-            settings.REDIS_URL, encoding="utf-8", decode_responses=True
-        )
+        password = settings.REDIS_PASSWORD or None
+        timeouts = {
+            "socket_timeout": settings.REDIS_SOCKET_TIMEOUT_MS / 1000,
+            "socket_connect_timeout": settings.REDIS_SOCKET_TIMEOUT_MS / 1000,
+        }
+        if settings.REDIS_MODE == "sentinel":
+            sentinel = Sentinel(
+                _nodes(settings.REDIS_NODES),
+                sentinel_kwargs={"password": settings.REDIS_SENTINEL_PASSWORD or None},
+                password=password,
+                encoding="utf-8",
+                decode_responses=True,
+                **timeouts,
+            )
+            self._client = sentinel.master_for(settings.REDIS_SENTINEL_MASTER)
+        elif settings.REDIS_MODE == "cluster":
+            self._client = RedisCluster(
+                startup_nodes=[ClusterNode(h, p) for h, p in _nodes(settings.REDIS_NODES)],
+                password=password,
+                encoding="utf-8",
+                decode_responses=True,
+                **timeouts,
+            )
+            await self._route(self._client.initialize, lambda: None)
+        else:
+            self._client = aioredis.from_url(
+                settings.REDIS_URL, encoding="utf-8", decode_responses=True, **timeouts
+            )
 
     async def disconnect(self) -> None:
         if self._client:
-            await self._client.close()
+            await self._client.aclose()
+        self._pipeline = None
+
+    def slot_groups(self, keys: list[str]) -> list[list[int]]:
+        """Indexes of ``keys`` grouped by cluster slot; one group outside cluster mode."""
+        if not self.is_cluster:
+            return [list(range(len(keys)))]
+        groups: dict[int, list[int]] = {}
+        for i, k in enumerate(keys):
+            groups.setdefault(key_slot(k.encode()), []).append(i)
+        return list(groups.values())
 
     @property
     def client(self) -> aioredis.Redis:
@@ -26,37 +192,308 @@ class RedisClient:
             raise RuntimeError("Redis not connected")
         return self._client
 
+    async def _route(self, remote: Callable[[], Awaitable[Any]], local: Callable[[], Any]) -> Any:
+        """Run ``remote`` through the breaker, or ``local`` when Redis is out and fallback is on."""
+        return (await self._route_ex(remote, local))[0]
+
+    async def _route_ex(self, remote: Callable[[], Awaitable[Any]], local: Callable[[], Any]) -> tuple[Any, bool]:
+        """``_route`` that also says who answered: ``(result, True)`` only if Redis did.
+
+        ``degraded`` is not enough to tell: an outage error answers locally
+        while the breaker is still counting failures.
+        """
+        if not self.fallback:
+            await self._replay_pending()
+            return await remote(), True
+        if self._client is None or not self.breaker.allow():
+            return local(), False
+        start = time.monotonic()
+        try:
+            await self._replay_pending()
+            result = await remote()
+        except OUTAGE_ERRORS as exc:
+            self.breaker.failure(exc)
+            logger.debug("Redis call served locally: %s", exc)
+            return local(), False
+        except Exception:
+            # Redis answered (e.g. ResponseError): the call failed, the server did not.
+            self.breaker.record(time.monotonic() - start)
+            raise
+        except BaseException:
+            self.breaker.abandon()
+            raise
+        self.breaker.record(time.monotonic() - start)
+        return result, True
+
+    async def _call(self, name: str, *args: Any, **kwargs: Any) -> Any:
+        return await self._route(
+            lambda: self._remote(name, args, kwargs),
+            lambda: getattr(self.memory, name)(*args, **kwargs),
+        )
+
+    async def fetch(self, name: str, *args: Any, **kwargs: Any) -> tuple[Any, bool]:
+        """One command, and whether Redis itself answered it (False: the local store did)."""
+        return await self._route_ex(
+            lambda: self._remote(name, args, kwargs),
+            lambda: getattr(self.memory, name)(*args, **kwargs),
+        )
+
+    async def fetch_remote(self, name: str, *args: Any, **kwargs: Any) -> Any:
+        """One command answered by Redis itself, ``None`` instead of the local store's answer.
+
+        For data the local store has no copy of, such as sets managed directly
+        in Redis: an empty local answer would read as "nothing there".
+        """
+        return await self._route(lambda: self._remote(name, args, kwargs), lambda: None)
+
+    # Durable writes
+    async def durable(
+        self, label: str, op: Callable[[Any], Awaitable[Any]], local: Callable[[], Any] = lambda: None
+    ) -> Any:
+        """A write that must reach Redis (revocations, invalidations), even if not right now.
+
+        ``op`` gets the raw client. When Redis cannot take it, ``local`` is
+        applied to the local store and ``op`` is logged and queued; the queue
+        is replayed in order before the next command that reaches Redis, and
+        by ``replay_writes``.
+        """
+        try:
+            result, remote = await self._route_ex(lambda: op(self.client), local)
+        except OUTAGE_ERRORS as exc:  # fallback off
+            logger.debug("Redis %s failed: %s", label, exc)
+            result, remote = None, False
+        if not remote:
+            if len(self._replay) >= settings.REDIS_REPLAY_MAX:
+                dropped, _ = self._replay.popleft()
+                logger.error("Redis replay queue full — dropped a queued %s", dropped)
+            self._replay.append((label, op))
+            logger.warning("Redis %s not delivered — queued for replay (%d pending)", label, len(self._replay))
+        return result
+
+    async def _replay_pending(self) -> None:
+        if not self._replay:
+            return
+        async with self._replay_lock:
+            while self._replay:
+                label, op = self._replay[0]
+                try:
+                    await op(self.client)
+                except OUTAGE_ERRORS:
+                    raise
+                except Exception as exc:
+                    logger.error("Redis replay of %s failed: %s", label, exc)
+                self._replay.popleft()
+            logger.info("Redis queued writes replayed")
+
+    async def replay_writes(self) -> None:
+        """Background task: deliver queued durable writes once Redis is back, even if idle."""
+        while True:
+            await asyncio.sleep(1)
+            if self._replay and self._client is not None:
+                try:
+                    await self._route(self._replay_pending, lambda: None)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as exc:
+                    logger.debug("Redis replay deferred: %s", exc)
+
+    @property
+    def pending_writes(self) -> int:
+        return len(self._replay)
+
+    async def _remote(self, name: str, args: tuple, kwargs: dict) -> Any:
+        """Run one command, joining the current tick's pipeline when auto-pipelining is on."""
+        client = self.client
+        # Cluster pipelines cannot split multi-key commands across slots.
+        if not self.auto_pipeline or (self.is_cluster and name in ("delete", "mget")):
+            return await getattr(client, name)(*args, **kwargs)
+        if self._pipeline is None or self._pipeline.client is not client:
+            self._pipeline = _AutoPipeline(client, settings.REDIS_PIPELINE_MAX_BATCH)
+        return await self._pipeline.submit(name, args, kwargs)
+
+    # Near-cache
+    def _touch(self, *keys: str) -> None:
+        """Drop this worker's near-cached copies right away; Redis tells the other workers."""
+        near = self.near_cache
+        if near.live:
+            tracked = [k for k in keys if k.startswith(near.prefixes)]
+            if tracked:
+                near.invalidate(tracked)
+
+    async def track_invalidations(self) -> None:
+        """Background task: keep the near-cache coherent via CLIENT TRACKING (BCAST, RESP2 redirect).
+
+        One dedicated connection subscribes to the invalidation channel, a
+        second one turns tracking on and redirects to it. Whenever either
+        drops, the near-cache is emptied and disabled until both are back.
+        """
+        if not self.near_cache.maxsize:
+            return
+        delay = 1
+        while True:
+            conns = []
+            try:
+                if self.is_cluster:
+                    logger.info("Redis near-cache is not available in cluster mode")
+                    return
+                pool = self.client.connection_pool
+                for _ in range(2):
+                    conn = pool.make_connection()
+                    conn.socket_timeout = None
+                    await conn.connect()
+                    conns.append(conn)
+                listener, tracker = conns
+                await listener.send_command("CLIENT", "ID")
+                client_id = await listener.read_response()
+                await listener.send_command("SUBSCRIBE", INVALIDATE_CHANNEL)
+                await listener.read_response()
+                args = ["CLIENT", "TRACKING", "ON", "REDIRECT", client_id, "BCAST"]
+                for prefix in self.near_cache.prefixes:
+                    args += ["PREFIX", prefix]
+                await tracker.send_command(*args)
+                await tracker.read_response()
+                self.near_cache.reset(live=True)
+                logger.info("Redis near-cache tracking %s", ", ".join(self.near_cache.prefixes))
+                delay = 1
+                await asyncio.gather(self._read_invalidations(listener), self._keep_alive(tracker))
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("Redis near-cache stream: %s — retrying in %ds", exc, delay)
+            finally:
+                self.near_cache.reset(live=False)
+                for conn in conns:
+                    await conn.disconnect()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30)
+
+    async def _read_invalidations(self, listener: Any) -> None:
+        while True:
+            msg = await listener.read_response()
+            if isinstance(msg, list) and len(msg) == 3 and msg[0] == "message":
+                self.near_cache.invalidate(msg[2])
+
+    @staticmethod
+    async def _keep_alive(tracker: Any) -> None:
+        # Tracking ends silently with the tracking connection; a failed PING surfaces that.
+        while True:
+            await asyncio.sleep(10)
+            await tracker.send_command("PING")
+            await tracker.read_response()
+
     # helpers
     async def get(self, key: str) -> Optional[str]:
-        return await self.client.get(key)
+        near = self.near_cache
+        if not near.tracks(key) or self.degraded:
+            return await self._call("get", key)
+        value = near.lookup(key)
+        if value is not MISSING:
+            return value
+        version = near.version
+        value, remote = await self.fetch("get", key)
+        if remote:
+            # Only what Redis said; a local answer is not covered by its invalidations.
+            near.fill(key, value, version)
+        return value
 
     async def set(self, key: str, value: str, ex: Optional[int] = None) -> None:
-        await self.client.set(key, value, ex=ex)
+        self._touch(key)
+        await self._call("set", key, value, ex=ex)
+
+    async def setex(self, key: str, seconds: int, value: str, durable: bool = False) -> None:
+        self._touch(key)
+        if durable:
+            await self.durable("setex", lambda c: c.setex(key, seconds, value), lambda: self.memory.setex(key, seconds, value))
+            return
+        await self._call("setex", key, seconds, value)
 
-    async def setex(self, key: str, seconds: int, value: str) -> None:
-        await self.client.setex(key, seconds, value)
+    async def set_nx(self, key: str, value: str, seconds: int) -> bool:
+        """SET NX EX — True if this call created the key."""
+        self._touch(key)
+        return bool(await self._call("set", key, value, ex=seconds, nx=True))
 
-    async def incr(self, key: str) -> int:
-        return await self.client.incr(key)
+    async def incr(self, key: str, durable: bool = False) -> Optional[int]:
+        """``durable`` — see ``durable``; returns None if the increment was only queued."""
+        self._touch(key)
+        if durable:
+            return await self.durable("incr", lambda c: c.incr(key), lambda: None)
+        return await self._call("incr", key)
 
     async def expire(self, key: str, seconds: int) -> None:
-        await self.client.expire(key, seconds)
+        self._touch(key)
+        await self._call("expire", key, seconds)
 
-    async def delete(self, key: str) -> None:
-        await self.client.delete(key)
+    async def delete(self, *keys: str, durable: bool = False) -> None:
+        self._touch(*keys)
+        if durable:
+            await self.durable("delete", lambda c: c.delete(*keys), lambda: self.memory.delete(*keys))
+            return
+        await self._call("delete", *keys)
 
     async def exists(self, key: str) -> bool:
-        return (await self.client.exists(key)) > 0
+        return (await self._call("exists", key)) > 0
 
     async def ttl(self, key: str) -> int:
-        return await self.client.ttl(key)
+        return await self._call("ttl", key)
+
+    async def mget(self, *keys: str) -> list[Optional[str]]:
+        return await self._call("mget", keys)
+
+    async def sadd(self, key: str, *members: str) -> int:
+        return await self._call("sadd", key, *members)
+
+    async def smembers(self, key: str) -> Set[str]:
+        return await self._call("smembers", key)
+
+    async def publish(self, channel: str, message: str, durable: bool = False) -> int:
+        if durable:
+            return await self.durable("publish", lambda c: c.publish(channel, message)) or 0
+        return await self._call("publish", channel, message)
+
+    async def eval_script(self, source: str, keys: list[str], args: list) -> Any:
+        """EVALSHA with automatic script loading; scripts are registered once per client.
+
+        Every script needs a ``local_script`` equivalent. It is checked on each
+        call, not only in degraded mode, so a missing one fails the first test
+        instead of the first outage.
+        """
+        if source not in LOCAL_SCRIPTS:
+            raise UnregisteredScriptError("Lua script has no local_script equivalent")
+        self._touch(*keys)
+        return await self._route(
+            lambda: self._run_script(source, keys, args), lambda: self.memory.eval_script(source, keys, args)
+        )
+
+    async def eval_remote(self, source: str, keys: list[str], args: list) -> tuple[Any, bool]:
+        """A script only the shared Redis can run: ``(result, True)``, or ``(None, False)`` if it did not.
+
+        For scripts with no meaningful local equivalent, such as merging
+        workers' counts; the caller keeps its data and retries.
+        """
+        self._touch(*keys)
+        return await self._route_ex(lambda: self._run_script(source, keys, args), lambda: None)
+
+    async def _run_script(self, source: str, keys: list[str], args: list) -> Any:
+        script = self._scripts.get(source)
+        if script is None or script.registered_client is not self.client:
+            script = self._scripts[source] = self.client.register_script(source)
+        return await script(keys=keys, args=args)
 
     async def incr_with_ttl(self, key: str, ttl: int) -> int:
-        pipe = self.client.pipeline()
-        pipe.incr(key)
-        pipe.expire(key, ttl)
-        results = await pipe.execute()
-        return results[0]
+        self._touch(key)
+        async def remote() -> int:
+            pipe = self.client.pipeline()
+            pipe.incr(key)
+            pipe.expire(key, ttl)
+            results = await pipe.execute()
+            return results[0]
+
+        def local() -> int:
+            count = self.memory.incr(key)
+            self.memory.expire(key, ttl)
+            return count
+
+        return await self._route(remote, local)
 
 
 redis_client = RedisClient()
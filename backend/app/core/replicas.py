@@ -0,0 +1,144 @@
+"""Read replicas — weighted choice among healthy replicas, primary fallback on lag."""
+
+import asyncio
+import logging
+import random
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Seconds the replica is behind the primary. "Replayed all it received" only
+# means caught up while WAL is streaming in; with the receiver down, the age of
+# the last replayed transaction is the lag (NULL if it never replayed one).
+# Reading pg_stat_wal_receiver.status needs pg_read_all_stats (or pg_monitor).
+_LAG_SQL = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() THEN 0 "
+    "WHEN NOT EXISTS (SELECT 1 FROM pg_stat_wal_receiver WHERE status = 'streaming') "
+    "THEN EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) "
+    "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+@dataclass
+class Replica:
+    name: str
+    engine: AsyncEngine
+    sessions: async_sessionmaker
+    weight: int = 1
+    healthy: bool = False
+    lag: Optional[float] = None
+    error: Optional[str] = field(default=None, repr=False)
+
+
+def parse_replicas(spec: str) -> list[tuple[str, int, int]]:
+    """``host:port[:weight],…`` → ``[(host, port, weight), …]``."""
+    out = []
+    for item in (s.strip() for s in spec.split(",")):
+        if not item:
+            continue
+        host, _, rest = item.partition(":")
+        port, _, weight = rest.partition(":")
+        out.append((host, int(port or settings.DATABASE_PORT), max(int(weight or 1), 0)))
+    return out
+
+
+class ReplicaRouter:
+    """Picks a replica for each read session.
+
+    A background check measures every replica's replay lag; replicas that
+    fail the check or lag more than ``max_lag`` seconds get no reads until a
+    later check passes. ``pick`` returns ``None`` — read from the primary —
+    when no replica qualifies. Replicas start unhealthy until first checked.
+    """
+
+    def __init__(self, replicas: list[Replica], max_lag: float, check_timeout: float = 2.0) -> None:
+        self.replicas = replicas
+        self.max_lag = max_lag
+        self.check_timeout = check_timeout
+        self.primary_fallbacks = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.replicas)
+
+    def pick(self) -> Optional[Replica]:
+        ready = [r for r in self.replicas if r.healthy and r.weight > 0]
+        if not ready:
+            if self.replicas:
+                self.primary_fallbacks += 1
+            return None
+        return random.choices(ready, weights=[r.weight for r in ready])[0]
+
+    async def _lag(self, replica: Replica) -> float:
+        async with replica.engine.connect() as conn:
+            lag = (await conn.execute(_LAG_SQL)).scalar()
+        if lag is None:
+            raise RuntimeError("WAL receiver not streaming and nothing replayed")
+        return float(lag)
+
+    async def check(self, replica: Replica) -> None:
+        try:
+            # Connecting counts against the timeout too: an unreachable host must not stall startup.
+            lag = await asyncio.wait_for(self._lag(replica), self.check_timeout)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            if replica.healthy or replica.error is None:
+                logger.warning("Replica %s unavailable: %s", replica.name, exc)
+            replica.healthy, replica.lag, replica.error = False, None, str(exc)
+            return
+        ok = lag <= self.max_lag
+        if ok != replica.healthy:
+            logger.info("Replica %s %s (lag %.1fs)", replica.name, "in rotation" if ok else "lagging, reads go to primary", lag)
+        replica.healthy, replica.lag, replica.error = ok, lag, None
+
+    async def check_all(self) -> None:
+        await asyncio.gather(*(self.check(r) for r in self.replicas))
+
+    async def watch(self) -> None:
+        """Background task: re-check every replica periodically."""
+        while True:
+            await self.check_all()
+            await asyncio.sleep(settings.DB_REPLICA_CHECK_SECONDS)
+
+    async def dispose(self) -> None:
+        for r in self.replicas:
+            await r.engine.dispose()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "max_lag_seconds": self.max_lag,
+            "primary_fallbacks": self.primary_fallbacks,
+            "replicas": [
+                {"name": r.name, "weight": r.weight, "healthy": r.healthy, "lag_seconds": r.lag}
+                for r in self.replicas
+            ],
+        }
+
+
+def _replica(host: str, port: int, weight: int) -> Replica:
+    pwd = f":{settings.DATABASE_PASSWORD}" if settings.DATABASE_PASSWORD else ""
+    engine = create_async_engine(
+        f"postgresql+asyncpg://{settings.DATABASE_USER}{pwd}@{host}:{port}/{settings.DATABASE_NAME}",
+        pool_size=settings.DB_REPLICA_POOL_SIZE,
+        max_overflow=settings.DB_REPLICA_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_pre_ping=True,
+        pool_recycle=3600,
+        connect_args={"prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE},
+    )
+    sessions = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False, autoflush=False)
+    return Replica(name=f"{host}:{port}", engine=engine, sessions=sessions, weight=weight)
+
+
+replica_router = ReplicaRouter(
+    [_replica(*r) for r in parse_replicas(settings.DB_REPLICAS)],
+    max_lag=settings.DB_REPLICA_MAX_LAG_SECONDS,
+)
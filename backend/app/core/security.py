@@ -5,24 +5,50 @@ import logging
 import secrets
 from datetime import datetime, timedelta, timezone
 
-import bcrypt
 from jose import JWTError, jwt
 
 from app.core.config import settings
+from app.core.hashing import hashing_executor
+from app.core.jwks import KeyRing
+from app.core.passwords import Argon2idScheme, PasswordEngine, calibrate
+from app.core.token_cache import HS256Verifier, VerifiedTokenCache
 
 logger = logging.getLogger(__name__)
 
 
 # Password 
+password_engine = PasswordEngine(settings.PASSWORD_HASH_SCHEME)
+password_engine.use(Argon2idScheme(memory_cost=settings.ARGON2_MEMORY_KB))
+
+
 def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=12)).decode()
+    return password_engine.hash(password)
 
 
 def verify_password(plain: str, hashed: str) -> bool:
-    try:
-        return bcrypt.checkpw(plain.encode(), hashed.encode())
-    except Exception:
+    return password_engine.verify(plain, hashed)
+
+
+def password_needs_rehash(hashed: str) -> bool:
+    return password_engine.needs_rehash(hashed)
+
+
+async def hash_password_async(password: str) -> str:
+    return await hashing_executor.run(password_engine.active.hash, password)
+
+
+async def verify_password_async(plain: str, hashed: str) -> bool:
+    scheme = password_engine.scheme_for(hashed)
+    if not scheme:
         return False
+    return await hashing_executor.run(scheme.verify, plain, hashed)
+
+
+async def calibrate_password_hashing() -> None:
+    """Tune the active scheme's cost on the pool workers that will run it."""
+    floor = settings.BCRYPT_MIN_ROUNDS if password_engine.default == "bcrypt" else settings.ARGON2_MIN_TIME_COST
+    tuned = await hashing_executor.run(calibrate, password_engine.active, settings.PASSWORD_HASH_TARGET_MS, floor)
+    password_engine.use(tuned)
 
 
 # Tokens 
@@ -46,12 +72,24 @@ def hash_token(token: str) -> str:
 # JWT 
 def _jwt_encode(data: dict, secret: str, token_type: str, delta: timedelta) -> str:
     now = datetime.now(timezone.utc)
-    payload = {**data, "exp": now + delta, "iat": now, "type": token_type}
+    # Sub-second iat, so a token issued right after a revocation outlives it (see user_cache).
+    payload = {**data, "exp": now + delta, "iat": now.timestamp(), "type": token_type}
     return jwt.encode(payload, secret, algorithm=settings.JWT_ALGORITHM)
 
 
+access_keyring: KeyRing | None = (
+    KeyRing.from_spec(settings.JWT_ACCESS_ALGORITHM, settings.JWT_SIGNING_KEYS, allow_ephemeral=not settings.is_production)
+    if settings.JWT_ACCESS_ALGORITHM != "HS256"
+    else None
+)
+
+
 def create_access_token(data: dict, expires_delta: timedelta | None = None) -> str:
     delta = expires_delta or timedelta(minutes=settings.JWT_ACCESS_EXPIRATION_MINUTES)
+    if access_keyring:
+        now = datetime.now(timezone.utc)
+        exp = int((now + delta).timestamp())
+        return access_keyring.encode({**data, "exp": exp, "iat": now.timestamp(), "type": "access"})
     return _jwt_encode(data, settings.JWT_ACCESS_SECRET, "access", delta)
 
 
@@ -70,8 +108,22 @@ def _jwt_decode(token: str, secret: str, expected_type: str) -> dict | None:
         return None
 
 
+_access_verifier = HS256Verifier(settings.JWT_ACCESS_SECRET)
+access_token_cache = VerifiedTokenCache(settings.JWT_VERIFY_CACHE_SIZE)
+
+
 def decode_access_token(token: str) -> dict | None:
-    return _jwt_decode(token, settings.JWT_ACCESS_SECRET, "access")
+    if not access_keyring and settings.JWT_ALGORITHM != "HS256":
+        return _jwt_decode(token, settings.JWT_ACCESS_SECRET, "access")
+
+    payload = access_token_cache.get(token)
+    if payload is not None:
+        return payload
+    payload = access_keyring.decode(token) if access_keyring else _access_verifier.verify(token)
+    if not payload or payload.get("type") != "access":
+        return None
+    access_token_cache.put(token, payload)
+    return payload
 
 
 def decode_refresh_token(token: str) -> dict | None:
@@ -0,0 +1,51 @@
+"""Signed admin session cookies — compact, versioned, HMAC-SHA256 with ADMIN_SESSION_SECRET."""
+
+import base64
+import hashlib
+import hmac
+import json
+import time
+from typing import Optional
+
+from app.core.token_cache import b64url_decode
+
+VERSION = "v1"
+
+
+class SignedSessionCodec:
+    """``v1.<payload>.<mac>`` where payload is base64url JSON claims.
+
+    The codec only proves integrity and expiry; revocation (denylist,
+    per-admin generation) is checked by the caller.
+    """
+
+    def __init__(self, secret: str) -> None:
+        self._mac = hmac.new(secret.encode(), digestmod=hashlib.sha256)
+
+    def _sign(self, signing_input: str) -> bytes:
+        mac = self._mac.copy()
+        mac.update(signing_input.encode())
+        return mac.digest()
+
+    def encode(self, claims: dict) -> str:
+        body = base64.urlsafe_b64encode(json.dumps(claims, separators=(",", ":")).encode()).rstrip(b"=").decode()
+        signing_input = f"{VERSION}.{body}"
+        sig = base64.urlsafe_b64encode(self._sign(signing_input)).rstrip(b"=").decode()
+        return f"{signing_input}.{sig}"
+
+    def decode(self, value: str, now: Optional[float] = None) -> Optional[dict]:
+        parts = value.split(".")
+        if len(parts) != 3 or parts[0] != VERSION:
+            return None
+        try:
+            if not hmac.compare_digest(self._sign(f"{parts[0]}.{parts[1]}"), b64url_decode(parts[2])):
+                return None
+            claims = json.loads(b64url_decode(parts[1]))
+        except ValueError:
+            return None
+        if not isinstance(claims, dict):
+            return None
+        exp = claims.get("exp")
+        if not isinstance(exp, (int, float)) or exp <= (time.time() if now is None else now):
+            return None
+        return claims
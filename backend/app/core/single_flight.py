@@ -0,0 +1,139 @@
+"""Single-flight — concurrent loads of the same key share one in-flight call."""
+
+import asyncio
+import logging
+import secrets
+import time
+from typing import Any, Awaitable, Callable, TypeVar
+
+from app.core.config import settings
+from app.core.memory_store import MemoryStore, local_script
+from app.core.redis import RedisClient, redis_client
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Delete the lock only if this caller still owns it.
+_RELEASE_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+  return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+@local_script(_RELEASE_LUA)
+def _local_release(store: MemoryStore, keys: list, args: list) -> int:
+    return store.delete(keys[0]) if store.get(keys[0]) == args[0] else 0
+
+
+class SingleFlight:
+    """Per-worker map of key → running future; followers await the leader's result.
+
+    With ``shared`` enabled, the leader also takes a short Redis lock
+    (``sf:{key}``). A leader in another worker that loses the lock waits for it
+    to clear — or ``wait_ms`` to pass — and then runs its load, which by then
+    normally finds the value the winner cached. Loaders must therefore read
+    their caches before the database.
+    """
+
+    def __init__(self, redis: RedisClient, shared: bool = False, lock_seconds: int = 5, wait_ms: int = 1000) -> None:
+        self.redis = redis
+        self.shared = shared
+        self.lock_seconds = lock_seconds
+        self.wait_ms = wait_ms
+        self.leaders = 0
+        self.coalesced = 0
+        self._calls: dict[str, asyncio.Future] = {}
+
+    async def do(self, key: str, load: Callable[[], Awaitable[T]], shared: bool = True) -> T:
+        """Run ``load`` once for all concurrent callers of ``key``.
+
+        ``shared=False`` keeps the call worker-local even in Redis mode (for
+        loads every worker must do itself, like its own catalog).
+        """
+        while True:
+            fut = self._calls.get(key)
+            if fut is None:
+                break
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(fut)
+            except asyncio.CancelledError:
+                # The leader was cancelled, not us: take over the load.
+                if fut.cancelled() and not asyncio.current_task().cancelling():
+                    continue
+                raise
+
+        fut = asyncio.get_running_loop().create_future()
+        self._calls[key] = fut
+        self.leaders += 1
+        try:
+            if self.shared and shared:
+                result = await self._locked(key, load)
+            else:
+                result = await load()
+        except asyncio.CancelledError:
+            fut.cancel()
+            raise
+        except BaseException as exc:
+            fut.set_exception(exc)
+            fut.exception()  # retrieved: followers may not exist
+            raise
+        else:
+            fut.set_result(result)
+            return result
+        finally:
+            if self._calls.get(key) is fut:
+                del self._calls[key]
+
+    def forget(self, key: str) -> None:
+        """Make the next caller of ``key`` start a new load instead of joining the running one.
+
+        Call after a write: a load already in flight may have read the old data.
+        Callers that joined it still get its result.
+        """
+        self._calls.pop(key, None)
+
+    async def _locked(self, key: str, load: Callable[[], Awaitable[T]]) -> T:
+        lock = f"sf:{key}"
+        token = secrets.token_hex(8)
+        try:
+            owner = await self.redis.set_nx(lock, token, self.lock_seconds)
+        except Exception as exc:
+            logger.debug("Single-flight lock skipped: %s", exc)
+            return await load()
+        if not owner:
+            await self._wait(lock)
+            return await load()
+        try:
+            return await load()
+        finally:
+            try:
+                await self.redis.eval_script(_RELEASE_LUA, [lock], [token])
+            except Exception as exc:
+                logger.debug("Single-flight lock not released: %s", exc)
+
+    async def _wait(self, lock: str) -> None:
+        deadline = time.monotonic() + self.wait_ms / 1000
+        delay = 0.005
+        while time.monotonic() < deadline:
+            await asyncio.sleep(delay)
+            try:
+                if not await self.redis.exists(lock):
+                    return
+            except Exception:
+                return
+            delay = min(delay * 2, 0.05)
+
+    def stats(self) -> dict[str, Any]:
+        return {"in_flight": len(self._calls), "leaders": self.leaders, "coalesced": self.coalesced}
+
+
+single_flight = SingleFlight(
+    redis_client,
+    shared=settings.SINGLE_FLIGHT_REDIS,
+    lock_seconds=settings.SINGLE_FLIGHT_LOCK_SECONDS,
+    wait_ms=settings.SINGLE_FLIGHT_WAIT_MS,
+)
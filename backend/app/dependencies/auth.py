@@ -5,16 +5,16 @@ from uuid import UUID
 
 from fastapi import Cookie, Depends, Header, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
+from app.core.ip_filter import forwarded_client_ip
 from app.core.redis import RedisClient, get_redis
 from app.core.security import decode_access_token
-from app.models.admin import Admin
-from app.models.admin_session import AdminSession
-from app.models.user import User
 from app.services.admin_auth_service import AdminAuthService
+from app.services.admin_session_cache import CachedAdmin, CachedSession
+from app.services.rbac import permission_catalog
+from app.services.user_cache import UserAuthRecord, user_auth_cache
 
 bearer_scheme = HTTPBearer(auto_error=False)
 
@@ -22,10 +22,7 @@ bearer_scheme = HTTPBearer(auto_error=False)
 # Helpers 
 
 async def get_client_ip(request: Request) -> str:
-    fwd = request.headers.get("X-Forwarded-For")
-    if fwd:
-        return fwd.split(",")[0].strip()
-    return request.client.host if request.client else "unknown"
+    return forwarded_client_ip(request.headers.get("X-Forwarded-For"), request.client.host if request.client else None)
 
 
 async def get_user_agent(request: Request) -> str:
@@ -37,7 +34,7 @@ async def get_user_agent(request: Request) -> str:
 async def get_current_user(
     creds: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
     db: AsyncSession = Depends(get_db),
-) -> User:
+) -> UserAuthRecord:
     if not creds:
         raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Token taqdim etilmagan")
 
@@ -45,7 +42,11 @@ async def get_current_user(
     if not payload or not payload.get("sub"):
         raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Noto'g'ri yoki muddati tugagan token")
 
-    user = (await db.execute(select(User).where(User.id == UUID(payload["sub"])))).scalar_one_or_none()
+    uid = UUID(payload["sub"])
+    if await user_auth_cache.is_revoked(uid, payload.get("iat")):
+        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Token bekor qilingan")
+
+    user = await user_auth_cache.get(uid, db)
     if not user:
         raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Foydalanuvchi topilmadi")
     if not user.is_active:
@@ -67,7 +68,7 @@ async def get_current_admin(
     token: str = Depends(get_admin_session_token),
     db: AsyncSession = Depends(get_db),
     redis: RedisClient = Depends(get_redis),
-) -> tuple[Admin, AdminSession]:
+) -> tuple[CachedAdmin, CachedSession]:
     svc = AdminAuthService(db, redis)
     ok, admin, session = await svc.validate_session(token)
     if not ok or not admin or not session:
@@ -77,9 +78,9 @@ async def get_current_admin(
 
 async def verify_csrf_token(
     request: Request,
-    admin_data: tuple[Admin, AdminSession] = Depends(get_current_admin),
+    admin_data: tuple[CachedAdmin, CachedSession] = Depends(get_current_admin),
     x_csrf_token: Optional[str] = Header(None),
-) -> tuple[Admin, AdminSession]:
+) -> tuple[CachedAdmin, CachedSession]:
     admin, session = admin_data
     if request.method in ("GET", "HEAD", "OPTIONS"):
         return admin, session
@@ -91,11 +92,13 @@ async def verify_csrf_token(
 # Permission check 
 
 def require_permission(name: str):
+    allowed = permission_catalog.compile(name)
+
     async def _check(
-        admin_data: tuple[Admin, AdminSession] = Depends(verify_csrf_token),
-    ) -> Admin:
+        admin_data: tuple[CachedAdmin, CachedSession] = Depends(verify_csrf_token),
+    ) -> CachedAdmin:
         admin, _ = admin_data
-        if not admin.has_permission(name):
+        if not allowed(admin):
             raise HTTPException(status.HTTP_403_FORBIDDEN, f"'{name}' ruxsati kerak")
         return admin
 
@@ -104,8 +107,8 @@ def require_permission(name: str):
 
 def require_super_admin():
     async def _check(
-        admin_data: tuple[Admin, AdminSession] = Depends(verify_csrf_token),
-    ) -> Admin:
+        admin_data: tuple[CachedAdmin, CachedSession] = Depends(verify_csrf_token),
+    ) -> CachedAdmin:
         admin, _ = admin_data
         if not admin.is_super_admin:
             raise HTTPException(status.HTTP_403_FORBIDDEN, "Faqat super admin uchun")
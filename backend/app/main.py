@@ -2,6 +2,7 @@
 Xavfsiz Backend Tizimi — FastAPI Application
 """
 
+import asyncio
 import logging
 import sys
 from contextlib import asynccontextmanager
@@ -19,10 +20,22 @@ if _root not in sys.path:
     sys.path.insert(0, _root)
 
 from app.api.v1.router import api_router
+from app.api.v1.endpoints.well_known import router as well_known_router
 from app.core.config import settings
 from app.core.database import Base, engine
+from app.core.hashing import HashingOverloadedError, hashing_executor
+from app.core.ip_filter import ip_filter
+from app.core.local_limiter import local_limiter
 from app.core.redis import redis_client
+from app.core.replicas import replica_router
+from app.core.security import calibrate_password_hashing
+from app.middleware.db_pool import DBPoolContextMiddleware
+from app.middleware.idempotency import IdempotencyMiddleware
+from app.middleware.ip_filter import IPFilterMiddleware
 from app.middleware.security import SecurityHeadersMiddleware
+from app.services.heavy_hitters import heavy_hitters
+from app.services.rbac import permission_catalog
+from app.services.user_cache import user_auth_cache
 
 logging.basicConfig(
     level=logging.DEBUG if settings.is_development else logging.INFO,
@@ -38,20 +51,44 @@ async def lifespan(app: FastAPI):
         async with engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
         log.info("Database ready")
+        await permission_catalog.load()
     except Exception as exc:
         log.error("DB error: %s", exc)
 
+    background: list[asyncio.Task] = []
     try:
         await redis_client.connect()
         log.info("Redis ready")
     except Exception as exc:
         log.warning(" Redis: %s", exc)
+    # Each task retries on its own, so they also start when Redis is down.
+    background.append(asyncio.create_task(user_auth_cache.listen()))
+    background.append(asyncio.create_task(permission_catalog.watch()))
+    background.append(asyncio.create_task(local_limiter.run()))
+    background.append(asyncio.create_task(ip_filter.watch()))
+    background.append(asyncio.create_task(redis_client.track_invalidations()))
+    background.append(asyncio.create_task(redis_client.replay_writes()))
+    background.append(asyncio.create_task(heavy_hitters.run()))
+    if replica_router.enabled:
+        await replica_router.check_all()
+        background.append(asyncio.create_task(replica_router.watch()))
+
+    hashing_executor.start()
+    if settings.PASSWORD_HASH_CALIBRATE:
+        try:
+            await calibrate_password_hashing()
+        except Exception as exc:
+            log.warning(" Hashing calibration: %s", exc)
 
     yield
 
     log.info("Shutting down …")
+    for task in background:
+        task.cancel()
+    hashing_executor.shutdown()
     await redis_client.disconnect()
     await engine.dispose()
+    await replica_router.dispose()
     log.info("Closed")
 
 
@@ -65,6 +102,14 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+# Labels DB pool checkouts with the route that made them.
+app.add_middleware(DBPoolContextMiddleware)
+# Replayed responses still pass through CORS and the security headers.
+app.add_middleware(
+    IdempotencyMiddleware,
+    redis=redis_client,
+    paths={"/api/auth/send-otp", "/api/admin/admins", "/api/admin/admins/"},
+)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[settings.FRONTEND_URL],
@@ -74,6 +119,8 @@ app.add_middleware(
     expose_headers=["X-CSRF-Token"],
 )
 app.add_middleware(SecurityHeadersMiddleware)
+# Added last, so it runs first.
+app.add_middleware(IPFilterMiddleware, ip_filter=ip_filter)
 
 
 @app.exception_handler(RequestValidationError)
@@ -85,6 +132,16 @@ async def validation_error(request: Request, exc: RequestValidationError) -> JSO
     return JSONResponse(content={"success": False, "message": "Validatsiya xatosi", "errors": errors}, status_code=status.HTTP_422_UNPROCESSABLE_ENTITY)
 
 
+@app.exception_handler(HashingOverloadedError)
+async def hashing_overloaded(request: Request, exc: HashingOverloadedError) -> JSONResponse:
+    log.warning("Hashing pool saturated (%d pending)", hashing_executor.pending)
+    return JSONResponse(
+        content={"success": False, "message": "Server band. Birozdan keyin qaytadan urinib ko'ring"},
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={"Retry-After": "1"},
+    )
+
+
 @app.exception_handler(Exception)
 async def global_error(request: Request, exc: Exception) -> JSONResponse:
     log.error("Unhandled: %s", exc, exc_info=True)
@@ -93,11 +150,19 @@ async def global_error(request: Request, exc: Exception) -> JSONResponse:
 
 
 app.include_router(api_router, prefix="/api")
+app.include_router(well_known_router)
 
 
 @app.get("/health", tags=["Health"])
 async def health() -> dict[str, Any]:
-    return {"status": "healthy", "version": "1.0.0", "environment": settings.ENVIRONMENT}
+    return {
+        "status": "healthy",
+        "version": "1.0.0",
+        "environment": settings.ENVIRONMENT,
+        "redis": "degraded" if redis_client.degraded else "ok",
+        "redis_near_cache": redis_client.near_cache.stats(),
+        "db_replicas": replica_router.stats() if replica_router.enabled else None,
+    }
 
 
 @app.get("/", tags=["Info"])
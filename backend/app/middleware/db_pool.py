@@ -0,0 +1,26 @@
+"""DB pool context middleware — lets pool events see which route checked out a connection."""
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.pool_monitor import request_scope
+
+
+class DBPoolContextMiddleware:
+    """Publishes the ASGI scope in a context variable for the pool monitor.
+
+    The route template is read from the scope lazily, after routing has
+    filled it in.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = request_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            request_scope.reset(token)
@@ -0,0 +1,162 @@
+"""Idempotency-Key middleware — the first response to a key is stored and replayed for retries."""
+
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import time
+from typing import Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.redis import RedisClient
+
+logger = logging.getLogger(__name__)
+
+HEADER = b"idempotency-key"
+# Credentials that scope a key to its caller
+_IDENTITY_HEADERS = (b"authorization", b"cookie")
+# Response headers worth replaying; cookies are deliberately not among them
+_REPLAY_HEADERS = {b"content-type", b"retry-after", b"x-csrf-token"}
+_PENDING = "pending"
+
+
+def _json_response(status: int, message: str) -> tuple[int, list, bytes]:
+    return status, [(b"content-type", b"application/json")], json.dumps({"success": False, "message": message}).encode()
+
+
+class IdempotencyMiddleware:
+    """Stores status, a few headers and the body of the first response per key.
+
+    Records are scoped to method, path, ``Idempotency-Key`` and the caller's
+    credentials; the request body's fingerprint must match. While the first
+    request is still running, duplicates poll the record instead of doing the
+    work again. 5xx responses and exceptions release the key so the client
+    can retry.
+    """
+
+    def __init__(self, app: ASGIApp, redis: RedisClient, paths: set[str]) -> None:
+        self.app = app
+        self.redis = redis
+        self.paths = paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope["headers"])
+        key = headers.get(HEADER)
+        if not key:
+            await self.app(scope, receive, send)
+            return
+        if len(key) > 255:
+            await self._send(send, *_json_response(400, "Idempotency-Key juda uzun"))
+            return
+
+        body = await self._read_body(receive)
+        receive = self._replay(body, receive)
+        identity = b"|".join(headers.get(h, b"") for h in _IDENTITY_HEADERS)
+        record_key = "idem:" + hashlib.sha256(b"\0".join([scope["path"].encode(), identity, key])).hexdigest()
+        fingerprint = hashlib.sha256(body).hexdigest()
+
+        deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+        while True:
+            pending = json.dumps({"state": _PENDING, "fp": fingerprint})
+            try:
+                first = await self.redis.set_nx(record_key, pending, settings.IDEMPOTENCY_LOCK_SECONDS)
+                raw = None if first else await self.redis.get(record_key)
+            except Exception as exc:
+                logger.warning("Idempotency unavailable, running request as-is: %s", exc)
+                await self.app(scope, receive, send)
+                return
+            if first:
+                await self._run_first(scope, receive, send, record_key, fingerprint)
+                return
+            # raw is None: the first attempt failed and released the key — try to take it again,
+            # within the same deadline (SET NX and GET may keep disagreeing, e.g. across a failover).
+            if raw is not None:
+                record = json.loads(raw)
+                if record["fp"] != fingerprint:
+                    await self._send(send, *_json_response(422, "Idempotency-Key boshqa so'rov uchun ishlatilgan"))
+                    return
+                if record["state"] != _PENDING:
+                    headers_out = [(bytes.fromhex(k), bytes.fromhex(v)) for k, v in record["headers"]]
+                    headers_out.append((b"idempotent-replayed", b"true"))
+                    await self._send(send, record["status"], headers_out, base64.b64decode(record["body"]))
+                    return
+            if time.monotonic() >= deadline:
+                await self._send(send, *_json_response(409, "So'rov hali bajarilmoqda. Birozdan keyin qaytadan urinib ko'ring"))
+                return
+            await asyncio.sleep(0.05)
+
+    async def _run_first(self, scope: Scope, receive: Receive, send: Send, record_key: str, fingerprint: str) -> None:
+        status: Optional[int] = None
+        kept: list[tuple[bytes, bytes]] = []
+        chunks: list[bytes] = []
+
+        async def capture(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                kept.extend((k, v) for k, v in message.get("headers", []) if k.lower() in _REPLAY_HEADERS)
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, capture)
+        except BaseException:
+            await self._release(record_key)
+            raise
+        if status is None or status >= 500:
+            await self._release(record_key)
+            return
+        record = {
+            "state": "done",
+            "fp": fingerprint,
+            "status": status,
+            "headers": [(k.hex(), v.hex()) for k, v in kept],
+            "body": base64.b64encode(b"".join(chunks)).decode(),
+        }
+        try:
+            await self.redis.setex(record_key, settings.IDEMPOTENCY_TTL_SECONDS, json.dumps(record))
+        except Exception as exc:
+            logger.warning("Idempotent response not stored: %s", exc)
+            await self._release(record_key)
+
+    async def _release(self, record_key: str) -> None:
+        try:
+            await self.redis.delete(record_key)
+        except Exception as exc:
+            logger.warning("Idempotency key not released: %s", exc)
+
+    @staticmethod
+    def _replay(body: bytes, receive: Receive) -> Receive:
+        """Hand the already-read body to the app once, then defer to the real channel."""
+        sent = False
+
+        async def replay() -> Message:
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        return replay
+
+    @staticmethod
+    async def _read_body(receive: Receive) -> bytes:
+        parts = []
+        while True:
+            message = await receive()
+            parts.append(message.get("body", b""))
+            if not message.get("more_body"):
+                return b"".join(parts)
+
+    @staticmethod
+    async def _send(send: Send, status: int, headers: list, body: bytes) -> None:
+        headers = [*headers, (b"content-length", str(len(body)).encode())]
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,37 @@
+"""IP blocklist middleware — rejects blocked networks before routing or any dependency runs."""
+
+import json
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.ip_filter import IPFilter, forwarded_client_ip
+
+_BODY = json.dumps({"success": False, "message": "Sizning IP manzilingizdan kirish taqiqlangan"}).encode()
+
+
+class IPFilterMiddleware:
+    """Plain ASGI (no request object, no body read) so a rejection costs one tree lookup."""
+
+    def __init__(self, app: ASGIApp, ip_filter: IPFilter) -> None:
+        self.app = app
+        self.ip_filter = ip_filter
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.ip_filter.size:
+            await self.app(scope, receive, send)
+            return
+        forwarded = None
+        for name, value in scope["headers"]:
+            if name == b"x-forwarded-for":
+                forwarded = value.decode("latin-1")
+                break
+        client = scope.get("client")
+        if not self.ip_filter.is_blocked(forwarded_client_ip(forwarded, client[0] if client else None)):
+            await self.app(scope, receive, send)
+            return
+        await send({
+            "type": "http.response.start",
+            "status": 403,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(_BODY)).encode())],
+        })
+        await send({"type": "http.response.body", "body": _BODY})
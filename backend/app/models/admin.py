@@ -4,7 +4,7 @@ import uuid
 from datetime import datetime, timezone
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, String, Table
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, String, Table
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -47,6 +47,12 @@ class Admin(Base):
         "AdminSession", back_populates="admin", cascade="all, delete-orphan"
     )
 
+    __table_args__ = (
+        # Keyset pagination of the admin list, one per sort key.
+        Index("idx_admin_active_created", "is_active", "created_at", "id"),
+        Index("idx_admin_active_username", "is_active", "username", "id"),
+    )
+
     def has_permission(self, name: str) -> bool:
         if self.is_super_admin:
             return True
@@ -4,7 +4,7 @@ import uuid
 from datetime import datetime, timezone
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Boolean, BigInteger, DateTime, Index, String
+from sqlalchemy import DDL, Boolean, BigInteger, Computed, DateTime, Index, String, event, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -18,6 +18,9 @@ def _utc_now() -> datetime:
     return datetime.now(timezone.utc)
 
 
+PHONE_DIGITS_SQL = "regexp_replace(phone_number, '[^0-9]', '', 'g')"
+
+
 class User(Base):
     __tablename__ = "users"
 
@@ -26,6 +29,14 @@ class User(Base):
     telegram_id: Mapped[int | None] = mapped_column(BigInteger, nullable=True, index=True)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
 
+    # Search columns, maintained by Postgres; deferred so normal loads skip them.
+    phone_digits: Mapped[str] = mapped_column(
+        String(20), Computed(PHONE_DIGITS_SQL, persisted=True), deferred=True
+    )
+    phone_digits_rev: Mapped[str] = mapped_column(
+        String(20), Computed(f"reverse({PHONE_DIGITS_SQL})", persisted=True), deferred=True
+    )
+
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=_utc_now, nullable=False)
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=_utc_now, onupdate=_utc_now, nullable=False)
     last_login: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
@@ -37,4 +48,16 @@ class User(Base):
     __table_args__ = (
         Index("idx_user_phone", "phone_number"),
         Index("idx_user_tg", "telegram_id"),
+        # Keyset pagination: one (is_active, sort key, id) index per sort key of the admin list.
+        Index("idx_user_active_created", "is_active", "created_at", "id"),
+        Index("idx_user_active_phone", "is_active", "phone_number", "id"),
+        Index("idx_user_active_last_login", "is_active", text("coalesce(last_login, '1970-01-01 00:00:00+00'::timestamptz)"), "id"),
+        # Phone search (app/services/phone_search.py): prefix, suffix, substring.
+        Index("idx_user_digits_prefix", "phone_digits", postgresql_ops={"phone_digits": "text_pattern_ops"}),
+        Index("idx_user_digits_suffix", "phone_digits_rev", postgresql_ops={"phone_digits_rev": "text_pattern_ops"}),
+        Index("idx_user_digits_trgm", "phone_digits", postgresql_using="gin", postgresql_ops={"phone_digits": "gin_trgm_ops"}),
     )
+
+
+# The trigram index needs pg_trgm when create_all builds a fresh database.
+event.listen(User.__table__, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
@@ -74,9 +74,10 @@ class AdminDetailResponse(BaseModel):
 class AdminListResponse(BaseModel):
     success: bool = True
     admins: list[AdminDetailResponse]
-    total: int
-    page: int
+    total: Optional[int] = None  # first page only; see total_exact
+    total_exact: bool = False
     limit: int
+    next_cursor: Optional[str] = None
 
 
 class AdminSingleResponse(BaseModel):
@@ -0,0 +1,70 @@
+"""Monitoring schemas — abuse heavy hitters, DB pool."""
+
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class HeavyHitter(BaseModel):
+    key: str
+    count: int
+
+
+class HeavyHitterStream(BaseModel):
+    stream: str
+    total: int
+    current: list[HeavyHitter]
+    previous_total: int
+    previous: list[HeavyHitter]
+
+
+class HeavyHittersResponse(BaseModel):
+    scope: str  # "shared" — all workers via Redis; "worker" — this process only
+    worker: int
+    window_seconds: int
+    window_start: int
+    streams: list[HeavyHitterStream]
+
+
+class HistogramBucket(BaseModel):
+    le_ms: Optional[float]  # None = above the last bound
+    count: int
+
+
+class LatencyHistogram(BaseModel):
+    count: int
+    avg_ms: float
+    max_ms: float
+    p50_ms: Optional[float]
+    p95_ms: Optional[float]
+    p99_ms: Optional[float]
+    buckets: list[HistogramBucket]
+
+
+class PoolGauges(BaseModel):
+    size: int
+    max_overflow: int
+    checked_out: int
+    checked_in: int
+    overflow: int
+    peak_checked_out: int
+
+
+class PoolRouteStats(BaseModel):
+    route: str
+    checkouts: int
+    avg_wait_ms: float
+    avg_held_ms: float
+    max_held_ms: float
+    total_held_ms: float
+
+
+class DBPoolResponse(BaseModel):
+    worker: int
+    pool: PoolGauges
+    slow_checkout_ms: float
+    slow_checkouts: int
+    timeouts: int
+    checkout_wait: LatencyHistogram
+    connection_held: LatencyHistogram
+    routes: list[PoolRouteStats]
@@ -22,9 +22,10 @@ class UserDetailResponse(BaseModel):
 class UserListResponse(BaseModel):
     success: bool = True
     users: list[UserDetailResponse]
-    total: int
-    page: int
+    total: Optional[int] = None  # first page only; see total_exact
+    total_exact: bool = False
     limit: int
+    next_cursor: Optional[str] = None
 
 
 class UserSingleResponse(BaseModel):
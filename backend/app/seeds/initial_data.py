@@ -7,9 +7,12 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import async_session_maker
-from app.core.security import hash_password
+from app.core.hashing import hashing_executor
+from app.core.redis import redis_client
+from app.core.security import hash_password_async
 from app.models.admin import Admin
 from app.models.permission import Permission
+from app.services.rbac import permission_catalog
 
 logging.basicConfig(level=logging.INFO)
 log = logging.getLogger(__name__)
@@ -56,7 +59,7 @@ async def _create_super_admin(db: AsyncSession, perms: list[Permission]) -> None
     admin = Admin(
         username=SUPER_ADMIN["username"],
         email=SUPER_ADMIN["email"],
-        password_hash=hash_password(SUPER_ADMIN["password"]),
+        password_hash=await hash_password_async(SUPER_ADMIN["password"]),
         is_super_admin=True,
         is_active=True,
         permissions=perms,
@@ -65,6 +68,16 @@ async def _create_super_admin(db: AsyncSession, perms: list[Permission]) -> None
     log.info("Super admin created: %s / %s", SUPER_ADMIN["username"], SUPER_ADMIN["password"])
 
 
+async def _publish_catalog() -> None:
+    """Ask running API workers to reload the permission catalog."""
+    try:
+        await redis_client.connect()
+        await permission_catalog.publish_change()
+        await redis_client.disconnect()
+    except Exception as e:
+        log.warning("Permission catalog not published: %s", e)
+
+
 async def seed() -> None:
     log.info("=" * 50)
     log.info("Seeding database …")
@@ -74,10 +87,13 @@ async def seed() -> None:
             await _create_super_admin(db, perms)
             await db.commit()
             log.info("✅ Done — %d permissions", len(perms))
+            await _publish_catalog()
         except Exception as e:
             await db.rollback()
             log.error("❌ %s", e)
             raise
+        finally:
+            hashing_executor.shutdown()
     log.info("=" * 50)
 
 
@@ -1,75 +1,120 @@
 """Admin authentication service — login, logout, session validation."""
 
+import asyncio
+import logging
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
-from sqlalchemy import delete, func, select
+from sqlalchemy import delete, func, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
 from app.core.config import settings
-from app.core.redis import RedisClient
-from app.core.security import generate_csrf_token, generate_session_token, verify_password
+from app.core.database import async_session_maker
+from app.core.rate_limit import RateLimiter, Window
+from app.core.redis import RedisClient, hash_tag
+from app.core.single_flight import single_flight
+from app.core.security import (
+    generate_csrf_token,
+    generate_session_token,
+    hash_password_async,
+    hash_token,
+    password_needs_rehash,
+    verify_password_async,
+)
 from app.models.admin import Admin
 from app.models.admin_session import AdminSession
+from app.services import heavy_hitters as hh
+from app.services import statements
+from app.services.admin_session_cache import AdminSessionCache, CachedAdmin, CachedSession, snapshot
+from app.services.rejection_cache import rejection_cache
+
+logger = logging.getLogger(__name__)
+
+_background: set[asyncio.Task] = set()
+
+
+async def _upgrade_password_hash(admin_id, old_hash: str, password: str) -> None:
+    """Re-hash with current parameters; skipped if the password changed meanwhile."""
+    try:
+        new_hash = await hash_password_async(password)
+        async with async_session_maker() as db:
+            await db.execute(
+                update(Admin)
+                .where(Admin.id == admin_id, Admin.password_hash == old_hash)
+                .values(password_hash=new_hash)
+            )
+            await db.commit()
+    except Exception as exc:
+        logger.warning("Password rehash failed for admin %s: %s", admin_id, exc)
 
 
 class AdminAuthService:
     def __init__(self, db: AsyncSession, redis: RedisClient) -> None:
         self.db = db
         self.redis = redis
+        self.sessions = AdminSessionCache(redis)
+        self.limiter = RateLimiter(redis)
 
     # Rate limiting 
     async def check_login_rate(self, username: str) -> tuple[bool, Optional[str], int]:
-        bk = f"admin:block:{username}"
-        blocked = await self.redis.get(bk)
-        if blocked:
-            ttl = await self.redis.ttl(bk)
-            return False, f"Hisobingiz vaqtincha bloklangan. {ttl} soniyadan keyin qaytadan urinib ko'ring", ttl
-        return True, None, 0
-
-    async def _bump_fail(self, username: str) -> int:
-        ak = f"admin:attempts:{username}"
-        count = await self.redis.incr_with_ttl(ak, settings.LOGIN_BLOCK_DURATION_SECONDS)
-        if count >= settings.LOGIN_LIMIT_ATTEMPTS:
-            await self.redis.setex(f"admin:block:{username}", settings.LOGIN_BLOCK_DURATION_SECONDS, "1")
-        return count
+        """Count this attempt before the password is checked; ``(ok, err, attempts_left)``.
+
+        Check and count are one atomic hit, so concurrent guesses cannot all
+        slip past the limit. A successful login clears the counter. Sliding:
+        every attempt restarts the window, so the block lasts
+        ``LOGIN_BLOCK_DURATION_SECONDS`` from the last one.
+        """
+        attempts = Window(
+            f"admin:attempts:{hash_tag(username)}",
+            settings.LOGIN_LIMIT_ATTEMPTS,
+            settings.LOGIN_BLOCK_DURATION_SECONDS,
+            sliding=True,
+        )
+        r = await self.limiter.hit([attempts])
+        if not r.allowed:
+            ttl = max(r.retry_after, 1)
+            return False, f"Hisobingiz vaqtincha bloklangan. {ttl} soniyadan keyin qaytadan urinib ko'ring", 0
+        return True, None, settings.LOGIN_LIMIT_ATTEMPTS - r.counts[0]
 
     async def _clear_fails(self, username: str) -> None:
-        await self.redis.delete(f"admin:attempts:{username}")
+        await self.redis.delete(f"admin:attempts:{hash_tag(username)}")
 
     # Login 
     async def login(
         self, username: str, password: str, ip: str, ua: str
     ) -> tuple[bool, Optional[str], Optional[Admin], Optional[str], Optional[str]]:
-        ok, err, _ = await self.check_login_rate(username)
+        hh.heavy_hitters.record(hh.ADMIN_LOGIN_USERNAME, username)
+        hh.heavy_hitters.record(hh.ADMIN_LOGIN_IP, ip)
+        ok, err, left = await self.check_login_rate(username)
         if not ok:
             return False, err, None, None, None
 
-        stmt = (
-            select(Admin)
-            .options(selectinload(Admin.permissions))
-            .where((Admin.username == username) | (Admin.email == username))
-        )
-        admin = (await self.db.execute(stmt)).scalar_one_or_none()
         generic = "Noto'g'ri foydalanuvchi nomi yoki parol"
+        if await rejection_cache.is_rejected("admin", username):
+            return False, generic, None, None, None
+
+        marker = await self.sessions.fill_marker() if settings.ADMIN_SESSION_MODE != "signed" else None
+        admin = (await self.db.execute(statements.ADMIN_BY_LOGIN, {"login": username})).scalar_one_or_none()
 
         if not admin:
-            await self._bump_fail(username)
+            await rejection_cache.reject("admin", username, settings.REJECT_UNKNOWN_ADMIN_TTL)
             return False, generic, None, None, None
 
         if not admin.is_active:
             return False, "Hisobingiz bloklangan. Administrator bilan bog'laning", None, None, None
 
-        if not verify_password(password, admin.password_hash):
-            cnt = await self._bump_fail(username)
-            left = settings.LOGIN_LIMIT_ATTEMPTS - cnt
+        if not await verify_password_async(password, admin.password_hash):
             if left > 0:
                 return False, f"{generic}. {left} ta urinish qoldi", None, None, None
             return False, "Hisobingiz vaqtincha bloklangan", None, None, None
 
         await self._clear_fails(username)
 
+        if password_needs_rehash(admin.password_hash):
+            task = asyncio.create_task(_upgrade_password_hash(admin.id, admin.password_hash, password))
+            _background.add(task)
+            task.add_done_callback(_background.discard)
+
         session_token = generate_session_token()
         csrf_token = generate_csrf_token()
         session = AdminSession(
@@ -82,10 +127,25 @@ class AdminAuthService:
         )
         self.db.add(session)
         await self.db.commit()
+        if settings.ADMIN_SESSION_MODE == "signed":
+            session_token = await self.sessions.issue_signed(*snapshot(admin, session))
+        else:
+            await self.sessions.put(*snapshot(admin, session), marker)
         return True, None, admin, session_token, csrf_token
 
     # Logout 
     async def logout(self, token: str) -> bool:
+        if settings.ADMIN_SESSION_MODE == "signed":
+            signed = self.sessions.read_signed(token)
+            if not signed:
+                return False
+            _, session, _ = signed
+            await self.sessions.deny(session)
+            r = await self.db.execute(delete(AdminSession).where(AdminSession.id == session.id))
+            await self.db.commit()
+            return r.rowcount > 0
+
+        await self.sessions.drop(token)
         r = await self.db.execute(delete(AdminSession).where(AdminSession.session_token == token))
         await self.db.commit()
         return r.rowcount > 0
@@ -93,13 +153,30 @@ class AdminAuthService:
     # Session validation 
     async def validate_session(
         self, token: str
-    ) -> tuple[bool, Optional[Admin], Optional[AdminSession]]:
-        stmt = (
-            select(AdminSession)
-            .options(selectinload(AdminSession.admin).selectinload(Admin.permissions))
-            .where(AdminSession.session_token == token)
+    ) -> tuple[bool, Optional[CachedAdmin], Optional[CachedSession]]:
+        # Parallel requests on one cookie share a single cache read / DB load.
+        # The cross-worker lock only pays off for the opaque mode's DB load.
+        return await single_flight.do(
+            f"admin:session:{hash_token(token)}",
+            lambda: self._validate(token),
+            shared=settings.ADMIN_SESSION_MODE != "signed",
         )
-        session = (await self.db.execute(stmt)).scalar_one_or_none()
+
+    async def _validate(
+        self, token: str
+    ) -> tuple[bool, Optional[CachedAdmin], Optional[CachedSession]]:
+        if settings.ADMIN_SESSION_MODE == "signed":
+            return await self._validate_signed(token)
+
+        cached = await self.sessions.get(token)
+        if cached:
+            admin, snap = cached
+            if not snap.is_expired() and admin.is_active:
+                return True, admin, snap
+            await self.sessions.drop(token)
+
+        marker = await self.sessions.fill_marker()
+        session = (await self.db.execute(statements.ADMIN_SESSION_BY_TOKEN, {"token": token})).scalar_one_or_none()
         if not session:
             return False, None, None
         if session.is_expired():
@@ -108,7 +185,26 @@ class AdminAuthService:
             return False, None, None
         if not session.admin.is_active:
             return False, None, None
-        return True, session.admin, session
+        admin, snap = snapshot(session.admin, session)
+        await self.sessions.put(admin, snap, marker)
+        return True, admin, snap
+
+    async def _validate_signed(
+        self, cookie: str
+    ) -> tuple[bool, Optional[CachedAdmin], Optional[CachedSession]]:
+        signed = self.sessions.read_signed(cookie)
+        if not signed:
+            return False, None, None
+        admin, session, gen = signed
+
+        revoked = await self.sessions.is_revoked(admin.id, session.id, gen)
+        if revoked is None:
+            # Redis is down — fall back to the audit row and the admin flag.
+            alive = await self.db.execute(statements.ADMIN_SESSION_ALIVE, {"sid": session.id})
+            revoked = alive.scalar_one_or_none() is None
+        if revoked:
+            return False, None, None
+        return True, admin, session
 
     # Cleanup 
     async def cleanup_expired(self) -> int:
@@ -1,32 +1,76 @@
 """Admin CRUD service."""
 
+import logging
 from typing import Optional
 from uuid import UUID
 
-from sqlalchemy import func, select
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.core.security import hash_password
+from app.core.pagination import Page, SortKey, TotalMode, count_rows, cut, decode_cursor, keyset_query
+from app.core.security import hash_password_async
 from app.models.admin import Admin
 from app.models.permission import Permission
+from app.services.admin_session_cache import SessionRevocationError, admin_session_cache
+from app.services.rbac import PermissionInfo, permission_catalog
+from app.services.rejection_cache import rejection_cache
+
+logger = logging.getLogger(__name__)
+
+# Each key is backed by an (is_active, key, id) index — see models/admin.py.
+SORT_KEYS: dict[str, SortKey] = {
+    "created_at": SortKey(lambda a: a.created_at, lambda a: a.created_at),
+    "username": SortKey(lambda a: a.username, lambda a: a.username, parse=str),
+}
+
+
+REVOKE_FAILED = "Sessiyalarni bekor qilib bo'lmadi, keyinroq urinib ko'ring"
 
 
 class AdminService:
     def __init__(self, db: AsyncSession) -> None:
         self.db = db
 
-    async def get_all(self, page: int = 1, limit: int = 20) -> tuple[list[Admin], int]:
-        total = (await self.db.execute(select(func.count()).select_from(Admin))).scalar() or 0
-        stmt = (
-            select(Admin)
-            .options(selectinload(Admin.permissions))
-            .order_by(Admin.created_at.desc())
-            .offset((page - 1) * limit)
-            .limit(limit)
+    async def _retire_cookies(self, aid: UUID) -> bool:
+        """Revoke the admin's signed cookies; on failure nothing is committed."""
+        try:
+            await admin_session_cache.retire_cookies(aid)
+        except SessionRevocationError as exc:
+            logger.warning("Admin %s change aborted: %s", aid, exc)
+            await self.db.rollback()
+            return False
+        return True
+
+    async def get_all(
+        self,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        is_active: Optional[bool] = None,
+        sort_by: str = "created_at",
+        sort_order: str = "desc",
+        total: TotalMode = "estimate",
+    ) -> tuple[bool, Optional[str], Optional[Page[Admin]]]:
+        key = SORT_KEYS.get(sort_by)
+        if key is None:
+            return False, f"Saralash faqat: {', '.join(SORT_KEYS)}", None
+        after = None
+        if cursor:
+            try:
+                after = decode_cursor(cursor, sort_by, sort_order, key)
+            except ValueError:
+                return False, "Noto'g'ri cursor", None
+
+        stmt = keyset_query(
+            Admin, key, sort_order == "desc", limit + 1, [], after, is_active,
+            options=lambda a: [selectinload(a.permissions)],
         )
-        admins = list((await self.db.execute(stmt)).scalars().all())
-        return admins, total
+        rows = list((await self.db.execute(stmt)).scalars().all())
+        admins, next_cursor = cut(rows, limit, sort_by, sort_order, key)
+
+        where = [Admin.is_active == is_active] if is_active is not None else []
+        count, exact = await count_rows(self.db, Admin, where, total) if cursor is None else (None, False)
+        return True, None, Page(admins, next_cursor, count, exact)
 
     async def get_by_id(self, aid: UUID) -> Optional[Admin]:
         stmt = select(Admin).options(selectinload(Admin.permissions)).where(Admin.id == aid)
@@ -53,19 +97,22 @@ class AdminService:
 
         perms: list[Permission] = []
         if permission_ids:
-            perms = list((await self.db.execute(select(Permission).where(Permission.id.in_(permission_ids)))).scalars().all())
-            if len(perms) != len(permission_ids):
+            infos = await permission_catalog.resolve(self.db, permission_ids)
+            if infos is None:
                 return False, "Ba'zi ruxsatnomalar topilmadi", None
+            perms = await permission_catalog.attach(self.db, infos)
 
         admin = Admin(
             username=username,
             email=email,
-            password_hash=hash_password(password),
+            password_hash=await hash_password_async(password),
             is_super_admin=is_super_admin,
             permissions=perms,
         )
         self.db.add(admin)
         await self.db.commit()
+        await rejection_cache.clear("admin", admin.username)
+        await rejection_cache.clear("admin", admin.email)
         await self.db.refresh(admin)
         return True, None, admin
 
@@ -93,13 +140,19 @@ class AdminService:
             admin.email = email
 
         if password:
-            admin.password_hash = hash_password(password)
+            admin.password_hash = await hash_password_async(password)
         if is_active is not None:
             admin.is_active = is_active
         if is_super_admin is not None:
             admin.is_super_admin = is_super_admin
 
+        if not await self._retire_cookies(aid):
+            return False, REVOKE_FAILED, None
         await self.db.commit()
+        await admin_session_cache.drop_admin(aid)
+        if username or email:
+            await rejection_cache.clear("admin", admin.username)
+            await rejection_cache.clear("admin", admin.email)
         await self.db.refresh(admin)
         return True, None, admin
 
@@ -110,12 +163,15 @@ class AdminService:
         if not admin:
             return False, "Admin topilmadi", None
 
-        perms = list((await self.db.execute(select(Permission).where(Permission.id.in_(perm_ids)))).scalars().all())
-        if len(perms) != len(perm_ids):
+        infos = await permission_catalog.resolve(self.db, perm_ids)
+        if infos is None:
             return False, "Ba'zi ruxsatnomalar topilmadi", None
 
-        admin.permissions = perms
+        admin.permissions = await permission_catalog.attach(self.db, infos)
+        if not await self._retire_cookies(aid):
+            return False, REVOKE_FAILED, None
         await self.db.commit()
+        await admin_session_cache.drop_admin(aid)
         await self.db.refresh(admin)
         return True, None, admin
 
@@ -127,10 +183,15 @@ class AdminService:
             return False, "Admin topilmadi"
         if admin.is_super_admin:
             return False, "Super adminni o'chirib bo'lmaydi"
+        if not await self._retire_cookies(aid):
+            return False, REVOKE_FAILED
         await self.db.delete(admin)
         await self.db.commit()
+        await admin_session_cache.drop_admin(aid)
         return True, None
 
-    async def all_permissions(self) -> list[Permission]:
-        stmt = select(Permission).order_by(Permission.resource, Permission.action)
-        return list((await self.db.execute(stmt)).scalars().all())
+    async def all_permissions(self) -> list[PermissionInfo]:
+        if not permission_catalog.loaded:
+            # Not self.db: this runs on a read replica, and the catalog is shared by every request.
+            await permission_catalog.load()
+        return permission_catalog.items
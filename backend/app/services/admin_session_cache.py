@@ -0,0 +1,337 @@
+"""Admin session state in Redis — cached snapshots for opaque tokens, revocation for signed cookies."""
+
+import json
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Optional
+from uuid import UUID
+
+from app.core.config import settings
+from app.core.redis import RedisClient, hash_tag, redis_client
+from app.core.security import hash_token
+from app.core.session_cookie import SignedSessionCodec
+from app.models.admin import Admin
+from app.models.admin_session import AdminSession
+from app.services.rbac import permission_catalog
+
+logger = logging.getLogger(__name__)
+
+
+class SessionRevocationError(RuntimeError):
+    """Signed cookies could not be retired — the change must not be committed."""
+
+
+@dataclass(frozen=True)
+class CachedAdmin:
+    """Read-only stand-in for ``Admin`` with what the guards and /me need."""
+
+    id: UUID
+    username: str
+    email: str
+    is_super_admin: bool
+    is_active: bool
+    created_at: datetime
+    permissions: frozenset[str] = field(default_factory=frozenset)
+    mask: int = field(default=0, compare=False)
+    catalog_version: int = field(default=0, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "mask", permission_catalog.mask_of(self.permissions))
+        object.__setattr__(self, "catalog_version", permission_catalog.version)
+
+    def has_permission(self, name: str) -> bool:
+        if self.is_super_admin:
+            return True
+        bit = permission_catalog.bit(name)
+        if bit and self.catalog_version == permission_catalog.version:
+            return bool(self.mask & bit)
+        return name in self.permissions
+
+    def permission_names(self) -> list[str]:
+        return sorted(self.permissions)
+
+
+@dataclass(frozen=True)
+class CachedSession:
+    """Read-only stand-in for ``AdminSession``; the raw token never leaves memory."""
+
+    id: UUID
+    admin_id: UUID
+    session_token: str
+    csrf_token: str
+    expires_at: datetime
+
+    def is_expired(self) -> bool:
+        return datetime.now(timezone.utc) > self.expires_at
+
+    def is_valid(self) -> bool:
+        return not self.is_expired()
+
+
+def _aware(dt: datetime) -> datetime:
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+def snapshot(admin: Admin, session: AdminSession) -> tuple[CachedAdmin, CachedSession]:
+    return (
+        CachedAdmin(
+            id=admin.id,
+            username=admin.username,
+            email=admin.email,
+            is_super_admin=admin.is_super_admin,
+            is_active=admin.is_active,
+            created_at=_aware(admin.created_at),
+            permissions=frozenset(admin.permission_names()),
+        ),
+        CachedSession(
+            id=session.id,
+            admin_id=admin.id,
+            session_token=session.session_token,
+            csrf_token=session.csrf_token,
+            expires_at=_aware(session.expires_at),
+        ),
+    )
+
+
+class AdminSessionCache:
+    def __init__(self, redis: RedisClient) -> None:
+        self.redis = redis
+        self.codec = SignedSessionCodec(settings.ADMIN_SESSION_SECRET)
+
+    # Bumped by every drop; a fill that saw it change since before its DB read
+    # removes what it wrote (see ``put``).
+    _CHANGES_KEY = "admin:changes"
+
+    @staticmethod
+    def _key(token_hash: str) -> str:
+        return f"admin:session:{token_hash}"
+
+    @staticmethod
+    def _index_key(admin_id: UUID) -> str:
+        return f"admin:sessions:{admin_id}"
+
+    @staticmethod
+    def _gen_key(admin_id: UUID) -> str:
+        return f"admin:gen:{hash_tag(admin_id)}"
+
+    @staticmethod
+    def _deny_key(admin_id: UUID, session_id: UUID) -> str:
+        # Same slot as the generation key so both are read with one MGET.
+        return f"admin:deny:{hash_tag(admin_id)}:{session_id}"
+
+    # Signed cookies 
+    async def issue_signed(self, admin: CachedAdmin, session: CachedSession) -> str:
+        """Cookie value carrying the whole snapshot, bound to the admin's current generation.
+
+        If Redis cannot answer the cookie gets generation 0: it works on the
+        audit-row fallback and may ask for a new login once Redis is back.
+        """
+        try:
+            gen = await self.redis.get(self._gen_key(admin.id))
+        except Exception as exc:
+            logger.warning("Admin session generation unavailable: %s", exc)
+            gen = None
+        return self.codec.encode({
+            "sid": str(session.id),
+            "aid": str(admin.id),
+            "g": int(gen or 0),
+            "exp": int(session.expires_at.timestamp()),
+            "csrf": session.csrf_token,
+            "su": admin.is_super_admin,
+            "u": admin.username,
+            "em": admin.email,
+            "ca": int(admin.created_at.timestamp()),
+            "p": sorted(admin.permissions),
+        })
+
+    def read_signed(self, cookie: str) -> Optional[tuple[CachedAdmin, CachedSession, int]]:
+        """Signature + expiry only; returns (admin, session, generation)."""
+        c = self.codec.decode(cookie)
+        if not c:
+            return None
+        try:
+            admin = CachedAdmin(
+                id=UUID(c["aid"]),
+                username=c["u"],
+                email=c["em"],
+                is_super_admin=bool(c["su"]),
+                is_active=True,
+                created_at=datetime.fromtimestamp(c["ca"], timezone.utc),
+                permissions=frozenset(c["p"]),
+            )
+            session = CachedSession(
+                id=UUID(c["sid"]),
+                admin_id=admin.id,
+                session_token=cookie,
+                csrf_token=c["csrf"],
+                expires_at=datetime.fromtimestamp(c["exp"], timezone.utc),
+            )
+            return admin, session, int(c["g"])
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    async def is_revoked(self, admin_id: UUID, session_id: UUID, gen: int) -> Optional[bool]:
+        """Denylisted or older generation; None when Redis cannot answer."""
+        if self.redis.degraded:
+            return None  # a worker-local store knows nothing about other workers' revocations
+        try:
+            denied, current = await self.redis.mget(self._deny_key(admin_id, session_id), self._gen_key(admin_id))
+        except Exception as exc:
+            logger.warning("Admin revocation check unavailable: %s", exc)
+            return None
+        return bool(denied) or int(current or 0) != gen
+
+    async def deny(self, session: CachedSession) -> None:
+        """Denylist one cookie.
+
+        Durable: if Redis cannot take it now it is queued and replayed before
+        the next command that reaches Redis, so the logout outlives the outage.
+        Meanwhile ``is_revoked`` answers None and the deleted audit row decides.
+        """
+        ttl = int((session.expires_at - datetime.now(timezone.utc)).total_seconds())
+        if ttl <= 0:
+            return
+        try:
+            await self.redis.setex(self._deny_key(session.admin_id, session.id), ttl, "1", durable=True)
+        except Exception as exc:
+            logger.warning("Admin session denylist write failed: %s", exc)
+
+    # Opaque-token snapshots 
+    async def get(self, token: str) -> Optional[tuple[CachedAdmin, CachedSession]]:
+        try:
+            raw = await self.redis.get(self._key(hash_token(token)))
+        except Exception as exc:
+            logger.debug("Admin session cache read skipped: %s", exc)
+            return None
+        if not raw:
+            return None
+        d = json.loads(raw)
+        a = d["admin"]
+        admin = CachedAdmin(
+            id=UUID(a["id"]),
+            username=a["username"],
+            email=a["email"],
+            is_super_admin=a["is_super_admin"],
+            is_active=a["is_active"],
+            created_at=datetime.fromisoformat(a["created_at"]),
+            permissions=frozenset(a["permissions"]),
+        )
+        session = CachedSession(
+            id=UUID(d["id"]),
+            admin_id=admin.id,
+            session_token=token,
+            csrf_token=d["csrf_token"],
+            expires_at=datetime.fromisoformat(d["expires_at"]),
+        )
+        return admin, session
+
+    async def fill_marker(self) -> Optional[str]:
+        """Read before the DB read a snapshot is built from; None — do not cache it."""
+        try:
+            return await self.redis.get(self._CHANGES_KEY) or ""
+        except Exception as exc:
+            logger.debug("Admin session cache fill skipped: %s", exc)
+            return None
+
+    async def put(self, admin: CachedAdmin, session: CachedSession, marker: Optional[str]) -> None:
+        """Cache a snapshot built from a DB read that started after ``fill_marker``.
+
+        A drop racing the read either runs after the write below and deletes
+        it (the write is indexed first), or bumps the marker before the check
+        and the write is taken back here. The snapshot key and the marker live
+        in different slots, so this is ordering, not one script.
+        """
+        if marker is None:
+            return
+        ttl = int((session.expires_at - datetime.now(timezone.utc)).total_seconds())
+        ttl = min(ttl, settings.ADMIN_SESSION_CACHE_TTL)
+        if ttl <= 0:
+            return
+        body = json.dumps({
+            "id": str(session.id),
+            "csrf_token": session.csrf_token,
+            "expires_at": session.expires_at.isoformat(),
+            "admin": {
+                "id": str(admin.id),
+                "username": admin.username,
+                "email": admin.email,
+                "is_super_admin": admin.is_super_admin,
+                "is_active": admin.is_active,
+                "created_at": admin.created_at.isoformat(),
+                "permissions": sorted(admin.permissions),
+            },
+        })
+        token_hash = hash_token(session.session_token)
+        index = self._index_key(admin.id)
+        key = self._key(token_hash)
+        try:
+            await self.redis.setex(key, ttl, body)
+            await self.redis.sadd(index, token_hash)
+            await self.redis.expire(index, settings.ADMIN_SESSION_EXPIRATION_HOURS * 3600)
+            if (await self.redis.get(self._CHANGES_KEY) or "") != marker:
+                await self.redis.delete(key, durable=True)
+        except Exception as exc:
+            logger.debug("Admin session cache write skipped: %s", exc)
+
+    async def drop(self, token: str) -> None:
+        key = self._key(hash_token(token))
+
+        async def remote(client) -> None:
+            await client.incr(self._CHANGES_KEY)
+            await client.delete(key)
+
+        def local() -> None:
+            self.redis.memory.incr(self._CHANGES_KEY)
+            self.redis.memory.delete(key)
+
+        try:
+            await self.redis.durable("admin session drop", remote, local)
+        except Exception as exc:
+            logger.warning("Admin session cache drop failed: %s", exc)
+
+    async def retire_cookies(self, admin_id: UUID) -> None:
+        """Move the admin to a new generation before a change is committed (signed mode).
+
+        Signed cookies carry ``is_active`` and permissions themselves, so the
+        generation bump is the only thing that revokes them; if it cannot be
+        made in the shared Redis, ``SessionRevocationError`` stops the change.
+        """
+        if settings.ADMIN_SESSION_MODE != "signed":
+            return
+        if self.redis.degraded:
+            raise SessionRevocationError("Redis unavailable")
+        try:
+            await self.redis.incr(self._gen_key(admin_id))
+        except Exception as exc:
+            raise SessionRevocationError(str(exc)) from exc
+
+    async def drop_admin(self, admin_id: UUID) -> None:
+        """Forget every cached session of one admin and retire its signed cookies.
+
+        Runs after the commit; ``retire_cookies`` has already made the bump
+        that matters in signed mode, this one closes the gap of a login racing
+        the commit. Durable: if Redis cannot take it now it is replayed later,
+        and the local store drops its own snapshots meanwhile.
+        """
+        index = self._index_key(admin_id)
+        gen = self._gen_key(admin_id)
+
+        async def remote(client) -> None:
+            await client.incr(gen)
+            await client.incr(self._CHANGES_KEY)
+            hashes = await client.smembers(index)
+            await client.delete(index, *(self._key(h) for h in hashes))
+
+        def local() -> None:
+            memory = self.redis.memory
+            memory.incr(self._CHANGES_KEY)
+            memory.delete(index, *(self._key(h) for h in memory.smembers(index)))
+
+        try:
+            await self.redis.durable("admin sessions drop", remote, local)
+        except Exception as exc:
+            logger.warning("Admin session cache drop for %s failed: %s", admin_id, exc)
+
+
+admin_session_cache = AdminSessionCache(redis_client)
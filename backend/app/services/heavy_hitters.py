@@ -0,0 +1,305 @@
+"""Abuse heavy hitters — count-min sketch + top-K per stream, in fixed memory, per tumbling window."""
+
+import asyncio
+import hashlib
+import heapq
+import logging
+import os
+import time
+from array import array
+from collections import Counter
+from typing import Any, Optional
+
+from app.core.config import settings
+from app.core.redis import RedisClient, redis_client
+
+logger = logging.getLogger(__name__)
+
+# Streams fed by the auth paths
+OTP_SEND_IP = "otp_send_ip"
+OTP_SEND_PHONE_PREFIX = "otp_send_phone_prefix"
+OTP_VERIFY_IP = "otp_verify_ip"
+OTP_VERIFY_PHONE = "otp_verify_phone"
+ADMIN_LOGIN_USERNAME = "admin_login_username"
+ADMIN_LOGIN_IP = "admin_login_ip"
+
+STREAMS = (OTP_SEND_IP, OTP_SEND_PHONE_PREFIX, OTP_VERIFY_IP, OTP_VERIFY_PHONE, ADMIN_LOGIN_USERNAME, ADMIN_LOGIN_IP)
+
+# "+998" + two-digit operator code
+PHONE_PREFIX_LEN = 6
+
+# The shared ranking keeps this many times top-K keys per stream and window.
+SHARED_KEEP_FACTOR = 10
+
+# KEYS[1] shared ranking (zset), KEYS[2] shared total
+# ARGV[1] ttl seconds, ARGV[2] keys to keep, ARGV[3] total delta, ARGV[4..] key, delta, ...
+_FLUSH_LUA = """
+for i = 4, #ARGV, 2 do
+  redis.call('ZINCRBY', KEYS[1], ARGV[i + 1], ARGV[i])
+end
+redis.call('INCRBY', KEYS[2], ARGV[3])
+redis.call('ZREMRANGEBYRANK', KEYS[1], 0, -tonumber(ARGV[2]) - 1)
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+redis.call('EXPIRE', KEYS[2], ARGV[1])
+return 0
+"""
+
+
+class CountMinSketch:
+    """``depth`` rows of ``width`` counters; estimates never undercount.
+
+    Uses conservative update (only the smallest cells grow), which keeps the
+    overestimate for light keys low when a few heavy keys dominate.
+    """
+
+    def __init__(self, width: int, depth: int) -> None:
+        self.width = width
+        self.depth = depth
+        self._rows = [array("I", bytes(4 * width)) for _ in range(depth)]
+
+    def _cells(self, key: str) -> list[int]:
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.width for i in range(self.depth)]
+
+    def add(self, key: str, count: int = 1) -> int:
+        """Count ``key``; returns its new estimate."""
+        cells = self._cells(key)
+        estimate = min(row[c] for row, c in zip(self._rows, cells)) + count
+        for row, c in zip(self._rows, cells):
+            if row[c] < estimate:
+                row[c] = estimate
+        return estimate
+
+    def estimate(self, key: str) -> int:
+        return min(row[c] for row, c in zip(self._rows, self._cells(key)))
+
+    def clear(self) -> None:
+        for row in self._rows:
+            row[:] = array("I", bytes(4 * self.width))
+
+
+class TopK:
+    """The ``k`` largest estimates seen, on a min-heap with lazily discarded stale entries."""
+
+    def __init__(self, k: int) -> None:
+        self.k = k
+        self._counts: dict[str, int] = {}
+        self._heap: list[tuple[int, str]] = []
+
+    def _min(self) -> tuple[int, str]:
+        while self._heap[0][0] != self._counts.get(self._heap[0][1]):
+            heapq.heappop(self._heap)
+        return self._heap[0]
+
+    def offer(self, key: str, estimate: int) -> None:
+        if key not in self._counts:
+            if len(self._counts) >= self.k:
+                low, low_key = self._min()
+                if estimate <= low:
+                    return
+                del self._counts[low_key]
+                heapq.heappop(self._heap)
+        self._counts[key] = estimate
+        heapq.heappush(self._heap, (estimate, key))
+        if len(self._heap) > 4 * self.k:
+            self._heap = [(c, k) for k, c in self._counts.items()]
+            heapq.heapify(self._heap)
+
+    def items(self) -> list[tuple[str, int]]:
+        return sorted(self._counts.items(), key=lambda kv: (-kv[1], kv[0]))
+
+    def clear(self) -> None:
+        self._counts.clear()
+        self._heap.clear()
+
+
+class _Stream:
+    def __init__(self, width: int, depth: int, k: int) -> None:
+        self.sketch = CountMinSketch(width, depth)
+        self.top = TopK(k)
+        self.total = 0
+        self.previous: list[tuple[str, int]] = []
+        self.previous_total = 0
+
+
+class HeavyHitterTracker:
+    """One sketch and top-K per stream, reset every ``window`` seconds.
+
+    Memory is fixed by ``width × depth`` and ``k`` regardless of how many
+    distinct keys are seen. The sketches are per worker process; the last
+    completed window is kept for comparison.
+
+    For the view across workers and pods, each worker also counts keys
+    exactly between flushes (at most ``max_pending`` per stream) and adds
+    them to one Redis ranking per stream and window. A key spread thin over
+    many workers still adds up there.
+    """
+
+    def __init__(
+        self,
+        width: int,
+        depth: int,
+        k: int,
+        window: int,
+        redis: Optional[RedisClient] = None,
+        max_pending: int = 10000,
+    ) -> None:
+        self.window = window
+        self.worker = os.getpid()
+        self.k = k
+        self.redis = redis
+        self.max_pending = max_pending
+        self._streams = {name: _Stream(width, depth, k) for name in STREAMS}
+        self._window_start = self._current_start(time.time())
+        # (window_start, stream) → exact counts since the last flush, plus the stream total
+        self._pending: dict[tuple[int, str], tuple[Counter, list[int]]] = {}
+
+    def _current_start(self, now: float) -> int:
+        return int(now // self.window * self.window)
+
+    def _rotate(self, now: float) -> None:
+        start = self._current_start(now)
+        if start == self._window_start:
+            return
+        adjacent = start - self._window_start == self.window
+        for s in self._streams.values():
+            s.previous, s.previous_total = (s.top.items(), s.total) if adjacent else ([], 0)
+            s.sketch.clear()
+            s.top.clear()
+            s.total = 0
+        self._window_start = start
+
+    def record(self, stream: str, key: Optional[str]) -> None:
+        if not key:
+            return
+        self._rotate(time.time())
+        s = self._streams[stream]
+        s.total += 1
+        s.top.offer(key, s.sketch.add(key))
+        counts, total = self._pending.setdefault((self._window_start, stream), (Counter(), [0]))
+        total[0] += 1
+        if key in counts or len(counts) < self.max_pending:
+            counts[key] += 1
+
+    def snapshot(self, limit: int, stream: Optional[str] = None) -> dict[str, Any]:
+        self._rotate(time.time())
+        names = [stream] if stream else list(STREAMS)
+        return {
+            "scope": "worker",
+            "worker": self.worker,
+            "window_seconds": self.window,
+            "window_start": self._window_start,
+            "streams": [
+                {
+                    "stream": name,
+                    "total": self._streams[name].total,
+                    "current": self._streams[name].top.items()[:limit],
+                    "previous_total": self._streams[name].previous_total,
+                    "previous": self._streams[name].previous[:limit],
+                }
+                for name in names
+            ],
+        }
+
+    # Shared view
+    @staticmethod
+    def _shared_keys(stream: str, start: int) -> tuple[str, str]:
+        tag = f"{{{stream}:{start}}}"  # both keys on one cluster slot
+        return f"hh:{tag}:top", f"hh:{tag}:total"
+
+    async def flush(self) -> None:
+        """Add the counts since the last flush to the shared rankings.
+
+        A batch Redis did not take is put back and sent with the next flush.
+        """
+        if self.redis is not None:
+            pending, self._pending = self._pending, {}
+            ttl = 2 * self.window + 60
+            for (start, stream), (counts, total) in pending.items():
+                args: list = [ttl, self.k * SHARED_KEEP_FACTOR, total[0]]
+                for key, n in counts.items():
+                    args += [key, n]
+                try:
+                    _, sent = await self.redis.eval_remote(_FLUSH_LUA, list(self._shared_keys(stream, start)), args)
+                except Exception as exc:
+                    logger.debug("Heavy hitters flush failed: %s", exc)
+                    sent = False
+                if not sent:
+                    self._requeue(start, stream, counts, total[0])
+        # Only the current and previous windows are worth sending later.
+        oldest = self._window_start - self.window
+        self._pending = {k: v for k, v in self._pending.items() if k[0] >= oldest}
+
+    def _requeue(self, start: int, stream: str, counts: Counter, total: int) -> None:
+        mine, pending_total = self._pending.setdefault((start, stream), (Counter(), [0]))
+        pending_total[0] += total
+        for key, n in counts.items():
+            if key in mine or len(mine) < self.max_pending:
+                mine[key] += n
+
+    async def run(self) -> None:
+        """Background task: flush every ``HEAVY_HITTERS_SYNC_SECONDS``."""
+        while True:
+            await asyncio.sleep(settings.HEAVY_HITTERS_SYNC_SECONDS)
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("Heavy hitters flush failed: %s", exc)
+
+    async def _read_shared(self, stream: str, start: int, limit: int) -> tuple[int, list[tuple[str, int]]]:
+        top_key, total_key = self._shared_keys(stream, start)
+        top = await self.redis.fetch_remote("zrevrange", top_key, 0, limit - 1, withscores=True)
+        total = await self.redis.fetch_remote("get", total_key)
+        if top is None:
+            raise ConnectionError("Redis unavailable")
+        return int(total or 0), [(k, int(c)) for k, c in top]
+
+    async def shared_snapshot(self, limit: int, stream: Optional[str] = None) -> dict[str, Any]:
+        """``snapshot`` merged over every worker through Redis, up to one flush behind.
+
+        Falls back to this worker's own ``snapshot`` (``scope: "worker"``)
+        when Redis cannot answer.
+        """
+        self._rotate(time.time())
+        names = [stream] if stream else list(STREAMS)
+        if self.redis is not None:
+            try:
+                streams = []
+                for name in names:
+                    total, current = await self._read_shared(name, self._window_start, limit)
+                    previous_total, previous = await self._read_shared(name, self._window_start - self.window, limit)
+                    streams.append({
+                        "stream": name,
+                        "total": total,
+                        "current": current,
+                        "previous_total": previous_total,
+                        "previous": previous,
+                    })
+                return {
+                    "scope": "shared",
+                    "worker": self.worker,
+                    "window_seconds": self.window,
+                    "window_start": self._window_start,
+                    "streams": streams,
+                }
+            except Exception as exc:
+                logger.debug("Shared heavy hitters unavailable: %s", exc)
+        return self.snapshot(limit, stream)
+
+
+def phone_prefix(phone: str) -> str:
+    return phone[:PHONE_PREFIX_LEN]
+
+
+heavy_hitters = HeavyHitterTracker(
+    width=settings.HEAVY_HITTERS_WIDTH,
+    depth=settings.HEAVY_HITTERS_DEPTH,
+    k=settings.HEAVY_HITTERS_TOP_K,
+    window=settings.HEAVY_HITTERS_WINDOW_SECONDS,
+    redis=redis_client,
+    max_pending=settings.HEAVY_HITTERS_SYNC_MAX_KEYS,
+)
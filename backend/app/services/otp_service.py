@@ -2,62 +2,90 @@
 
 from typing import Optional
 
-from sqlalchemy import func, select, text, update
+from sqlalchemy import func, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.core.redis import RedisClient
+from app.core.local_limiter import LEASE_SPENT, local_limiter
+from app.core.rate_limit import RateLimiter, Window
+from app.core.redis import RedisClient, hash_tag
 from app.core.security import generate_otp_code
 from app.models.otp_code import OTPCode
+from app.services import statements
+from app.services.rejection_cache import rejection_cache
 
 
 class OTPService:
     def __init__(self, db: AsyncSession, redis: RedisClient) -> None:
         self.db = db
         self.redis = redis
+        self.limiter = RateLimiter(redis)
 
     # Rate limiting 
     async def check_rate_limit(
         self, phone: str, ip: str
     ) -> tuple[bool, Optional[str], int]:
-        """Returns (allowed, error_msg, retry_after_sec)."""
-        mk = f"otp:phone:{phone}:minute"
-        hk = f"otp:phone:{phone}:hour"
-        ik = f"otp:ip:{ip}:day"
-
-        mc = await self.redis.get(mk)
-        if mc and int(mc) >= settings.OTP_LIMIT_MINUTE:
-            ttl = max(await self.redis.ttl(mk), 1)
-            return False, "1 daqiqada faqat 1 marta OTP yuborishingiz mumkin", ttl
-
-        hc = await self.redis.get(hk)
-        if hc and int(hc) >= settings.OTP_LIMIT_HOUR:
-            ttl = max(await self.redis.ttl(hk), 1)
-            return False, "1 soatda maksimum 3 marta OTP yuborishingiz mumkin", ttl
-
-        ic = await self.redis.get(ik)
-        if ic and int(ic) >= settings.OTP_LIMIT_DAY_PER_IP:
-            ttl = max(await self.redis.ttl(ik), 1)
-            return False, "Kunlik limit tugadi. Ertaga qaytadan urinib ko'ring", ttl
-
+        """Checks and counts one send.
+
+        Known offenders and the per-IP daily budget are answered from memory
+        (``local_limiter``); only the exact per-phone windows go to Redis.
+        Returns (allowed, error_msg, retry_after_sec); when allowed, retry_after
+        is how long until the per-minute window frees up.
+        """
+        windows = [
+            Window(f"otp:phone:{hash_tag(phone)}:minute", settings.OTP_LIMIT_MINUTE, 60),
+            Window(f"otp:phone:{hash_tag(phone)}:hour", settings.OTP_LIMIT_HOUR, 3600),
+        ]
+        messages = [
+            "1 daqiqada faqat 1 marta OTP yuborishingiz mumkin",
+            f"1 soatda maksimum {settings.OTP_LIMIT_HOUR} marta OTP yuborishingiz mumkin",
+        ]
+        for w, msg in zip(windows, messages):
+            if (retry := local_limiter.blocked_for(w.key)):
+                return False, msg, retry
+
+        ip_key = f"otp:ip:{hash_tag(ip)}:day"
+        daily = "Kunlik limit tugadi. Ertaga qaytadan urinib ko'ring"
+        leased = local_limiter.allow(ip_key, settings.OTP_LIMIT_DAY_PER_IP, 86400)
+        if leased > 0:
+            return False, daily, leased
+        if leased == LEASE_SPENT:
+            # This worker's share is used up; the shared counter decides.
+            windows.append(Window(ip_key, settings.OTP_LIMIT_DAY_PER_IP, 86400))
+            messages.append(daily)
+
+        try:
+            r = await self.limiter.hit(windows)
+        except Exception:
+            if leased == 0:
+                local_limiter.refund(ip_key)
+            raise
+        if not r.allowed:
+            retry = max(r.retry_after, 1)
+            if leased == 0:
+                local_limiter.refund(ip_key)
+            local_limiter.block(r.denied.key, retry)
+            return False, messages[windows.index(r.denied)], retry
+        return True, None, r.ttls[0]
+
+    async def check_verify_rate(self, phone: str, ip: str) -> tuple[bool, Optional[str], int]:
+        """Counts one verify attempt per phone and per IP; returns (allowed, error_msg, retry_after_sec)."""
+        window = settings.OTP_VERIFY_WINDOW_SECONDS
+        r = await self.limiter.hit([
+            Window(f"otp:verify:phone:{hash_tag(phone)}", settings.OTP_VERIFY_LIMIT_PER_PHONE, window),
+            Window(f"otp:verify:ip:{hash_tag(ip)}", settings.OTP_VERIFY_LIMIT_PER_IP, window),
+        ])
+        if not r.allowed:
+            retry = max(r.retry_after, 1)
+            return False, f"Juda ko'p urinish. {retry} soniyadan keyin qaytadan urinib ko'ring", retry
         return True, None, 0
 
-    async def bump_rate_limit(self, phone: str, ip: str) -> None:
-        await self.redis.incr_with_ttl(f"otp:phone:{phone}:minute", 60)
-        await self.redis.incr_with_ttl(f"otp:phone:{phone}:hour", 3600)
-        await self.redis.incr_with_ttl(f"otp:ip:{ip}:day", 86400)
-
-    async def get_retry_after(self, phone: str) -> int:
-        return max(await self.redis.ttl(f"otp:phone:{phone}:minute"), 0)
+    async def clear_no_otp(self, phone: str) -> None:
+        await rejection_cache.clear("otp", phone)
 
     # ── CRUD ────────────────────────────────────────────────────────────────
     async def _deactivate_old(self, phone: str) -> None:
-        stmt = (
-            update(OTPCode)
-            .where(OTPCode.phone_number == phone, OTPCode.is_used == False)  # noqa: E712
-            .values(is_used=True)
-        )
-        await self.db.execute(stmt)
+        await self.db.execute(statements.RETIRE_OTPS, {"phone": phone})
 
     async def create_otp(self, phone: str, ip: str) -> OTPCode:
         await self._deactivate_old(phone)
@@ -76,20 +104,15 @@ class OTPService:
         self, phone: str, code: str
     ) -> tuple[bool, Optional[str], Optional[OTPCode]]:
         """Returns (valid, error_msg, otp)."""
-        stmt = (
-            select(OTPCode)
-            .where(
-                OTPCode.phone_number == phone,
-                OTPCode.is_used == False,  # noqa: E712
-                OTPCode.expires_at > func.now(),
-            )
-            .order_by(OTPCode.created_at.desc())
-            .limit(1)
-        )
-        otp = (await self.db.execute(stmt)).scalar_one_or_none()
+        not_found = "Tasdiqlash kodi topilmadi yoki muddati tugagan. Yangi kod so'rang"
+        if await rejection_cache.is_rejected("otp", phone):
+            return False, not_found, None
+
+        otp = (await self.db.execute(statements.ACTIVE_OTP, {"phone": phone})).scalar_one_or_none()
 
         if not otp:
-            return False, "Tasdiqlash kodi topilmadi yoki muddati tugagan. Yangi kod so'rang", None
+            await rejection_cache.reject("otp", phone, settings.REJECT_NO_OTP_TTL)
+            return False, not_found, None
 
         if otp.attempts >= 3:
             otp.is_used = True
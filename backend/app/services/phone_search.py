@@ -0,0 +1,67 @@
+"""Phone-number search — picks an index-backed strategy from the admin's input."""
+
+import re
+from dataclasses import dataclass
+
+from sqlalchemy import ColumnElement, false
+
+from app.models.user import User
+
+EXACT = "exact"
+PREFIX = "prefix"
+SUFFIX = "suffix"
+SUBSTRING = "substring"
+NONE = "none"
+
+# E.164 numbers with country code are at least this long (+998 90 123 45 67 is 12).
+FULL_NUMBER_MIN = 11
+
+_NON_DIGITS = re.compile(r"\D")
+
+
+@dataclass(frozen=True)
+class PhoneQuery:
+    strategy: str
+    digits: str
+
+
+def plan(search: str) -> PhoneQuery:
+    """Map admin input to the cheapest strategy that keeps its meaning.
+
+    ``+99890…`` — a full number is an exact match, a partial one a prefix;
+    ``4567*`` / ``*4567`` — explicit prefix / suffix; bare digits — substring
+    (what a plain ``ILIKE '%…%'`` used to do). Spaces, dashes and brackets
+    are ignored.
+    """
+    s = search.strip()
+    digits = _NON_DIGITS.sub("", s)
+    if not digits:
+        return PhoneQuery(NONE, "")
+    if s.endswith("*") and not s.startswith("*"):
+        return PhoneQuery(PREFIX, digits)
+    if s.startswith("*") and not s.endswith("*"):
+        return PhoneQuery(SUFFIX, digits)
+    if s.startswith("+"):
+        return PhoneQuery(EXACT if len(digits) >= FULL_NUMBER_MIN else PREFIX, digits)
+    return PhoneQuery(SUBSTRING, digits)
+
+
+def condition(q: PhoneQuery) -> ColumnElement[bool]:
+    """WHERE clause for ``q``; each strategy is served by one index on the digits columns.
+
+    exact / prefix — ``idx_user_digits_prefix`` (text_pattern_ops B-tree),
+    suffix — ``idx_user_digits_suffix`` on the reversed digits,
+    substring — ``idx_user_digits_trgm`` (pg_trgm GIN). Fragments shorter
+    than a trigram match so many rows that Postgres reads the page index in
+    order instead. ``digits`` holds no LIKE wildcards, so the pattern is
+    passed whole — a plain ``'123%'`` the planner can turn into an index range.
+    """
+    if q.strategy == EXACT:
+        return User.phone_digits == q.digits
+    if q.strategy == PREFIX:
+        return User.phone_digits.like(f"{q.digits}%")
+    if q.strategy == SUFFIX:
+        return User.phone_digits_rev.like(f"{q.digits[::-1]}%")
+    if q.strategy == SUBSTRING:
+        return User.phone_digits.like(f"%{q.digits}%")
+    return false()
@@ -0,0 +1,148 @@
+"""RBAC policy — in-process permission catalog, bit-per-permission grants, compiled checks."""
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Callable, Iterable, Optional, Protocol
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.core.config import settings
+from app.core.database import async_session_maker
+from app.core.redis import RedisClient, redis_client
+from app.core.single_flight import single_flight
+from app.models.permission import Permission
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = "rbac:catalog:version"
+_LOAD_KEY = "rbac:catalog"
+
+
+@dataclass(frozen=True)
+class PermissionInfo:
+    id: UUID
+    name: str
+    description: Optional[str]
+    resource: str
+    action: str
+
+
+class Grants(Protocol):
+    is_super_admin: bool
+    permissions: frozenset[str]
+    mask: int
+    catalog_version: int
+
+
+class PermissionCatalog:
+    """Permissions table loaded once per worker; each name owns one bit.
+
+    Bits are only meaningful within one ``version`` — masks built under an
+    older version fall back to a name lookup.
+    """
+
+    def __init__(self, redis: RedisClient) -> None:
+        self.redis = redis
+        self.version = 0
+        self.remote_version: Optional[str] = None
+        self.items: list[PermissionInfo] = []
+        self._bits: dict[str, int] = {}
+        self._by_id: dict[UUID, PermissionInfo] = {}
+
+    @property
+    def loaded(self) -> bool:
+        return bool(self.items)
+
+    def _install(self, items: list[PermissionInfo]) -> None:
+        items = sorted(items, key=lambda p: (p.resource, p.action, p.name))
+        self.items = items
+        self._bits = {p.name: 1 << i for i, p in enumerate(sorted(items, key=lambda p: p.name))}
+        self._by_id = {p.id: p for p in items}
+        self.version += 1
+
+    async def load(self, db: Optional[AsyncSession] = None) -> None:
+        # Concurrent misses in one worker trigger a single reload.
+        await single_flight.do(_LOAD_KEY, lambda: self._load(db), shared=False)
+
+    async def _load(self, db: Optional[AsyncSession]) -> None:
+        stmt = select(Permission.id, Permission.name, Permission.description, Permission.resource, Permission.action)
+        if db is None:
+            async with async_session_maker() as own:
+                rows = (await own.execute(stmt)).all()
+        else:
+            rows = (await db.execute(stmt)).all()
+        self._install([PermissionInfo(*r) for r in rows])
+        logger.info("Permission catalog v%d loaded (%d permissions)", self.version, len(self.items))
+
+    # Bits
+    def bit(self, name: str) -> int:
+        return self._bits.get(name, 0)
+
+    def mask_of(self, names: Iterable[str]) -> int:
+        mask = 0
+        for n in names:
+            mask |= self._bits.get(n, 0)
+        return mask
+
+    def compile(self, name: str) -> Callable[[Grants], bool]:
+        """``name`` → a check that is one AND against the admin's mask."""
+        compiled = [-1, 0]
+
+        def check(admin: Grants) -> bool:
+            if admin.is_super_admin:
+                return True
+            if compiled[0] != self.version:
+                compiled[0], compiled[1] = self.version, self.bit(name)
+            if compiled[1] and admin.catalog_version == self.version:
+                return bool(admin.mask & compiled[1])
+            return name in admin.permissions
+
+        return check
+
+    # Lookups
+    async def resolve(self, db: AsyncSession, ids: list[UUID]) -> Optional[list[PermissionInfo]]:
+        """Catalog entries for ``ids``, reloading once on a miss; None if any is unknown."""
+        if not self.loaded or any(i not in self._by_id for i in ids):
+            await self.load(db)
+        if any(i not in self._by_id for i in ids):
+            return None
+        return [self._by_id[i] for i in ids]
+
+    @staticmethod
+    async def attach(db: AsyncSession, infos: list[PermissionInfo]) -> list[Permission]:
+        """Session-bound ``Permission`` instances built from the catalog, without a SELECT."""
+        out = []
+        for p in infos:
+            obj = Permission(id=p.id, name=p.name, description=p.description, resource=p.resource, action=p.action)
+            make_transient_to_detached(obj)
+            out.append(await db.merge(obj, load=False))
+        return out
+
+    # Cross-worker versioning
+    async def publish_change(self) -> None:
+        """Tell every worker to reload (call after changing the permissions table)."""
+        await self.redis.incr(VERSION_KEY)
+
+    async def watch(self) -> None:
+        """Background task: reload when another process bumps the catalog version."""
+        while True:
+            try:
+                remote = await self.redis.get(VERSION_KEY)
+                if remote != self.remote_version:
+                    if self.remote_version is not None or not self.loaded:
+                        # A load already running may predate the change.
+                        single_flight.forget(_LOAD_KEY)
+                        await self.load()
+                    self.remote_version = remote
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.debug("Permission catalog check skipped: %s", exc)
+            await asyncio.sleep(settings.RBAC_CATALOG_CHECK_SECONDS)
+
+
+permission_catalog = PermissionCatalog(redis_client)
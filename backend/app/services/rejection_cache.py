@@ -0,0 +1,59 @@
+"""Pre-database rejection cache — negative lookups for auth endpoints."""
+
+import logging
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.redis import RedisClient, redis_client
+
+logger = logging.getLogger(__name__)
+
+
+class RejectionCache:
+    """Remembers lookups that are known to fail so attack traffic stops before Postgres.
+
+    Entries live in Redis (shared by workers) with a short in-process copy in
+    front; a cleared entry can linger locally for at most REJECT_LOCAL_TTL.
+    """
+
+    def __init__(self, redis: RedisClient) -> None:
+        self.redis = redis
+        self.local: TTLCache[bool] = TTLCache(settings.REJECT_LOCAL_SIZE, settings.REJECT_LOCAL_TTL)
+
+    @staticmethod
+    def _key(kind: str, value: str) -> str:
+        return f"neg:{kind}:{value}"
+
+    async def is_rejected(self, kind: str, value: str) -> bool:
+        key = self._key(kind, value)
+        if self.local.get(key):
+            return True
+        try:
+            hit = await self.redis.exists(key)
+        except Exception as exc:
+            logger.debug("Rejection cache read skipped: %s", exc)
+            return False
+        if hit:
+            self.local.set(key, True)
+        return hit
+
+    async def reject(self, kind: str, value: str, ttl: int) -> None:
+        if ttl <= 0:
+            return
+        key = self._key(kind, value)
+        self.local.set(key, True, ttl=min(ttl, self.local.ttl))
+        try:
+            await self.redis.setex(key, ttl, "1")
+        except Exception as exc:
+            logger.debug("Rejection cache write skipped: %s", exc)
+
+    async def clear(self, kind: str, value: str) -> None:
+        key = self._key(kind, value)
+        self.local.pop(key)
+        try:
+            await self.redis.delete(key)
+        except Exception as exc:
+            logger.warning("Rejection cache clear failed for %s: %s", key, exc)
+
+
+rejection_cache = RejectionCache(redis_client)
@@ -0,0 +1,65 @@
+"""Hot-path statements — built once at import, executed with bound parameters.
+
+A statement object that is reused keeps its memoized cache key, so each
+call skips construction and cache-key generation and goes straight to the
+engine's compiled cache (and, on asyncpg, to the connection's prepared
+statement). Pass parameters by name: ``db.execute(USER_BY_ID, {"uid": uid})``.
+"""
+
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.orm import selectinload
+
+from app.models.admin import Admin
+from app.models.admin_session import AdminSession
+from app.models.otp_code import OTPCode
+from app.models.refresh_token import RefreshToken
+from app.models.user import User
+
+# Users
+USER_AUTH_BY_ID = select(User.id, User.phone_number, User.is_active).where(User.id == bindparam("uid"))
+USER_BY_ID = select(User).where(User.id == bindparam("uid"))
+USER_BY_PHONE = select(User).where(User.phone_number == bindparam("phone"))
+
+# OTP
+ACTIVE_OTP = (
+    select(OTPCode)
+    .where(
+        OTPCode.phone_number == bindparam("phone"),
+        OTPCode.is_used == False,  # noqa: E712
+        OTPCode.expires_at > func.now(),
+    )
+    .order_by(OTPCode.created_at.desc())
+    .limit(1)
+)
+# "evaluate" cannot see bound parameters and would leave loaded rows stale.
+RETIRE_OTPS = (
+    update(OTPCode)
+    .where(OTPCode.phone_number == bindparam("phone"), OTPCode.is_used == False)  # noqa: E712
+    .values(is_used=True)
+    .execution_options(synchronize_session="fetch")
+)
+
+# Refresh tokens
+REFRESH_TOKEN_BY_HASH = select(RefreshToken).where(
+    RefreshToken.token_hash == bindparam("token_hash"),
+    RefreshToken.is_revoked == False,  # noqa: E712
+)
+
+# Admins
+ADMIN_BY_LOGIN = (
+    select(Admin)
+    .options(selectinload(Admin.permissions))
+    .where((Admin.username == bindparam("login")) | (Admin.email == bindparam("login")))
+)
+
+# Admin sessions
+ADMIN_SESSION_BY_TOKEN = (
+    select(AdminSession)
+    .options(selectinload(AdminSession.admin).selectinload(Admin.permissions))
+    .where(AdminSession.session_token == bindparam("token"))
+)
+ADMIN_SESSION_ALIVE = (
+    select(AdminSession.id)
+    .join(Admin, Admin.id == AdminSession.admin_id)
+    .where(AdminSession.id == bindparam("sid"), Admin.is_active == True)  # noqa: E712
+)
@@ -4,7 +4,6 @@ from datetime import datetime, timedelta, timezone
 from typing import Optional
 from uuid import UUID
 
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
@@ -17,8 +16,12 @@ from app.core.security import (
 )
 from app.models.refresh_token import RefreshToken
 from app.models.user import User
+from app.services import heavy_hitters as hh
+from app.services import statements
 from app.services.otp_service import OTPService
 from app.services.telegram_service import TelegramService
+from app.services.rejection_cache import rejection_cache
+from app.services.user_cache import user_auth_cache
 
 
 class UserAuthService:
@@ -32,11 +35,13 @@ class UserAuthService:
     async def send_otp(
         self, phone: str, ip: str, telegram_chat_id: Optional[int] = None
     ) -> tuple[bool, Optional[str], int]:
-        allowed, err, retry = await self.otp.check_rate_limit(phone, ip)
+        hh.heavy_hitters.record(hh.OTP_SEND_IP, ip)
+        hh.heavy_hitters.record(hh.OTP_SEND_PHONE_PREFIX, hh.phone_prefix(phone))
+        allowed, err, retry_after = await self.otp.check_rate_limit(phone, ip)
         if not allowed:
-            return False, err, retry
+            return False, err, retry_after
 
-        user = (await self.db.execute(select(User).where(User.phone_number == phone))).scalar_one_or_none()
+        user = (await self.db.execute(statements.USER_BY_PHONE, {"phone": phone})).scalar_one_or_none()
         if user and not user.is_active:
             return False, "Foydalanuvchi bloklangan. Administrator bilan bog'laning", 0
 
@@ -46,26 +51,31 @@ class UserAuthService:
 
         otp = await self.otp.create_otp(phone, ip)
         await self.db.commit()
+        await self.otp.clear_no_otp(phone)
 
         # OTP ni Telegram ga yuborish
         tg_id = (user.telegram_id if user else None) or telegram_chat_id
         if tg_id:
             await self.telegram.send_otp_message(int(tg_id), otp.code)
 
-        await self.otp.bump_rate_limit(phone, ip)
-        retry = await self.otp.get_retry_after(phone)
-        return True, None, max(retry, 60)
+        return True, None, max(retry_after, 60)
 
     # Verify OTP 
     async def verify_otp(
-        self, phone: str, code: str
+        self, phone: str, code: str, ip: str
     ) -> tuple[bool, Optional[str], Optional[User], Optional[str], Optional[str]]:
+        hh.heavy_hitters.record(hh.OTP_VERIFY_IP, ip)
+        hh.heavy_hitters.record(hh.OTP_VERIFY_PHONE, phone)
+        allowed, err, _ = await self.otp.check_verify_rate(phone, ip)
+        if not allowed:
+            return False, err, None, None, None
+
         ok, err, _ = await self.otp.verify_otp(phone, code)
         if not ok:
             await self.db.commit()
             return False, err, None, None, None
 
-        user = (await self.db.execute(select(User).where(User.phone_number == phone))).scalar_one_or_none()
+        user = (await self.db.execute(statements.USER_BY_PHONE, {"phone": phone})).scalar_one_or_none()
         if not user:
             user = User(phone_number=phone)
             self.db.add(user)
@@ -100,18 +110,26 @@ class UserAuthService:
         if not uid:
             return False, "Noto'g'ri token", None, None
 
+        if await user_auth_cache.is_revoked(UUID(uid), payload.get("iat")):
+            return False, "Token bekor qilingan", None, None
+
+        token_hash = hash_token(raw_token)
+        if await rejection_cache.is_rejected("refresh", token_hash):
+            return False, "Token topilmadi yoki muddati tugagan", None, None
+        # A rejected refresh token stays rejected until it would have expired anyway.
+        reject_ttl = int(payload.get("exp", 0) - datetime.now(timezone.utc).timestamp())
+
         stored = (
-            await self.db.execute(
-                select(RefreshToken)
-                .where(RefreshToken.token_hash == hash_token(raw_token), RefreshToken.is_revoked == False)  # noqa: E712
-            )
+            await self.db.execute(statements.REFRESH_TOKEN_BY_HASH, {"token_hash": token_hash})
         ).scalar_one_or_none()
 
         if not stored or not stored.is_valid():
+            await rejection_cache.reject("refresh", token_hash, reject_ttl)
             return False, "Token topilmadi yoki muddati tugagan", None, None
 
-        user = (await self.db.execute(select(User).where(User.id == UUID(uid)))).scalar_one_or_none()
+        user = (await self.db.execute(statements.USER_BY_ID, {"uid": UUID(uid)})).scalar_one_or_none()
         if not user or not user.is_active:
+            await rejection_cache.reject("refresh", token_hash, reject_ttl)
             return False, "Foydalanuvchi topilmadi yoki bloklangan", None, None
 
         stored.is_revoked = True
@@ -0,0 +1,200 @@
+"""User auth-record cache and token epochs — in-process TTL LRU in front of Redis, invalidated via pub/sub."""
+
+import asyncio
+import json
+import logging
+import time
+from dataclasses import asdict, dataclass
+from typing import Optional
+from uuid import UUID, uuid4
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.memory_store import MemoryStore, local_script
+from app.core.redis import RedisClient, redis_client
+from app.core.single_flight import single_flight
+from app.services import statements
+
+logger = logging.getLogger(__name__)
+
+INVALIDATE_CHANNEL = "user:auth:invalidate"
+
+# ``invalidate`` leaves a tombstone instead of deleting, each one unique, so a
+# fill can tell that the key changed since its read (records are JSON objects).
+_TOMBSTONE = "~"
+
+# Fill KEYS[1] only if it still holds what the loader read (ARGV[1], '' = missing).
+_FILL_LUA = """
+if (redis.call('GET', KEYS[1]) or '') ~= ARGV[1] then
+  return 0
+end
+redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+return 1
+"""
+
+
+@local_script(_FILL_LUA)
+def _local_fill(store: MemoryStore, keys: list, args: list) -> int:
+    if (store.get(keys[0]) or "") != args[0]:
+        return 0
+    store.set(keys[0], args[1], ex=int(args[2]))
+    return 1
+
+
+@dataclass(frozen=True)
+class UserAuthRecord:
+    """The minimal user state the auth guard needs."""
+
+    id: UUID
+    phone_number: str
+    is_active: bool
+
+    def to_json(self) -> str:
+        return json.dumps({**asdict(self), "id": str(self.id)})
+
+    @classmethod
+    def from_json(cls, raw: str) -> "UserAuthRecord":
+        d = json.loads(raw)
+        return cls(id=UUID(d["id"]), phone_number=d["phone_number"], is_active=d["is_active"])
+
+
+class UserAuthCache:
+    def __init__(self, redis: RedisClient) -> None:
+        self.redis = redis
+        self.local: TTLCache[UserAuthRecord] = TTLCache(settings.USER_CACHE_LOCAL_SIZE, settings.USER_CACHE_LOCAL_TTL)
+        self.epochs: TTLCache[float] = TTLCache(settings.USER_CACHE_LOCAL_SIZE, settings.USER_CACHE_LOCAL_TTL)
+        # Bumped by every invalidation seen here; a load that spans one skips the local fill.
+        self._invalidations = 0
+
+    @staticmethod
+    def _key(uid: UUID) -> str:
+        return f"user:auth:{uid}"
+
+    @staticmethod
+    def _epoch_key(uid: UUID) -> str:
+        return f"user:epoch:{uid}"
+
+    # Token epoch 
+    async def epoch(self, uid: UUID) -> float:
+        """Tokens with ``iat`` below this value are revoked (0 = none)."""
+        cached = self.epochs.get(uid)
+        if cached is not None:
+            return cached
+        return await single_flight.do(self._epoch_key(uid), lambda: self._load_epoch(uid), shared=False)
+
+    async def _load_epoch(self, uid: UUID) -> float:
+        try:
+            raw, remote = await self.redis.fetch("get", self._epoch_key(uid))
+        except Exception as exc:
+            logger.debug("Token epoch read skipped: %s", exc)
+            return 0
+        value = float(raw) if raw else 0.0
+        if remote:
+            # A local answer knows only this worker's bumps; ask again next time.
+            self.epochs.set(uid, value)
+        return value
+
+    async def bump_epoch(self, uid: UUID) -> None:
+        """Revoke every token issued for this user up to now.
+
+        Same resolution as ``iat`` (sub-second), so a token issued just after
+        the bump — a re-login — stays valid. Older whole-second ``iat`` values
+        truncate down and are still caught.
+        """
+        value = time.time()
+        # Kept as long as the longest-lived token could still be presented.
+        ttl = max(settings.JWT_REFRESH_EXPIRATION_DAYS * 86400, settings.JWT_ACCESS_EXPIRATION_MINUTES * 60)
+        try:
+            await self.redis.setex(self._epoch_key(uid), ttl, repr(value), durable=True)
+        except Exception as exc:
+            logger.warning("Token epoch for %s not stored: %s", uid, exc)
+        await self.invalidate(uid)
+        self.epochs.set(uid, value)
+
+    async def is_revoked(self, uid: UUID, iat: object) -> bool:
+        if not isinstance(iat, (int, float)):
+            return True
+        return iat < await self.epoch(uid)
+
+    # Auth record 
+    async def get(self, uid: UUID, db: AsyncSession) -> Optional[UserAuthRecord]:
+        record = self.local.get(uid)
+        if record:
+            return record
+        return await single_flight.do(self._key(uid), lambda: self._load(uid, db))
+
+    async def _load(self, uid: UUID, db: AsyncSession) -> Optional[UserAuthRecord]:
+        seen = self._invalidations
+        try:
+            raw = await self.redis.get(self._key(uid))
+        except Exception as exc:
+            logger.debug("User cache read skipped: %s", exc)
+            raw = None
+        if raw and not raw.startswith(_TOMBSTONE):
+            record = UserAuthRecord.from_json(raw)
+            if seen == self._invalidations:
+                self.local.set(uid, record)
+            return record
+
+        row = (
+            await db.execute(statements.USER_AUTH_BY_ID, {"uid": uid})
+        ).one_or_none()
+        if not row:
+            return None
+        record = UserAuthRecord(id=row.id, phone_number=row.phone_number, is_active=row.is_active)
+        if seen != self._invalidations:
+            return record  # invalidated while loading: cache nothing, the next read loads again
+        self.local.set(uid, record)
+        try:
+            # Compare-and-set: an invalidation anywhere since the read left a new tombstone.
+            await self.redis.eval_script(
+                _FILL_LUA, [self._key(uid)], [raw or "", record.to_json(), settings.USER_CACHE_REDIS_TTL]
+            )
+        except Exception as exc:
+            logger.debug("User cache write skipped: %s", exc)
+        return record
+
+    def _forget(self, uid: UUID) -> None:
+        """Drop this worker's copies, including loads in flight that may predate the change."""
+        self._invalidations += 1
+        self.local.pop(uid)
+        self.epochs.pop(uid)
+        single_flight.forget(self._key(uid))
+        single_flight.forget(self._epoch_key(uid))
+
+    async def invalidate(self, uid: UUID) -> None:
+        """Drop the record here, in Redis, and in every other worker."""
+        self._forget(uid)
+        try:
+            tombstone = _TOMBSTONE + uuid4().hex
+            await self.redis.setex(self._key(uid), settings.USER_CACHE_REDIS_TTL, tombstone, durable=True)
+            await self.redis.publish(INVALIDATE_CHANNEL, str(uid), durable=True)
+        except Exception as exc:
+            logger.warning("User cache invalidation for %s not broadcast: %s", uid, exc)
+
+    async def listen(self) -> None:
+        """Background task: apply invalidations published by other workers."""
+        delay = 1
+        while True:
+            try:
+                pubsub = self.redis.client.pubsub()
+                await pubsub.subscribe(INVALIDATE_CHANNEL)
+                # Anything cached before (re)subscribing may have missed a message.
+                self._invalidations += 1
+                self.local.clear()
+                self.epochs.clear()
+                delay = 1
+                async for msg in pubsub.listen():
+                    if msg.get("type") == "message":
+                        self._forget(UUID(msg["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("User cache listener: %s — retrying in %ds", exc, delay)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30)
+
+
+user_auth_cache = UserAuthCache(redis_client)
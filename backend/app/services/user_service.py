@@ -3,52 +3,65 @@
 from typing import Optional
 from uuid import UUID
 
-from sqlalchemy import func, or_, select
+from sqlalchemy import func, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.pagination import EPOCH, EPOCH_SQL, Page, SortKey, TotalMode, count_rows, cut, decode_cursor, keyset_query
 from app.models.refresh_token import RefreshToken
 from app.models.user import User
+from app.services import phone_search, statements
+from app.services.user_cache import user_auth_cache
+
+
+# Each key is backed by an (is_active, key, id) index — see models/user.py.
+SORT_KEYS: dict[str, SortKey] = {
+    "created_at": SortKey(lambda u: u.created_at, lambda u: u.created_at),
+    "phone_number": SortKey(lambda u: u.phone_number, lambda u: u.phone_number, parse=str),
+    "last_login": SortKey(lambda u: func.coalesce(u.last_login, EPOCH_SQL), lambda u: u.last_login or EPOCH),
+}
 
 
 class UserService:
+    """``get_all`` / ``get_by_id`` only read, so endpoints may hand them a ``get_read_db`` session."""
+
     def __init__(self, db: AsyncSession) -> None:
         self.db = db
 
     async def get_all(
         self,
-        page: int = 1,
         limit: int = 20,
+        cursor: Optional[str] = None,
         search: Optional[str] = None,
         is_active: Optional[bool] = None,
         sort_by: str = "created_at",
         sort_order: str = "desc",
-    ) -> tuple[list[User], int]:
-        q = select(User)
-        cq = select(func.count()).select_from(User)
-
-        if search:
-            f = or_(User.phone_number.ilike(f"%{search}%"))
-            q = q.where(f)
-            cq = cq.where(f)
+        total: TotalMode = "estimate",
+    ) -> tuple[bool, Optional[str], Optional[Page[User]]]:
+        key = SORT_KEYS.get(sort_by)
+        if key is None:
+            return False, f"Saralash faqat: {', '.join(SORT_KEYS)}", None
+        after = None
+        if cursor:
+            try:
+                after = decode_cursor(cursor, sort_by, sort_order, key)
+            except ValueError:
+                return False, "Noto'g'ri cursor", None
+
+        where = [phone_search.condition(phone_search.plan(search))] if search else []
+        stmt = keyset_query(User, key, sort_order == "desc", limit + 1, where, after, is_active)
+        rows = list((await self.db.execute(stmt)).scalars().all())
+        users, next_cursor = cut(rows, limit, sort_by, sort_order, key)
 
         if is_active is not None:
-            q = q.where(User.is_active == is_active)
-            cq = cq.where(User.is_active == is_active)
-
-        total = (await self.db.execute(cq)).scalar() or 0
-
-        col = getattr(User, sort_by, User.created_at)
-        q = q.order_by(col.desc() if sort_order == "desc" else col.asc())
-        q = q.offset((page - 1) * limit).limit(limit)
-
-        users = list((await self.db.execute(q)).scalars().all())
-        return users, total
+            where.append(User.is_active == is_active)
+        count, exact = await count_rows(self.db, User, where, total) if cursor is None else (None, False)
+        return True, None, Page(users, next_cursor, count, exact)
 
     async def get_by_id(self, uid: UUID) -> Optional[User]:
-        return (await self.db.execute(select(User).where(User.id == uid))).scalar_one_or_none()
+        return (await self.db.execute(statements.USER_BY_ID, {"uid": uid})).scalar_one_or_none()
 
     async def get_by_phone(self, phone: str) -> Optional[User]:
-        return (await self.db.execute(select(User).where(User.phone_number == phone))).scalar_one_or_none()
+        return (await self.db.execute(statements.USER_BY_PHONE, {"phone": phone})).scalar_one_or_none()
 
     async def update(
         self,
@@ -72,6 +85,10 @@ class UserService:
             user.is_active = is_active
 
         await self.db.commit()
+        if is_active is False:
+            await user_auth_cache.bump_epoch(uid)
+        else:
+            await user_auth_cache.invalidate(uid)
         await self.db.refresh(user)
         return True, None, user
 
@@ -81,11 +98,14 @@ class UserService:
             return False, "Foydalanuvchi topilmadi", None
 
         user.is_active = False
-        tokens = (await self.db.execute(select(RefreshToken).where(RefreshToken.user_id == uid))).scalars().all()
-        for t in tokens:
-            t.is_revoked = True
+        await self.db.execute(
+            update(RefreshToken)
+            .where(RefreshToken.user_id == uid, RefreshToken.is_revoked == False)  # noqa: E712
+            .values(is_revoked=True)
+        )
 
         await self.db.commit()
+        await user_auth_cache.bump_epoch(uid)
         await self.db.refresh(user)
         return True, None, user
 
@@ -95,6 +115,7 @@ class UserService:
             return False, "Foydalanuvchi topilmadi", None
         user.is_active = True
         await self.db.commit()
+        await user_auth_cache.invalidate(uid)
         await self.db.refresh(user)
         return True, None, user
 
@@ -104,4 +125,18 @@ class UserService:
             return False, "Foydalanuvchi topilmadi"
         await self.db.delete(user)
         await self.db.commit()
+        await user_auth_cache.bump_epoch(uid)
+        return True, None
+
+    async def force_logout(self, uid: UUID) -> tuple[bool, Optional[str]]:
+        """Revoke every access and refresh token issued to the user so far."""
+        if not await self.get_by_id(uid):
+            return False, "Foydalanuvchi topilmadi"
+        await self.db.execute(
+            update(RefreshToken)
+            .where(RefreshToken.user_id == uid, RefreshToken.is_revoked == False)  # noqa: E712
+            .values(is_revoked=True)
+        )
+        await self.db.commit()
+        await user_auth_cache.bump_epoch(uid)
         return True, None
@@ -0,0 +1 @@
+"""Microbenchmarks — run as modules, e.g. ``python -m benchmarks.jwt_verify``."""
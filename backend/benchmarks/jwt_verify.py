@@ -0,0 +1,46 @@
+"""
+Access-token verification benchmark — python-jose vs precompiled verifier vs cache.
+
+Ishga tushirish:
+    cd backend
+    python -m benchmarks.jwt_verify
+"""
+
+import sys
+import timeit
+from pathlib import Path
+
+_root = str(Path(__file__).resolve().parent.parent)
+if _root not in sys.path:
+    sys.path.insert(0, _root)
+
+from app.core.config import settings
+from app.core.security import _jwt_decode, access_token_cache, create_access_token, decode_access_token
+from app.core.token_cache import HS256Verifier
+
+N = 20000
+
+
+def main() -> None:
+    token = create_access_token({"sub": "00000000-0000-0000-0000-000000000001", "phone": "+998901234567"})
+    verifier = HS256Verifier(settings.JWT_ACCESS_SECRET)
+
+    def jose_path() -> None:
+        _jwt_decode(token, settings.JWT_ACCESS_SECRET, "access")
+
+    def verifier_path() -> None:
+        verifier.verify(token)
+
+    def cached_path() -> None:
+        decode_access_token(token)
+
+    access_token_cache.clear()
+    decode_access_token(token)
+
+    for name, fn in (("python-jose", jose_path), ("HS256Verifier", verifier_path), ("cache hit", cached_path)):
+        sec = min(timeit.repeat(fn, number=N, repeat=3))
+        print(f"{name:<14} {sec / N * 1e6:8.2f} µs/op")
+
+
+if __name__ == "__main__":
+    main()
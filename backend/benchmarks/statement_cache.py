@@ -0,0 +1,93 @@
+"""
+Hot auth queries — statements built per call vs the precompiled registry.
+
+Times what happens before a query reaches the driver: building the
+statement, generating its cache key and finding it in the compiled cache.
+No database is needed.
+
+Ishga tushirish:
+    cd backend
+    python -m benchmarks.statement_cache
+"""
+
+import sys
+import timeit
+import uuid
+from pathlib import Path
+
+_root = str(Path(__file__).resolve().parent.parent)
+if _root not in sys.path:
+    sys.path.insert(0, _root)
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql.asyncpg import PGDialect_asyncpg
+from sqlalchemy.util import LRUCache
+
+from app.models.otp_code import OTPCode
+from app.models.refresh_token import RefreshToken
+from app.models.user import User
+from app.services import statements
+
+N = 5000
+
+dialect = PGDialect_asyncpg()
+compiled_cache = LRUCache(500)
+
+
+def _prepare(stmt) -> None:
+    """What ``Connection.execute`` does before talking to the driver."""
+    stmt._compile_w_cache(dialect, compiled_cache=compiled_cache, column_keys=[], for_executemany=False)
+
+
+def main() -> None:
+    uid = uuid.uuid4()
+    phone = "+998901234567"
+    token_hash = "0" * 64
+
+    # get_current_user → UserAuthCache._load
+    def user_inline() -> None:
+        _prepare(select(User.id, User.phone_number, User.is_active).where(User.id == uid))
+
+    def user_registry() -> None:
+        _prepare(statements.USER_AUTH_BY_ID)
+
+    # OTPService.verify_otp
+    def otp_inline() -> None:
+        _prepare(
+            select(OTPCode)
+            .where(
+                OTPCode.phone_number == phone,
+                OTPCode.is_used == False,  # noqa: E712
+                OTPCode.expires_at > func.now(),
+            )
+            .order_by(OTPCode.created_at.desc())
+            .limit(1)
+        )
+
+    def otp_registry() -> None:
+        _prepare(statements.ACTIVE_OTP)
+
+    # UserAuthService.refresh_tokens
+    def refresh_inline() -> None:
+        _prepare(select(RefreshToken).where(RefreshToken.token_hash == token_hash, RefreshToken.is_revoked == False))  # noqa: E712
+        _prepare(select(User).where(User.id == uid))
+
+    def refresh_registry() -> None:
+        _prepare(statements.REFRESH_TOKEN_BY_HASH)
+        _prepare(statements.USER_BY_ID)
+
+    cases = (
+        ("get_current_user", user_inline, user_registry),
+        ("verify_otp", otp_inline, otp_registry),
+        ("refresh_tokens", refresh_inline, refresh_registry),
+    )
+    print(f"{'path':<18} {'per call':>12} {'registry':>12} {'saved':>8}")
+    for name, inline, registry in cases:
+        inline(), registry()  # warm the compiled cache
+        a = min(timeit.repeat(inline, number=N, repeat=3)) / N * 1e6
+        b = min(timeit.repeat(registry, number=N, repeat=3)) / N * 1e6
+        print(f"{name:<18} {a:9.2f} µs {b:9.2f} µs {1 - b / a:7.0%}")
+
+
+if __name__ == "__main__":
+    main()
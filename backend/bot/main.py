@@ -13,6 +13,7 @@ import asyncio
 import logging
 import sys
 import re
+import uuid
 from pathlib import Path
 
 import httpx
@@ -150,17 +151,26 @@ def validate_phone_number(phone: str) -> str | None:
 
 
 async def request_otp(client: httpx.AsyncClient, phone: str, chat_id: int) -> dict:
-    """Backend API ga OTP so'rovi yuboradi."""
+    """Backend API ga OTP so'rovi yuboradi (timeout bo'lsa bir xil Idempotency-Key bilan qayta urinadi)."""
+    key = str(uuid.uuid4())
     try:
-        response = await client.post(
-            f"{BACKEND_URL}/api/auth/send-otp",
-            json={
-                "phone_number": phone,
-                "telegram_chat_id": chat_id
-            },
-            timeout=httpx.Timeout(10)
-        )
-        
+        for attempt in range(3):
+            try:
+                response = await client.post(
+                    f"{BACKEND_URL}/api/auth/send-otp",
+                    json={
+                        "phone_number": phone,
+                        "telegram_chat_id": chat_id
+                    },
+                    headers={"Idempotency-Key": key},
+                    timeout=httpx.Timeout(10)
+                )
+                break
+            except httpx.TimeoutException:
+                if attempt == 2:
+                    raise
+                log.warning("Backend javob bermadi, qayta urinish (%d)", attempt + 1)
+
         if response.status_code == 200:
             return {"success": True, "data": response.json()}
         else:
@@ -0,0 +1,209 @@
+"""
+Admin Session Cache Tests
+"""
+import uuid
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app.core.circuit_breaker import CircuitBreaker
+from app.core.config import settings
+from app.core.redis import RedisClient
+from app.services.admin_session_cache import AdminSessionCache, CachedAdmin, CachedSession, SessionRevocationError
+
+
+class FakeRedis:
+    """Dict-backed stand-in for the RedisClient helpers used by the cache"""
+
+    degraded = False
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def setex(self, key, seconds, value, durable=False):
+        self.data[key] = value
+
+    async def sadd(self, key, *members):
+        self.data.setdefault(key, set()).update(members)
+
+    async def mget(self, *keys):
+        return [self.data.get(k) for k in keys]
+
+    async def incr(self, key):
+        self.data[key] = str(int(self.data.get(key, 0)) + 1)
+        return int(self.data[key])
+
+    async def smembers(self, key):
+        return set(self.data.get(key, set()))
+
+    async def expire(self, key, seconds):
+        pass
+
+    async def delete(self, *keys, durable=False):
+        for k in keys:
+            self.data.pop(k, None)
+
+    async def durable(self, label, op, local=None):
+        return await op(self)
+
+
+class DownRedis:
+    """Redis whose every call fails"""
+
+    degraded = False
+
+    def __getattr__(self, name):
+        async def fail(*args, **kwargs):
+            raise ConnectionError("Redis down")
+        return fail
+
+
+class FlakyClient:
+    """Raw Redis client that refuses commands until it is brought up"""
+
+    def __init__(self):
+        self.up = False
+        self.sent = []
+
+    def __getattr__(self, name):
+        async def call(*args, **kwargs):
+            if not self.up:
+                raise RedisConnectionError("Connection refused")
+            self.sent.append((name, *args))
+            return [None, None] if name == "mget" else 1
+        return call
+
+
+def _snapshot():
+    aid = uuid.uuid4()
+    now = datetime.now(timezone.utc)
+    admin = CachedAdmin(aid, "editor", "e@example.com", False, True, now, frozenset({"can_view_users"}))
+    session = CachedSession(uuid.uuid4(), aid, "raw-token", "csrf", now + timedelta(hours=1))
+    return admin, session
+
+
+class TestAdminSessionCache:
+    """Tests for Redis-cached admin session snapshots"""
+
+    @pytest.mark.asyncio
+    async def test_roundtrip_keeps_permissions(self):
+        """A stored snapshot comes back with the same permissions and CSRF token"""
+        cache = AdminSessionCache(FakeRedis())
+        admin, session = _snapshot()
+        await cache.put(admin, session, await cache.fill_marker())
+
+        got_admin, got_session = await cache.get("raw-token")
+        assert got_admin == admin
+        assert got_session.csrf_token == "csrf" and got_session.session_token == "raw-token"
+        assert got_admin.has_permission("can_view_users")
+        assert not got_admin.has_permission("can_delete_user")
+
+    @pytest.mark.asyncio
+    async def test_drop_admin_removes_all_sessions(self):
+        """Changing an admin drops every cached session of that admin"""
+        redis = FakeRedis()
+        cache = AdminSessionCache(redis)
+        admin, session = _snapshot()
+        await cache.put(admin, session, await cache.fill_marker())
+
+        await cache.drop_admin(admin.id)
+        assert await cache.get("raw-token") is None
+        assert sorted(redis.data) == ["admin:changes", f"admin:gen:{{{admin.id}}}"]
+
+    @pytest.mark.asyncio
+    async def test_fill_racing_a_drop_is_taken_back(self):
+        """A snapshot read from the DB before an admin change does not stay cached"""
+        redis = FakeRedis()
+        cache = AdminSessionCache(redis)
+        admin, session = _snapshot()
+
+        marker = await cache.fill_marker()
+        await cache.drop_admin(admin.id)  # e.g. deactivated between the DB read and the write
+        await cache.put(admin, session, marker)
+        assert await cache.get("raw-token") is None
+
+        await cache.put(admin, session, await cache.fill_marker())
+        assert await cache.get("raw-token") is not None
+
+
+class TestSignedSessions:
+    """Tests for stateless signed admin cookies"""
+
+    @pytest.mark.asyncio
+    async def test_cookie_roundtrip_and_tamper(self):
+        """A signed cookie carries the snapshot; any edit breaks it"""
+        cache = AdminSessionCache(FakeRedis())
+        admin, session = _snapshot()
+        cookie = await cache.issue_signed(admin, session)
+
+        got_admin, got_session, gen = cache.read_signed(cookie)
+        assert got_admin.permissions == admin.permissions and got_admin.username == "editor"
+        assert got_session.id == session.id and got_session.csrf_token == "csrf" and gen == 0
+
+        head, body, sig = cookie.split(".")
+        assert cache.read_signed(f"{head}.{body}x.{sig}") is None
+        assert cache.read_signed(f"v2.{body}.{sig}") is None
+
+    @pytest.mark.asyncio
+    async def test_denylist_and_generation_revoke(self):
+        """Logout denylists one session; an admin change retires all of them"""
+        cache = AdminSessionCache(FakeRedis())
+        admin, session = _snapshot()
+        cookie = await cache.issue_signed(admin, session)
+        _, _, gen = cache.read_signed(cookie)
+        assert await cache.is_revoked(admin.id, session.id, gen) is False
+
+        await cache.deny(session)
+        assert await cache.is_revoked(admin.id, session.id, gen) is True
+
+        other = CachedSession(uuid.uuid4(), admin.id, "t2", "c2", session.expires_at)
+        _, _, gen2 = cache.read_signed(await cache.issue_signed(admin, other))
+        await cache.drop_admin(admin.id)
+        assert await cache.is_revoked(admin.id, other.id, gen2) is True
+
+    @pytest.mark.asyncio
+    async def test_logout_during_outage_survives_recovery(self):
+        """A denylist write Redis missed is replayed before the next revocation check"""
+        redis = RedisClient(auto_pipeline=False, fallback=True)
+        redis._client = FlakyClient()
+        redis.breaker = CircuitBreaker("Redis", failures=5, slow_ms=1000, reset_seconds=0)
+        cache = AdminSessionCache(redis)
+        admin, session = _snapshot()
+
+        await cache.deny(session)
+        assert redis.pending_writes == 1
+
+        redis.client.up = True
+        await cache.is_revoked(admin.id, session.id, 0)
+        assert redis.client.sent[0][:2] == ("setex", f"admin:deny:{{{admin.id}}}:{session.id}")
+
+    @pytest.mark.asyncio
+    async def test_redis_errors_do_not_fail_login_or_logout(self):
+        """Issuing and denylisting survive a Redis outage"""
+        cache = AdminSessionCache(DownRedis())
+        admin, session = _snapshot()
+        cookie = await cache.issue_signed(admin, session)
+        assert cache.read_signed(cookie)[2] == 0
+        await cache.deny(session)
+
+    @pytest.mark.asyncio
+    async def test_retire_cookies_fails_loudly(self):
+        """A generation bump that cannot reach Redis raises instead of passing silently"""
+        admin, _ = _snapshot()
+        with patch.object(settings, "ADMIN_SESSION_MODE", "signed"):
+            with pytest.raises(SessionRevocationError):
+                await AdminSessionCache(DownRedis()).retire_cookies(admin.id)
+
+            degraded = FakeRedis()
+            degraded.degraded = True
+            with pytest.raises(SessionRevocationError):
+                await AdminSessionCache(degraded).retire_cookies(admin.id)
+
+            redis = FakeRedis()
+            await AdminSessionCache(redis).retire_cookies(admin.id)
+            assert redis.data == {f"admin:gen:{{{admin.id}}}": "1"}
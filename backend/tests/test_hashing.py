@@ -0,0 +1,72 @@
+"""
+Password Hashing Executor Tests
+"""
+import asyncio
+
+import pytest
+
+from app.core.hashing import HashingExecutor, HashingOverloadedError
+from app.core.passwords import Argon2idScheme, BcryptScheme, PasswordEngine, calibrate, identify
+from app.core.security import hash_password, verify_password
+
+
+class TestHashingExecutor:
+    """Tests for the bounded bcrypt process pool"""
+
+    @pytest.mark.asyncio
+    async def test_hash_and_verify_in_pool(self):
+        """Hashes produced in the pool verify correctly"""
+        ex = HashingExecutor(workers=1, max_pending=4)
+        try:
+            hashed = await ex.run(hash_password, "SuperAdmin123!")
+            assert await ex.run(verify_password, "SuperAdmin123!", hashed) is True
+            assert await ex.run(verify_password, "wrong", hashed) is False
+        finally:
+            ex.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_queue_full_fails_fast(self):
+        """Jobs beyond max_pending are rejected instead of queued"""
+        ex = HashingExecutor(workers=1, max_pending=1)
+        try:
+            first = asyncio.ensure_future(ex.run(hash_password, "SuperAdmin123!"))
+            await asyncio.sleep(0)
+            with pytest.raises(HashingOverloadedError):
+                await ex.run(hash_password, "SuperAdmin123!")
+            await first
+            assert ex.pending == 0
+        finally:
+            ex.shutdown()
+
+
+class TestPasswordEngine:
+    """Tests for multi-scheme hashing and rehash detection"""
+
+    def test_identifies_scheme_by_prefix(self):
+        """Hashes from either scheme verify through one engine"""
+        engine = PasswordEngine("bcrypt")
+        engine.use(BcryptScheme(rounds=4))
+        engine.use(Argon2idScheme(time_cost=1, memory_cost=1024))
+        b = engine.schemes["bcrypt"].hash("SuperAdmin123!")
+        a = engine.schemes["argon2id"].hash("SuperAdmin123!")
+        assert identify(b) == "bcrypt" and identify(a) == "argon2id"
+        assert engine.verify("SuperAdmin123!", b) and engine.verify("SuperAdmin123!", a)
+        assert not engine.verify("SuperAdmin123!", "plaintext")
+
+    def test_needs_rehash_on_stale_params(self):
+        """Weaker cost or a non-default scheme triggers a rehash"""
+        engine = PasswordEngine("bcrypt")
+        engine.use(BcryptScheme(rounds=4))
+        old = engine.hash("SuperAdmin123!")
+        assert not engine.needs_rehash(old)
+        engine.use(BcryptScheme(rounds=5))
+        assert engine.needs_rehash(old)
+        engine.default = "argon2id"
+        engine.use(Argon2idScheme(time_cost=1, memory_cost=1024))
+        assert engine.needs_rehash(old)
+        assert not engine.needs_rehash(engine.hash("SuperAdmin123!"))
+
+    def test_calibration_respects_floor(self):
+        """Calibration never goes below the configured floor"""
+        tuned = calibrate(BcryptScheme(rounds=12), target_ms=1, floor=4)
+        assert tuned.rounds == 4
@@ -0,0 +1,149 @@
+"""
+Heavy Hitter Tracking Tests
+"""
+from collections import Counter
+from unittest.mock import patch
+
+import pytest
+
+from app.services.heavy_hitters import (
+    ADMIN_LOGIN_USERNAME,
+    OTP_SEND_IP,
+    CountMinSketch,
+    HeavyHitterTracker,
+    TopK,
+)
+
+
+class SharedRedis:
+    """Applies the flush script and the two reads against dicts"""
+
+    def __init__(self):
+        self.tops, self.totals = {}, Counter()
+        self.down = False
+
+    async def eval_remote(self, source, keys, args):
+        if self.down:
+            return None, False
+        top = self.tops.setdefault(keys[0], Counter())
+        for key, n in zip(args[3::2], args[4::2]):
+            top[key] += n
+        self.totals[keys[1]] += args[2]
+        self.tops[keys[0]] = Counter(dict(top.most_common(args[1])))
+        return 0, True
+
+    async def fetch_remote(self, name, key, *args, **kwargs):
+        if name == "get":
+            return str(self.totals[key]) if key in self.totals else None
+        return [(k, float(c)) for k, c in self.tops.get(key, Counter()).most_common(args[1] + 1)]
+
+
+class TestCountMinSketch:
+    """Tests for the sketch estimates"""
+
+    def test_never_undercounts(self):
+        """Estimates are at least the true count"""
+        cms = CountMinSketch(width=64, depth=4)
+        truth = {}
+        for i in range(2000):
+            key = f"ip{i % 300}"
+            truth[key] = truth.get(key, 0) + 1
+            cms.add(key)
+        assert all(cms.estimate(k) >= c for k, c in truth.items())
+
+    def test_heavy_key_is_accurate(self):
+        """A dominant key is estimated closely in a wide sketch"""
+        cms = CountMinSketch(width=2048, depth=4)
+        for i in range(5000):
+            cms.add(f"noise{i}")
+        for _ in range(1000):
+            cms.add("attacker")
+        assert 1000 <= cms.estimate("attacker") <= 1010
+
+
+class TestTopK:
+    """Tests for the bounded top-K"""
+
+    def test_keeps_largest(self):
+        """Only the k largest estimates survive"""
+        top = TopK(2)
+        for key, est in [("a", 1), ("b", 2), ("c", 3), ("a", 4), ("d", 1)]:
+            top.offer(key, est)
+        assert top.items() == [("a", 4), ("c", 3)]
+
+
+class TestHeavyHitterTracker:
+    """Tests for streams and windows"""
+
+    def test_top_offenders_and_rotation(self):
+        """Offenders show up in the current window, then move to previous"""
+        tracker = HeavyHitterTracker(width=256, depth=4, k=5, window=60)
+        with patch("app.services.heavy_hitters.time.time", return_value=1200.0):
+            tracker._window_start = 1200
+            for _ in range(50):
+                tracker.record(OTP_SEND_IP, "10.0.0.9")
+            for i in range(20):
+                tracker.record(OTP_SEND_IP, f"10.1.0.{i}")
+            tracker.record(ADMIN_LOGIN_USERNAME, "root")
+            snap = tracker.snapshot(3, OTP_SEND_IP)
+        stream = snap["streams"][0]
+        assert stream["total"] == 70
+        assert stream["current"][0] == ("10.0.0.9", 50)
+
+        with patch("app.services.heavy_hitters.time.time", return_value=1265.0):
+            stream = tracker.snapshot(3, OTP_SEND_IP)["streams"][0]
+        assert stream["current"] == [] and stream["total"] == 0
+        assert stream["previous"][0] == ("10.0.0.9", 50) and stream["previous_total"] == 70
+
+    @pytest.mark.asyncio
+    async def test_offender_spread_over_workers_surfaces_in_shared_view(self):
+        """A key below every worker's own top-K tops the merged ranking"""
+        redis = SharedRedis()
+        with patch("app.services.heavy_hitters.time.time", return_value=1200.0):
+            workers = [HeavyHitterTracker(width=256, depth=4, k=2, window=60, redis=redis) for _ in range(4)]
+            for w, tracker in enumerate(workers):
+                for i in range(2):
+                    for _ in range(5):
+                        tracker.record(OTP_SEND_IP, f"10.{w}.0.{i}")
+                for _ in range(3):
+                    tracker.record(OTP_SEND_IP, "10.9.9.9")
+                assert "10.9.9.9" not in dict(tracker.snapshot(2, OTP_SEND_IP)["streams"][0]["current"])
+                await tracker.flush()
+
+            snap = await workers[0].shared_snapshot(3, OTP_SEND_IP)
+        stream = snap["streams"][0]
+        assert snap["scope"] == "shared"
+        assert stream["current"][0] == ("10.9.9.9", 12) and stream["total"] == 52
+
+    @pytest.mark.asyncio
+    async def test_unsent_batch_is_sent_with_next_flush(self):
+        """Counts Redis did not take are kept and merged into the next flush"""
+        redis = SharedRedis()
+        with patch("app.services.heavy_hitters.time.time", return_value=1200.0):
+            tracker = HeavyHitterTracker(width=64, depth=4, k=2, window=60, redis=redis)
+            for _ in range(3):
+                tracker.record(OTP_SEND_IP, "10.0.0.1")
+            redis.down = True
+            await tracker.flush()
+            assert redis.totals == Counter()
+
+            tracker.record(OTP_SEND_IP, "10.0.0.1")
+            redis.down = False
+            await tracker.flush()
+            await tracker.flush()
+            stream = (await tracker.shared_snapshot(1, OTP_SEND_IP))["streams"][0]
+        assert stream["current"] == [("10.0.0.1", 4)] and stream["total"] == 4
+
+    @pytest.mark.asyncio
+    async def test_shared_view_falls_back_to_worker(self):
+        """Without Redis the endpoint still gets this worker's counts"""
+        redis = SharedRedis()
+        redis.fetch_remote = lambda *a, **kw: _none()
+        tracker = HeavyHitterTracker(width=64, depth=4, k=2, window=60, redis=redis)
+        tracker.record(ADMIN_LOGIN_USERNAME, "root")
+        snap = await tracker.shared_snapshot(5, ADMIN_LOGIN_USERNAME)
+        assert snap["scope"] == "worker" and snap["streams"][0]["current"] == [("root", 1)]
+
+
+async def _none():
+    return None
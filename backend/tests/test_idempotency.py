@@ -0,0 +1,138 @@
+"""
+Idempotency-Key Middleware Tests
+"""
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from app.core.redis import RedisClient
+from app.middleware.idempotency import IdempotencyMiddleware
+
+
+def _app(handler, redis=None):
+    """Starlette app with one POST route behind the middleware, on the in-memory store."""
+    calls = []
+
+    async def endpoint(request):
+        calls.append(await request.json())
+        return await handler(request)
+
+    inner = Starlette(routes=[Route("/api/auth/send-otp", endpoint, methods=["POST"])])
+    redis = redis or RedisClient(auto_pipeline=False, fallback=True)
+    app = IdempotencyMiddleware(inner, redis=redis, paths={"/api/auth/send-otp"})
+    return AsyncClient(transport=ASGITransport(app=app), base_url="http://test"), calls
+
+
+async def _ok(request):
+    return JSONResponse({"success": True}, headers={"Retry-After": "60"})
+
+
+class TestIdempotency:
+    """Tests for stored-response replay"""
+
+    @pytest.mark.asyncio
+    async def test_retry_is_replayed(self):
+        """The second request with the same key gets the stored response without running the handler"""
+        client, calls = _app(_ok)
+        headers = {"Idempotency-Key": "abc"}
+        first = await client.post("/api/auth/send-otp", json={"phone_number": "+998901234567"}, headers=headers)
+        second = await client.post("/api/auth/send-otp", json={"phone_number": "+998901234567"}, headers=headers)
+
+        assert len(calls) == 1
+        assert second.status_code == first.status_code == 200
+        assert second.json() == {"success": True}
+        assert second.headers["retry-after"] == "60"
+        assert second.headers["idempotent-replayed"] == "true"
+        assert "idempotent-replayed" not in first.headers
+
+    @pytest.mark.asyncio
+    async def test_without_key_runs_every_time(self):
+        """Requests without the header are not deduplicated"""
+        client, calls = _app(_ok)
+        for _ in range(2):
+            await client.post("/api/auth/send-otp", json={"phone_number": "+998901234567"})
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_key_reused_for_other_body(self):
+        """Reusing a key with a different body is rejected"""
+        client, calls = _app(_ok)
+        headers = {"Idempotency-Key": "abc"}
+        await client.post("/api/auth/send-otp", json={"phone_number": "+998901234567"}, headers=headers)
+        response = await client.post("/api/auth/send-otp", json={"phone_number": "+998907654321"}, headers=headers)
+
+        assert response.status_code == 422
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_key_scoped_to_caller(self):
+        """The same key from different credentials is not shared"""
+        client, calls = _app(_ok)
+        for token in ("a", "b"):
+            await client.post(
+                "/api/auth/send-otp",
+                json={"phone_number": "+998901234567"},
+                headers={"Idempotency-Key": "abc", "Authorization": f"Bearer {token}"},
+            )
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_concurrent_duplicate_waits(self):
+        """A duplicate arriving mid-flight waits for and replays the first response"""
+        release = asyncio.Event()
+
+        async def slow(request):
+            await release.wait()
+            return JSONResponse({"success": True})
+
+        client, calls = _app(slow)
+        headers = {"Idempotency-Key": "abc"}
+        body = {"phone_number": "+998901234567"}
+        first = asyncio.create_task(client.post("/api/auth/send-otp", json=body, headers=headers))
+        second = asyncio.create_task(client.post("/api/auth/send-otp", json=body, headers=headers))
+        await asyncio.sleep(0.1)
+        release.set()
+        responses = await asyncio.gather(first, second)
+
+        assert len(calls) == 1
+        assert [r.status_code for r in responses] == [200, 200]
+        assert sum(r.headers.get("idempotent-replayed") == "true" for r in responses) == 1
+
+    @pytest.mark.asyncio
+    async def test_server_error_releases_key(self):
+        """A 5xx is not stored, so a retry runs the handler again"""
+        outcomes = iter([503, 200])
+
+        async def flaky(request):
+            return JSONResponse({}, status_code=next(outcomes))
+
+        client, calls = _app(flaky)
+        headers = {"Idempotency-Key": "abc"}
+        first = await client.post("/api/auth/send-otp", json={"phone_number": "+998901234567"}, headers=headers)
+        second = await client.post("/api/auth/send-otp", json={"phone_number": "+998901234567"}, headers=headers)
+
+        assert (first.status_code, second.status_code) == (503, 200)
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_released_key_retried_within_deadline(self):
+        """If the key keeps looking released but cannot be taken, the wait still ends"""
+        redis = RedisClient(auto_pipeline=False, fallback=True)
+        redis.set_nx = AsyncMock(return_value=False)
+        redis.get = AsyncMock(return_value=None)
+        client, calls = _app(_ok, redis)
+
+        with patch("app.middleware.idempotency.settings.IDEMPOTENCY_WAIT_SECONDS", 0.2):
+            r = await asyncio.wait_for(
+                client.post("/api/auth/send-otp", json={"phone_number": "+998901234567"}, headers={"Idempotency-Key": "abc"}),
+                timeout=2,
+            )
+
+        assert r.status_code == 409
+        assert calls == []
+        assert 2 <= redis.set_nx.await_count <= 10
@@ -0,0 +1,94 @@
+"""
+IP Filter Tests
+"""
+import ipaddress
+import random
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.core.ip_filter import IPFilter
+from app.core.redis import RedisClient
+from app.middleware.ip_filter import IPFilterMiddleware
+
+
+def _filter(block=(), allow=()):
+    f = IPFilter(MagicMock())
+    f.install(block, allow)
+    return f
+
+
+class TestPrefixTree:
+    """Tests for longest-prefix matching"""
+
+    def test_ipv4_and_ipv6(self):
+        """Blocked ranges match in both families; mapped IPv4 is normalised"""
+        f = _filter(block=["203.0.113.0/24", "2001:db8::/32"])
+        assert f.is_blocked("203.0.113.77")
+        assert f.is_blocked("::ffff:203.0.113.5")
+        assert f.is_blocked("2001:db8:1::1")
+        assert not f.is_blocked("203.0.114.1")
+        assert not f.is_blocked("2001:db9::1")
+        assert not f.is_blocked("unknown")
+
+    def test_most_specific_wins(self):
+        """An allow entry carves a hole in a blocked range"""
+        f = _filter(block=["10.0.0.0/8", "10.1.2.128/25"], allow=["10.1.0.0/16"])
+        assert f.is_blocked("10.2.0.1")
+        assert not f.is_blocked("10.1.2.3")
+        assert f.is_blocked("10.1.2.200")
+
+    def test_matches_linear_scan(self):
+        """The compressed tree agrees with a brute-force scan"""
+        rnd = random.Random(7)
+        block = [f"{rnd.randrange(1, 224)}.{rnd.randrange(256)}.0.0/{rnd.randrange(8, 25)}" for _ in range(200)]
+        allow = [f"{rnd.randrange(1, 224)}.{rnd.randrange(256)}.{rnd.randrange(256)}.0/{rnd.randrange(16, 33)}" for _ in range(100)]
+        f = _filter(block, allow)
+        nets = [(ipaddress.ip_network(c, strict=False), "block") for c in block] + [
+            (ipaddress.ip_network(c, strict=False), "allow") for c in allow
+        ]
+        for _ in range(2000):
+            ip = ipaddress.ip_address(rnd.getrandbits(32))
+            hits = [(n.prefixlen, a) for n, a in nets if ip in n]
+            expected = max(hits)[1] == "block" if hits else False
+            if hits and len({a for p, a in hits if p == max(hits)[0]}) > 1:
+                continue  # same CIDR listed both ways — order-dependent
+            assert f.is_blocked(str(ip)) == expected
+
+    @pytest.mark.asyncio
+    async def test_reload_from_redis(self):
+        """Changes to the Redis sets are picked up by load()"""
+        redis = MagicMock()
+        redis.fetch_remote = AsyncMock(side_effect=[{"198.51.100.0/24"}, set()])
+        f = IPFilter(redis)
+        await f.load()
+        assert f.is_blocked("198.51.100.9")
+
+    @pytest.mark.asyncio
+    async def test_outage_keeps_redis_blocks(self):
+        """With Redis out, the last Redis-loaded blocks stay in force"""
+        redis = RedisClient(auto_pipeline=False, fallback=True)
+        redis._client = MagicMock(smembers=AsyncMock(side_effect=[{"198.51.100.0/24"}, set()]))
+        f = IPFilter(redis)
+        await f.load()
+
+        redis._client.smembers = AsyncMock(side_effect=ConnectionError("down"))
+        await f.load()
+        assert f.is_blocked("198.51.100.9")
+        assert redis._client.smembers.await_count >= 1
+
+
+class TestIPFilterMiddleware:
+    """Tests for rejecting requests before the app runs"""
+
+    @pytest.mark.asyncio
+    async def test_blocked_forwarded_ip_rejected(self):
+        """X-Forwarded-For is honoured and the inner app is never called"""
+        inner = AsyncMock()
+        app = IPFilterMiddleware(inner, _filter(block=["192.0.2.0/24"]))
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            r = await client.get("/api/auth/send-otp", headers={"X-Forwarded-For": "192.0.2.10, 10.0.0.1"})
+        assert r.status_code == 403
+        assert r.json()["success"] is False
+        inner.assert_not_called()
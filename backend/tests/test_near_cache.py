@@ -0,0 +1,119 @@
+"""
+Redis Near-Cache Tests
+"""
+import asyncio
+
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app.core.circuit_breaker import CLOSED, CircuitBreaker
+from app.core.near_cache import MISSING, NearCache
+from app.core.redis import RedisClient
+
+
+class CountingClient:
+    """Redis stand-in that counts GETs and can delay them"""
+
+    def __init__(self):
+        self.data = {}
+        self.gets = 0
+        self.gate = None
+        self.down = False
+
+    async def get(self, key):
+        self.gets += 1
+        if self.down:
+            raise RedisConnectionError("Connection refused")
+        if self.gate:
+            await self.gate.wait()
+        return self.data.get(key)
+
+    async def setex(self, key, seconds, value):
+        self.data[key] = value
+
+
+def _client():
+    redis = RedisClient(auto_pipeline=False, fallback=False)
+    redis._client = CountingClient()
+    redis.near_cache = NearCache(100, ("admin:block:",))
+    redis.near_cache.reset(live=True)
+    return redis
+
+
+class TestNearCache:
+    """Tests for the tracked GET cache"""
+
+    def test_lru_and_stats(self):
+        """Bounded LRU with hit/miss counters"""
+        near = NearCache(2, ("k",))
+        near.reset(live=True)
+        for k in ("k1", "k2", "k3"):
+            near.fill(k, "v", near.version)
+        assert near.lookup("k1") is MISSING
+        assert near.lookup("k3") == "v"
+        assert near.stats()["hits"] == 1 and near.stats()["misses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_hot_key_served_locally(self):
+        """Repeated reads of a tracked key cost one Redis GET"""
+        redis = _client()
+        for _ in range(5):
+            assert await redis.get("admin:block:{bob}") is None
+        assert redis.client.gets == 1
+
+        await redis.get("other:key")
+        await redis.get("other:key")
+        assert redis.client.gets == 3
+
+    @pytest.mark.asyncio
+    async def test_invalidation_message_drops_entry(self):
+        """A write elsewhere (invalidation) forces a fresh read"""
+        redis = _client()
+        await redis.get("admin:block:{bob}")
+        redis.client.data["admin:block:{bob}"] = "1"
+        redis.near_cache.invalidate(["admin:block:{bob}"])
+        assert await redis.get("admin:block:{bob}") == "1"
+
+    @pytest.mark.asyncio
+    async def test_own_write_invalidates(self):
+        """Writes from this worker drop the local copy immediately"""
+        redis = _client()
+        await redis.get("admin:block:{bob}")
+        await redis.setex("admin:block:{bob}", 60, "1")
+        assert await redis.get("admin:block:{bob}") == "1"
+
+    @pytest.mark.asyncio
+    async def test_racing_invalidation_skips_fill(self):
+        """An invalidation during an in-flight GET keeps the old value out"""
+        redis = _client()
+        redis.client.gate = asyncio.Event()
+        read = asyncio.create_task(redis.get("admin:block:{bob}"))
+        await asyncio.sleep(0)
+        redis.near_cache.invalidate(["admin:block:{bob}"])
+        redis.client.gate.set()
+        await read
+        assert redis.near_cache.lookup("admin:block:{bob}") is MISSING
+
+    @pytest.mark.asyncio
+    async def test_not_live_bypasses_cache(self):
+        """Without the invalidation stream nothing is cached"""
+        redis = _client()
+        redis.near_cache.reset(live=False)
+        await redis.get("admin:block:{bob}")
+        await redis.get("admin:block:{bob}")
+        assert redis.client.gets == 2
+
+    @pytest.mark.asyncio
+    async def test_local_answer_not_cached(self):
+        """A GET answered by the fallback store during an outage is not kept"""
+        redis = _client()
+        redis.fallback = True
+        redis.breaker = CircuitBreaker("Redis", failures=5, slow_ms=1000, reset_seconds=60)
+        redis.client.down = True
+        assert await redis.get("admin:block:{bob}") is None
+        assert redis.breaker.state == CLOSED
+        assert redis.near_cache.lookup("admin:block:{bob}") is MISSING
+
+        redis.client.down = False
+        redis.client.data["admin:block:{bob}"] = "1"
+        assert await redis.get("admin:block:{bob}") == "1"
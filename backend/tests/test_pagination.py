@@ -0,0 +1,84 @@
+"""
+Keyset Pagination Tests
+"""
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.core.pagination import EPOCH, cut, decode_cursor, encode_cursor, keyset_query
+from app.models.user import User
+from app.services.user_service import SORT_KEYS, UserService
+
+
+def _sql(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+class TestCursor:
+    """Tests for opaque cursors"""
+
+    def test_roundtrip(self):
+        """A cursor decodes back to the last row's sort value and id"""
+        at, rid = datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc), uuid4()
+        cursor = encode_cursor("created_at", "desc", at, rid)
+        assert decode_cursor(cursor, "created_at", "desc", SORT_KEYS["created_at"]) == (at, rid)
+
+    def test_other_ordering_rejected(self):
+        """A cursor cannot be replayed under a different sort or direction"""
+        cursor = encode_cursor("created_at", "desc", EPOCH, uuid4())
+        with pytest.raises(ValueError):
+            decode_cursor(cursor, "created_at", "asc", SORT_KEYS["created_at"])
+        with pytest.raises(ValueError):
+            decode_cursor("not-a-cursor", "created_at", "desc", SORT_KEYS["created_at"])
+
+    def test_cut_emits_cursor_only_when_more_rows(self):
+        """Fetching limit + 1 rows tells whether a next page exists"""
+        rows = [SimpleNamespace(id=uuid4(), phone_number=f"+99890000000{i}") for i in range(3)]
+        items, cursor = cut(rows, 2, "phone_number", "asc", SORT_KEYS["phone_number"])
+        assert items == rows[:2]
+        assert decode_cursor(cursor, "phone_number", "asc", SORT_KEYS["phone_number"])[1] == rows[1].id
+        assert cut(rows, 3, "phone_number", "asc", SORT_KEYS["phone_number"]) == (rows, None)
+
+
+class TestKeysetQuery:
+    """Tests for the generated SQL"""
+
+    def test_filtered_is_single_range_scan(self):
+        """With is_active, the page is one ordered range over (is_active, key, id)"""
+        stmt = keyset_query(User, SORT_KEYS["created_at"], True, 21, [], (EPOCH, uuid4()), is_active=True)
+        sql = _sql(stmt)
+        assert "UNION" not in sql and "OFFSET" not in sql
+        assert "(users.created_at, users.id) <" in sql
+        assert "ORDER BY users.created_at DESC, users.id DESC" in sql
+
+    def test_unfiltered_merges_partitions(self):
+        """Without is_active, both index partitions are read and merged"""
+        sql = _sql(keyset_query(User, SORT_KEYS["phone_number"], False, 21, [], None))
+        assert "UNION ALL" in sql
+        assert "users.is_active = true" in sql and "users.is_active = false" in sql
+
+    def test_last_login_matches_index_expression(self):
+        """The nullable key is sorted by the same expression its index uses"""
+        sql = _sql(keyset_query(User, SORT_KEYS["last_login"], True, 21, [], None, is_active=False))
+        index = next(i for i in User.__table__.indexes if i.name == "idx_user_active_last_login")
+        expr = str(index.expressions[1]).replace("last_login", "users.last_login")
+        assert expr in sql
+
+
+class TestUserServiceValidation:
+    """Tests for rejected list requests"""
+
+    @pytest.mark.asyncio
+    async def test_unknown_sort_and_bad_cursor(self):
+        """Unknown sort keys and malformed cursors fail before touching the database"""
+        db = MagicMock()
+        svc = UserService(db)
+        ok, err, _ = await svc.get_all(sort_by="telegram_id")
+        assert not ok and "created_at" in err
+        ok, err, _ = await svc.get_all(cursor="garbage")
+        assert not ok and err == "Noto'g'ri cursor"
+        db.execute.assert_not_called()
@@ -0,0 +1,63 @@
+"""
+Phone Search Tests
+"""
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.models.user import User
+from app.services import phone_search
+from app.services.phone_search import EXACT, NONE, PREFIX, SUBSTRING, SUFFIX, PhoneQuery, condition, plan
+
+
+def _sql(clause) -> tuple[str, list]:
+    compiled = clause.compile(dialect=postgresql.dialect())
+    return str(compiled), list(compiled.params.values())
+
+
+class TestPlan:
+    """Tests for picking a search strategy"""
+
+    @pytest.mark.parametrize(
+        "search, expected",
+        [
+            ("+998 (90) 123-45-67", PhoneQuery(EXACT, "998901234567")),
+            ("+99890", PhoneQuery(PREFIX, "99890")),
+            ("99890*", PhoneQuery(PREFIX, "99890")),
+            ("*4567", PhoneQuery(SUFFIX, "4567")),
+            ("45 67", PhoneQuery(SUBSTRING, "4567")),
+            ("*4567*", PhoneQuery(SUBSTRING, "4567")),
+            ("abc", PhoneQuery(NONE, "")),
+        ],
+    )
+    def test_strategy(self, search, expected):
+        """Input shape decides the strategy; formatting characters are dropped"""
+        assert plan(search) == expected
+
+
+class TestCondition:
+    """Tests for the generated WHERE clauses"""
+
+    def test_prefix_and_exact_use_digits_column(self):
+        """Exact and prefix compare the normalized column, never phone_number"""
+        assert _sql(condition(plan("+998901234567"))) == ("users.phone_digits = %(phone_digits_1)s::VARCHAR", ["998901234567"])
+        assert _sql(condition(plan("99890*"))) == ("users.phone_digits LIKE %(phone_digits_1)s::VARCHAR", ["99890%"])
+
+    def test_suffix_reads_reversed_column(self):
+        """A suffix becomes a prefix of the reversed digits"""
+        assert _sql(condition(plan("*4567"))) == ("users.phone_digits_rev LIKE %(phone_digits_rev_1)s::VARCHAR", ["7654%"])
+
+    def test_substring_and_no_digits(self):
+        """Bare digits match anywhere; input without digits matches nothing"""
+        assert _sql(condition(plan("4567"))) == ("users.phone_digits LIKE %(phone_digits_1)s::VARCHAR", ["%4567%"])
+        assert _sql(condition(plan("abc")))[0] == "false"
+
+    def test_indexes_cover_each_strategy(self):
+        """Every strategy has a matching index on the users table"""
+        indexes = {i.name: i for i in User.__table__.indexes}
+        prefix = indexes["idx_user_digits_prefix"].dialect_options["postgresql"]
+        suffix = indexes["idx_user_digits_suffix"].dialect_options["postgresql"]
+        trgm = indexes["idx_user_digits_trgm"].dialect_options["postgresql"]
+        assert prefix["ops"] == {"phone_digits": "text_pattern_ops"}
+        assert suffix["ops"] == {"phone_digits_rev": "text_pattern_ops"}
+        assert (trgm["using"], trgm["ops"]) == ("gin", {"phone_digits": "gin_trgm_ops"})
+        assert phone_search.FULL_NUMBER_MIN <= len(plan("+998901234567").digits)
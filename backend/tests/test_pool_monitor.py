@@ -0,0 +1,110 @@
+"""
+DB Pool Monitor Tests
+"""
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+from sqlalchemy.util import greenlet_spawn
+
+from app.core.pool_monitor import BACKGROUND, Histogram, InstrumentedPool, PoolMonitor, current_route
+from app.middleware.db_pool import DBPoolContextMiddleware
+
+
+def _pool(monitor, size=1, overflow=0, timeout=0.05):
+    cls = type("Pool", (InstrumentedPool,), {"monitor": monitor})
+    pool = cls(MagicMock, pool_size=size, max_overflow=overflow, timeout=timeout)
+    monitor.listen(pool)
+    return pool
+
+
+class TestHistogram:
+    """Tests for bucketed latency histograms"""
+
+    def test_buckets_and_quantiles(self):
+        """Observations land in the first bucket whose bound covers them"""
+        h = Histogram((1, 10, 100))
+        for ms in [0.5] * 90 + [50] * 9 + [1000]:
+            h.observe(ms)
+        snap = h.snapshot()
+        assert [b["count"] for b in snap["buckets"]] == [90, 0, 9, 1]
+        assert snap["p50_ms"] == 1.0
+        assert snap["p95_ms"] == 100.0
+        assert snap["p99_ms"] == 100.0
+        assert snap["max_ms"] == 1000.0
+
+    def test_empty(self):
+        """An empty histogram reports no quantiles"""
+        assert Histogram().snapshot()["p50_ms"] is None
+
+
+class TestPoolMonitor:
+    """Tests for checkout wait, hold time and gauges"""
+
+    @pytest.mark.asyncio
+    async def test_checkout_and_hold_recorded(self):
+        """Each checkout is timed and its hold time charged to the current route"""
+        monitor = PoolMonitor(slow_ms=1000)
+        pool = _pool(monitor)
+
+        def use():
+            conn = pool.connect()
+            assert pool.checkedout() == 1
+            conn.close()
+
+        await greenlet_spawn(use)
+        snap = monitor.snapshot()
+        assert snap["checkout_wait"]["count"] == 1
+        assert snap["connection_held"]["count"] == 1
+        assert snap["routes"][0]["route"] == BACKGROUND
+        assert snap["routes"][0]["checkouts"] == 1
+        assert monitor.peak_checked_out == 1
+
+    @pytest.mark.asyncio
+    async def test_exhausted_pool_counts_timeout(self):
+        """A checkout that gives up is counted and re-raised"""
+        monitor = PoolMonitor(slow_ms=1000)
+        pool = _pool(monitor, size=1, overflow=0, timeout=0.01)
+
+        def exhaust():
+            held = pool.connect()
+            try:
+                pool.connect()
+            finally:
+                held.close()
+
+        with pytest.raises(PoolTimeout):
+            await greenlet_spawn(exhaust)
+        assert monitor.timeouts == 1
+
+    @pytest.mark.asyncio
+    async def test_slow_checkout_logged(self, caplog):
+        """Checkouts over the threshold are logged with the waiting route"""
+        monitor = PoolMonitor(slow_ms=0)
+        pool = _pool(monitor)
+        await greenlet_spawn(lambda: pool.connect().close())
+        assert monitor.slow_checkouts == 1
+        assert "Slow DB checkout" in caplog.text
+
+
+class TestRouteContext:
+    """Tests for the route label published by the middleware"""
+
+    @pytest.mark.asyncio
+    async def test_route_template_used(self):
+        """The matched route template, not the raw path, labels the checkout"""
+        app = FastAPI()
+        seen = []
+
+        @app.get("/items/{item_id}")
+        async def item(item_id: int):
+            seen.append(current_route())
+            return {}
+
+        app.add_middleware(DBPoolContextMiddleware)
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            await client.get("/items/42")
+        assert seen == ["GET /items/{item_id}"]
+        assert current_route() == BACKGROUND
@@ -3,7 +3,13 @@ Rate Limiting Tests
 """
 import pytest
 from httpx import AsyncClient
-from unittest.mock import patch, AsyncMock
+from unittest.mock import patch, AsyncMock, MagicMock
+
+
+def _redis():
+    redis = AsyncMock()
+    redis.slot_groups = MagicMock(side_effect=lambda keys: [list(range(len(keys)))])
+    return redis
 
 
 class TestOTPRateLimiting:
@@ -69,3 +75,221 @@ class TestLoginRateLimiting:
             
             if i >= 5:
                 assert response.status_code in [401, 429]
+
+    @pytest.mark.asyncio
+    async def test_concurrent_guesses_counted_atomically(self):
+        """Parallel attempts cannot all pass the check before any is counted"""
+        import asyncio
+        from app.core.config import settings
+        from app.core.redis import RedisClient
+        from app.services.admin_auth_service import AdminAuthService
+
+        svc = AdminAuthService(db=None, redis=RedisClient(auto_pipeline=False, fallback=True))
+        results = await asyncio.gather(*(svc.check_login_rate("bob") for _ in range(settings.LOGIN_LIMIT_ATTEMPTS + 3)))
+        assert sum(ok for ok, _, _ in results) == settings.LOGIN_LIMIT_ATTEMPTS
+        assert [left for ok, _, left in results if ok][-1] == 0
+
+
+class TestRateLimiter:
+    """Tests for the single-call multi-window limiter"""
+
+    @pytest.mark.asyncio
+    async def test_all_windows_in_one_call(self):
+        """Every window is sent in one script call and the result is decoded"""
+        from app.core.rate_limit import RateLimiter, Window
+
+        redis = _redis()
+        redis.eval_script = AsyncMock(return_value=[-1, 0, 1, 2, 60000, 3599001])
+        windows = [Window("a", 1, 60), Window("b", 3, 3600, sliding=True)]
+
+        r = await RateLimiter(redis).hit(windows)
+
+        redis.eval_script.assert_awaited_once()
+        _, keys, args = redis.eval_script.await_args.args
+        assert keys == ["a", "b"]
+        assert args == [1, "0", 1, 60000, "0", 3, 3600000, "1"]
+        assert r.allowed and r.denied is None
+        assert r.counts == [1, 2] and r.ttls == [60, 3600]
+
+    @pytest.mark.asyncio
+    async def test_denied_window_and_retry(self):
+        """The first overflowing window is reported with its retry time"""
+        from app.core.rate_limit import RateLimiter, Window
+
+        redis = _redis()
+        redis.eval_script = AsyncMock(return_value=[1, 1200, 0, 3, -2, 1200])
+        windows = [Window("a", 1, 60), Window("b", 3, 3600)]
+
+        r = await RateLimiter(redis).peek(windows)
+
+        assert redis.eval_script.await_args.args[2][1] == "1"
+        assert not r.allowed
+        assert r.denied == windows[1]
+        assert r.retry_after == 2
+        assert r.ttls == [0, 2]
+
+
+class TestLocalRateLimiter:
+    """Tests for local token leases and batched Redis sync"""
+
+    @pytest.mark.asyncio
+    async def test_lease_then_block_without_io(self):
+        """A worker admits only its lease; a full global window blocks locally"""
+        from app.core.local_limiter import LEASE_SPENT, LocalRateLimiter
+
+        redis = _redis()
+        redis.eval_script = AsyncMock(return_value=[10, 5_000_000])
+        limiter = LocalRateLimiter(redis, burst=2, sync_ms=250, maxsize=100)
+
+        assert limiter.allow("ip:1", 10, 86400) == 0
+        assert limiter.allow("ip:1", 10, 86400) == 0
+        assert limiter.allow("ip:1", 10, 86400) == LEASE_SPENT
+        redis.eval_script.assert_not_called()
+
+        await limiter.sync()
+        _, keys, args = redis.eval_script.await_args.args
+        assert keys == ["ip:1"] and args == [2, 86400000]
+
+        retry = limiter.allow("ip:1", 10, 86400)
+        assert 4990 <= retry <= 5000
+        assert redis.eval_script.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_sync_renews_lease(self):
+        """Remaining global budget is leased back after a sync"""
+        from app.core.local_limiter import LEASE_SPENT, LocalRateLimiter
+
+        redis = _redis()
+        redis.eval_script = AsyncMock(return_value=[9, 60_000])
+        limiter = LocalRateLimiter(redis, burst=3, sync_ms=250, maxsize=100)
+
+        for _ in range(3):
+            assert limiter.allow("k", 10, 60) == 0
+        await limiter.sync()
+        assert limiter.allow("k", 10, 60) == 0
+        assert limiter.allow("k", 10, 60) == LEASE_SPENT
+
+    @pytest.mark.asyncio
+    async def test_failed_sync_keeps_pending(self):
+        """Consumption is retried on the next sync when Redis fails"""
+        from app.core.local_limiter import LocalRateLimiter
+
+        redis = _redis()
+        redis.eval_script = AsyncMock(side_effect=ConnectionError("down"))
+        limiter = LocalRateLimiter(redis, burst=5, sync_ms=250, maxsize=100)
+
+        limiter.allow("k", 10, 60)
+        limiter.allow("k", 10, 60)
+        limiter.refund("k")
+        await limiter.sync()
+
+        redis.eval_script = AsyncMock(return_value=[1, 60_000])
+        await limiter.sync()
+        assert redis.eval_script.await_args.args[2] == [1, 60000]
+
+    @pytest.mark.asyncio
+    async def test_eviction_keeps_lease_pending_and_block(self):
+        """Churning other keys through a small table neither refills a lease nor loses consumption"""
+        from app.core.local_limiter import LEASE_SPENT, LocalRateLimiter
+
+        redis = _redis()
+        limiter = LocalRateLimiter(redis, burst=5, sync_ms=250, maxsize=3)
+
+        for _ in range(3):
+            assert limiter.allow("hot", 3, 60) == 0
+        assert limiter.allow("hot", 3, 60) == LEASE_SPENT
+        for i in range(5):
+            limiter.allow(f"churn:{i}", 3, 60)
+        assert len(limiter) == 3
+        assert limiter.allow("hot", 3, 60) == LEASE_SPENT
+
+        limiter.block("blocked", 60)
+        for i in range(5, 10):
+            limiter.allow(f"churn:{i}", 3, 60)
+        assert limiter.blocked_for("blocked") >= 59
+
+        redis.eval_script = AsyncMock(side_effect=lambda src, keys, args: [3, 60_000] * len(keys))
+        await limiter.sync()
+        keys, args = redis.eval_script.await_args.args[1:]
+        assert args[2 * keys.index("hot")] == 3
+        assert limiter.blocked_for("hot") >= 59
+
+    @pytest.mark.asyncio
+    async def test_recent_use_survives_eviction(self):
+        """Eviction drops the least recently used bucket, not the oldest"""
+        from app.core.local_limiter import LocalRateLimiter
+
+        limiter = LocalRateLimiter(_redis(), burst=5, sync_ms=250, maxsize=2)
+        limiter.allow("a", 10, 60)
+        limiter.allow("b", 10, 60)
+        limiter.allow("a", 10, 60)
+        limiter.allow("c", 10, 60)
+        assert list(limiter._buckets) == ["a", "c"]
+
+    def test_block(self):
+        """Explicit blocks are answered locally"""
+        from app.core.local_limiter import LocalRateLimiter
+
+        limiter = LocalRateLimiter(_redis(), burst=2, sync_ms=250, maxsize=100)
+        assert limiter.blocked_for("phone") == 0
+        limiter.block("phone", 60)
+        assert 59 <= limiter.blocked_for("phone") <= 60
+
+    @pytest.mark.asyncio
+    async def test_cross_slot_windows_run_per_slot(self):
+        """In cluster mode each slot gets its own call; a denial stops the rest"""
+        from app.core.rate_limit import RateLimiter, Window
+
+        redis = _redis()
+        redis.slot_groups = MagicMock(return_value=[[1], [0]])
+        redis.eval_script = AsyncMock(side_effect=[[0, 30000, 30, 30000], [-1, 0, 1, 600000]])
+        windows = [Window("phone", 10, 600), Window("ip", 30, 600)]
+
+        r = await RateLimiter(redis).hit(windows)
+
+        assert redis.eval_script.await_count == 1
+        assert redis.eval_script.await_args.args[1] == ["ip"]
+        assert r.denied == windows[1] and r.retry_after == 30
+
+    @pytest.mark.asyncio
+    async def test_denied_hit_refunds_earlier_slots(self):
+        """A denial in a later slot group leaves earlier groups uncounted"""
+        from app.core.rate_limit import RateLimiter, Window
+        from app.core.redis import RedisClient
+
+        redis = RedisClient(auto_pipeline=False, fallback=True)
+        redis.slot_groups = MagicMock(return_value=[[0], [1]])
+        limiter = RateLimiter(redis)
+        phone, ip = Window("otp:verify:{phone}", 5, 600), Window("otp:verify:{ip}", 1, 600)
+
+        assert (await limiter.hit([phone, ip])).allowed
+        r = await limiter.hit([phone, ip])
+
+        assert not r.allowed and r.denied == ip
+        assert r.counts[0] == 1
+        assert await redis.get(phone.key) == "1"
+
+    @pytest.mark.asyncio
+    async def test_spent_lease_falls_through_to_redis(self):
+        """A spent lease counts the request in Redis instead of rejecting it"""
+        from app.core.local_limiter import LocalRateLimiter
+        from app.services.otp_service import OTPService
+
+        redis = _redis()
+        svc = OTPService(db=None, redis=redis)
+        svc.limiter.hit = AsyncMock(side_effect=[
+            MagicMock(allowed=True, ttls=[60]),
+            MagicMock(allowed=True, ttls=[60]),
+            ConnectionError("down"),
+        ])
+        local = LocalRateLimiter(redis, burst=1, sync_ms=250, maxsize=100)
+        with patch("app.services.otp_service.local_limiter", local):
+            assert await svc.check_rate_limit("+998900000001", "1.2.3.4") == (True, None, 60)
+            ok = await svc.check_rate_limit("+998900000002", "1.2.3.4")
+            assert ok == (True, None, 60)
+            assert svc.limiter.hit.await_args.args[0][-1].key == "otp:ip:{1.2.3.4}:day"
+
+            local._buckets.clear()
+            with pytest.raises(ConnectionError):
+                await svc.check_rate_limit("+998900000003", "5.6.7.8")
+            assert local._buckets["otp:ip:{5.6.7.8}:day"].pending == 0
@@ -0,0 +1,52 @@
+"""
+RBAC Policy Tests
+"""
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+
+from app.services.admin_session_cache import CachedAdmin
+from app.services.rbac import PermissionCatalog, PermissionInfo, permission_catalog
+
+
+def _info(name):
+    return PermissionInfo(uuid.uuid4(), name, None, "test", name)
+
+
+def _admin(perms, su=False):
+    return CachedAdmin(uuid.uuid4(), "a", "a@example.com", su, True, datetime.now(timezone.utc), frozenset(perms))
+
+
+@pytest.fixture
+def catalog_state():
+    """Restore the global catalog after a test installs its own permissions"""
+    saved = dict(vars(permission_catalog))
+    yield permission_catalog
+    version = permission_catalog.version
+    vars(permission_catalog).update(saved)
+    # Keep versions increasing so masks built during the test never look current.
+    permission_catalog.version = version + 1
+
+
+class TestPermissionCatalog:
+    """Tests for bit assignment and compiled checks"""
+
+    def test_bits_are_unique(self):
+        """Every permission owns exactly one bit"""
+        catalog = PermissionCatalog(None)
+        catalog._install([_info("can_view_users"), _info("can_edit_user"), _info("can_delete_user")])
+        bits = [catalog.bit(p.name) for p in catalog.items]
+        assert len(set(bits)) == 3 and all(b and b & (b - 1) == 0 for b in bits)
+        assert catalog.mask_of(["can_view_users", "unknown"]) == catalog.bit("can_view_users")
+
+    def test_compiled_check(self, catalog_state):
+        """Compiled checks honour masks, super admins and catalog reloads"""
+        permission_catalog._install([_info("can_view_users"), _info("can_edit_user")])
+        check = permission_catalog.compile("can_edit_user")
+        viewer, editor = _admin(["can_view_users"]), _admin(["can_edit_user"])
+        assert not check(viewer) and check(editor) and check(_admin([], su=True))
+
+        permission_catalog._install([_info("can_edit_user"), _info("can_view_users"), _info("can_aaa")])
+        assert check(editor) and not check(viewer)
+        assert editor.has_permission("can_edit_user") and not viewer.has_permission("can_edit_user")
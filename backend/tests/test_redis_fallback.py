@@ -0,0 +1,213 @@
+"""
+Redis Outage Fallback Tests
+"""
+import asyncio
+import time
+from unittest.mock import patch
+
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError, ResponseError
+
+from app.core.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from app.core.memory_store import MemoryStore, UnregisteredScriptError
+from app.core.rate_limit import RateLimiter, Window
+from app.core.redis import RedisClient
+
+
+class DownClient:
+    """Redis client whose every command fails like an unreachable server"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __getattr__(self, name):
+        async def fail(*args, **kwargs):
+            self.calls += 1
+            raise RedisConnectionError("Connection refused")
+        return fail
+
+
+class FlakyClient:
+    """Redis client that records commands while up and refuses them while down"""
+
+    def __init__(self):
+        self.up = False
+        self.sent = []
+
+    def __getattr__(self, name):
+        async def call(*args, **kwargs):
+            if not self.up:
+                raise RedisConnectionError("Connection refused")
+            self.sent.append((name, *args))
+            return 1
+        return call
+
+
+class TestMemoryStore:
+    """Tests for the in-process Redis stand-in"""
+
+    def test_expiry_and_ttl(self):
+        """Keys expire by TTL and report Redis-style TTL values"""
+        store = MemoryStore(maxsize=10)
+        store.setex("a", 10, "1")
+        store.set("b", "2")
+
+        assert store.ttl("a") == 10
+        assert store.ttl("b") == -1
+        assert store.ttl("missing") == -2
+
+        with patch("app.core.memory_store.time.monotonic", return_value=time.monotonic() + 11):
+            assert store.get("a") is None
+            assert store.get("b") == "2"
+
+    def test_wheel_sweeps_untouched_keys(self):
+        """Expired keys are removed by the wheel without being read"""
+        store = MemoryStore(maxsize=10, wheel_slots=8)
+        for i in range(5):
+            store.setex(f"k{i}", 2, "x")
+        store.set("keep", "y")
+
+        with patch("app.core.memory_store.time.monotonic", return_value=time.monotonic() + 20):
+            store.get("keep")
+        assert len(store) == 1
+
+    def test_bounded(self):
+        """The oldest written key is evicted past maxsize"""
+        store = MemoryStore(maxsize=2)
+        store.incr("a")
+        store.incr("b")
+        store.incr("c")
+        assert store.get("a") is None and store.get("c") == "1"
+
+
+class TestCircuitBreaker:
+    """Tests for breaker state changes"""
+
+    def test_opens_probes_and_closes(self):
+        """Repeated failures open the circuit; a good probe closes it"""
+        breaker = CircuitBreaker("test", failures=2, slow_ms=100, reset_seconds=0)
+        breaker.failure()
+        assert breaker.state == CLOSED
+        breaker.failure()
+        assert breaker.state == OPEN
+
+        assert breaker.allow()
+        assert breaker.state == HALF_OPEN
+        assert not breaker.allow()
+        breaker.record(0.001)
+        assert breaker.state == CLOSED
+
+    def test_slow_calls_count_as_failures(self):
+        """Latency over the threshold trips the breaker"""
+        breaker = CircuitBreaker("test", failures=1, slow_ms=100, reset_seconds=30)
+        breaker.record(0.5)
+        assert breaker.state == OPEN and not breaker.allow()
+
+
+class TestRedisFallback:
+    """Tests for serving commands locally during an outage"""
+
+    @pytest.mark.asyncio
+    async def test_outage_served_locally_then_circuit_opens(self):
+        """Commands keep working and stop reaching Redis once the circuit opens"""
+        redis = RedisClient(auto_pipeline=False, fallback=True)
+        redis._client = DownClient()
+        redis.breaker = CircuitBreaker("Redis", failures=2, slow_ms=1000, reset_seconds=60)
+
+        await redis.setex("k", 60, "v")
+        assert await redis.get("k") == "v"
+        assert redis.degraded
+
+        calls = redis.client.calls
+        assert await redis.incr_with_ttl("n", 60) == 1
+        assert redis.client.calls == calls
+
+    @pytest.mark.asyncio
+    async def test_probe_always_settles_breaker(self):
+        """A probe that errors or is cancelled does not leave the circuit half-open"""
+        redis = RedisClient(auto_pipeline=False, fallback=True)
+        redis._client = DownClient()
+        redis.breaker = CircuitBreaker("Redis", failures=1, slow_ms=1000, reset_seconds=0)
+        redis.breaker.failure()
+
+        async def bad_command():
+            raise ResponseError("WRONGTYPE")
+
+        with pytest.raises(ResponseError):
+            await redis._route(bad_command, lambda: None)
+        assert redis.breaker.state == CLOSED
+
+        redis.breaker.failure()
+
+        async def cancelled():
+            raise asyncio.CancelledError
+
+        with pytest.raises(asyncio.CancelledError):
+            await redis._route(cancelled, lambda: None)
+        assert redis.breaker.state == OPEN and redis.breaker.allow()
+
+    @pytest.mark.asyncio
+    async def test_scripts_have_local_equivalents(self):
+        """The rate limiter keeps enforcing limits per worker"""
+        redis = RedisClient(auto_pipeline=False, fallback=True)
+        limiter = RateLimiter(redis)
+        windows = [Window("m", 1, 60), Window("h", 3, 3600)]
+
+        assert (await limiter.hit(windows)).allowed
+        r = await limiter.hit(windows)
+        assert not r.allowed and r.denied == windows[0] and r.retry_after == 60
+
+    @pytest.mark.asyncio
+    async def test_script_without_local_equivalent_rejected(self):
+        """Unregistered scripts fail on every call, not just during an outage"""
+        redis = RedisClient(auto_pipeline=False, fallback=False)
+        with pytest.raises(UnregisteredScriptError):
+            await redis.eval_script("return 1", [], [])
+
+    @pytest.mark.asyncio
+    async def test_fallback_off_raises(self):
+        """Without fallback, outages surface as before"""
+        redis = RedisClient(auto_pipeline=False, fallback=False)
+        redis._client = DownClient()
+        with pytest.raises(RedisConnectionError):
+            await redis.get("k")
+
+    @pytest.mark.asyncio
+    async def test_durable_writes_replayed_after_outage(self, caplog):
+        """Security writes answered locally are logged, queued and delivered in order on recovery"""
+        redis = RedisClient(auto_pipeline=False, fallback=True)
+        redis._client = FlakyClient()
+        redis.breaker = CircuitBreaker("Redis", failures=5, slow_ms=1000, reset_seconds=0)
+
+        await redis.setex("user:epoch:1", 60, "1.5", durable=True)
+        await redis.delete("user:auth:1", durable=True)
+        assert await redis.publish("user:auth:invalidate", "1", durable=True) == 0
+        assert redis.pending_writes == 3
+        assert "publish not delivered" in caplog.text
+
+        redis.client.up = True
+        await redis.get("other")
+        assert redis.pending_writes == 0
+        assert [c[0] for c in redis.client.sent] == ["setex", "delete", "publish", "get"]
+
+    @pytest.mark.asyncio
+    async def test_durable_writes_queued_without_fallback(self):
+        """With fallback off the write still reaches Redis once it is back"""
+        redis = RedisClient(auto_pipeline=False, fallback=False)
+        redis._client = FlakyClient()
+
+        await redis.delete("admin:session:x", durable=True)
+        assert redis.pending_writes == 1
+
+        redis.client.up = True
+        await redis._route(redis._replay_pending, lambda: None)
+        assert redis.client.sent == [("delete", "admin:session:x")]
+
+    @pytest.mark.asyncio
+    async def test_remote_only_script_reports_outage(self):
+        """eval_remote never runs locally and says when Redis did not take the script"""
+        redis = RedisClient(auto_pipeline=False, fallback=True)
+        redis._client = DownClient()
+        redis._client.register_script = lambda source: redis._client.evalsha
+        assert await redis.eval_remote("return 1", ["k"], []) == (None, False)
+        assert redis.client.calls == 1
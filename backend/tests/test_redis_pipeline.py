@@ -0,0 +1,98 @@
+"""
+Redis Auto-Pipelining Tests
+"""
+import asyncio
+
+import pytest
+from redis.exceptions import DataError
+
+from app.core.redis import RedisClient
+
+
+class FakePipeline:
+    def __init__(self, owner):
+        self.owner = owner
+        self.commands = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            if "ex" in kwargs and "px" in kwargs:
+                raise DataError("``ex`` and ``px`` are mutually exclusive")
+            self.commands.append((name, args))
+            return self
+        return queue
+
+    async def execute(self, raise_on_error=True):
+        self.owner.batches.append(self.commands)
+        out = []
+        for name, args in self.commands:
+            if name == "get":
+                out.append(self.owner.data.get(args[0]))
+            elif name == "incr":
+                out.append(ValueError("not an integer") if args[0] == "bad" else 1)
+            else:
+                out.append(True)
+        return out
+
+
+class FakeClient:
+    def __init__(self):
+        self.data = {"a": "1", "b": "2"}
+        self.batches = []
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+def _client():
+    redis = RedisClient(auto_pipeline=True)
+    redis._client = FakeClient()
+    return redis
+
+
+class TestAutoPipeline:
+    """Tests for batching concurrent commands"""
+
+    @pytest.mark.asyncio
+    async def test_same_tick_commands_share_round_trip(self):
+        """Concurrent calls are sent as one pipeline and results fan back out"""
+        redis = _client()
+        a, b, missing = await asyncio.gather(redis.get("a"), redis.get("b"), redis.get("c"))
+
+        assert (a, b, missing) == ("1", "2", None)
+        assert redis.client.batches == [[("get", ("a",)), ("get", ("b",)), ("get", ("c",))]]
+
+    @pytest.mark.asyncio
+    async def test_error_only_fails_its_caller(self):
+        """A failing command raises for its own caller only"""
+        redis = _client()
+        ok, bad = await asyncio.gather(redis.get("a"), redis.incr("bad"), return_exceptions=True)
+
+        assert ok == "1"
+        assert isinstance(bad, ValueError)
+
+    @pytest.mark.asyncio
+    async def test_queuing_error_only_fails_its_caller(self):
+        """A command rejected before sending neither hangs nor fails the rest of the batch"""
+        redis = _client()
+        ok, bad = await asyncio.wait_for(
+            asyncio.gather(
+                redis.get("a"),
+                redis._remote("set", ("k", "v"), {"ex": 1, "px": 1}),
+                return_exceptions=True,
+            ),
+            timeout=1,
+        )
+
+        assert ok == "1"
+        assert isinstance(bad, DataError)
+        assert redis.client.batches == [[("get", ("a",))]]
+
+    @pytest.mark.asyncio
+    async def test_sequential_awaits_are_separate_batches(self):
+        """Awaited one after another, each command gets its own round trip"""
+        redis = _client()
+        await redis.get("a")
+        await redis.get("b")
+
+        assert len(redis.client.batches) == 2
@@ -0,0 +1,42 @@
+"""
+Pre-database Rejection Cache Tests
+"""
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.services.rejection_cache import RejectionCache
+
+
+def _redis():
+    redis = MagicMock()
+    redis.exists = AsyncMock(return_value=False)
+    redis.setex = AsyncMock()
+    redis.delete = AsyncMock()
+    return redis
+
+
+class TestRejectionCache:
+    """Tests for negative lookups"""
+
+    @pytest.mark.asyncio
+    async def test_local_copy_skips_redis(self):
+        """A rejection is answered locally after it is recorded"""
+        redis = _redis()
+        cache = RejectionCache(redis)
+        assert not await cache.is_rejected("admin", "ghost")
+
+        await cache.reject("admin", "ghost", 300)
+        redis.exists.reset_mock()
+        assert await cache.is_rejected("admin", "ghost")
+        redis.exists.assert_not_called()
+
+        await cache.clear("admin", "ghost")
+        assert not await cache.is_rejected("admin", "ghost")
+
+    @pytest.mark.asyncio
+    async def test_redis_failure_fails_open(self):
+        """Redis errors fall through to the database path"""
+        redis = _redis()
+        redis.exists.side_effect = ConnectionError("down")
+        assert not await RejectionCache(redis).is_rejected("otp", "+998901234567")
@@ -0,0 +1,117 @@
+"""
+Read Replica Routing Tests
+"""
+import asyncio
+from collections import Counter
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.core import database
+from app.core.replicas import Replica, ReplicaRouter, parse_replicas
+
+
+def _replica(name, weight=1, lag=0.0, fails=False, hangs=False):
+    conn = MagicMock()
+    if fails:
+        conn.execute = AsyncMock(side_effect=OSError("connection refused"))
+    else:
+        conn.execute = AsyncMock(return_value=MagicMock(scalar=MagicMock(return_value=lag)))
+    ctx = MagicMock()
+    ctx.__aenter__ = AsyncMock(return_value=conn)
+    ctx.__aexit__ = AsyncMock(return_value=False)
+    if hangs:
+        async def never_connects(*_):
+            await asyncio.sleep(60)
+        ctx.__aenter__ = never_connects
+    engine = MagicMock()
+    engine.connect = MagicMock(return_value=ctx)
+    return Replica(name=name, engine=engine, sessions=MagicMock(), weight=weight)
+
+
+class TestParse:
+    """Tests for DB_REPLICAS parsing"""
+
+    def test_hosts_ports_weights(self):
+        """Port and weight are optional"""
+        assert parse_replicas("r1:5433:3, r2:5432,r3, ") == [("r1", 5433, 3), ("r2", 5432, 1), ("r3", 5432, 1)]
+
+
+class TestReplicaRouter:
+    """Tests for health checks, lag fallback and weighting"""
+
+    @pytest.mark.asyncio
+    async def test_unchecked_replicas_get_no_reads(self):
+        """Replicas start out of rotation until a check passes"""
+        router = ReplicaRouter([_replica("r1")], max_lag=5)
+        assert router.pick() is None
+        await router.check_all()
+        assert router.pick().name == "r1"
+
+    @pytest.mark.asyncio
+    async def test_lagging_and_failed_replicas_excluded(self):
+        """Reads skip replicas over the lag threshold or failing the check"""
+        router = ReplicaRouter([_replica("slow", lag=30), _replica("down", fails=True), _replica("ok", lag=1)], max_lag=5)
+        await router.check_all()
+        assert {router.pick().name for _ in range(20)} == {"ok"}
+        stats = {r["name"]: r for r in router.stats()["replicas"]}
+        assert stats["slow"]["lag_seconds"] == 30 and not stats["slow"]["healthy"]
+        assert stats["down"]["lag_seconds"] is None
+
+    @pytest.mark.asyncio
+    async def test_stalled_stream_and_slow_connect_excluded(self):
+        """No replay timestamp without streaming, or a hanging connect, takes the replica out"""
+        router = ReplicaRouter([_replica("stalled", lag=None), _replica("hung", hangs=True)], max_lag=5, check_timeout=0.05)
+        await asyncio.wait_for(router.check_all(), 1)
+        assert router.pick() is None
+        assert all(r["lag_seconds"] is None for r in router.stats()["replicas"])
+
+    @pytest.mark.asyncio
+    async def test_all_lagging_falls_back_to_primary(self):
+        """With no replica in rotation, pick returns None and counts the fallback"""
+        router = ReplicaRouter([_replica("r1", lag=60)], max_lag=5)
+        await router.check_all()
+        assert router.pick() is None
+        assert router.stats()["primary_fallbacks"] == 1
+
+    @pytest.mark.asyncio
+    async def test_weighted_choice(self):
+        """Reads are spread in proportion to weight"""
+        router = ReplicaRouter([_replica("big", weight=3), _replica("small", weight=1), _replica("off", weight=0)], max_lag=5)
+        await router.check_all()
+        counts = Counter(router.pick().name for _ in range(4000))
+        assert "off" not in counts
+        assert 2.5 < counts["big"] / counts["small"] < 3.5
+
+
+class TestGetReadDB:
+    """Tests for the read-session dependency"""
+
+    @pytest.mark.asyncio
+    async def test_uses_replica_sessions(self, monkeypatch):
+        """A healthy replica's session maker serves the read session"""
+        replica = _replica("r1")
+        session = MagicMock(close=AsyncMock(), rollback=AsyncMock())
+        ctx = MagicMock(__aenter__=AsyncMock(return_value=session), __aexit__=AsyncMock(return_value=False))
+        replica.sessions = MagicMock(return_value=ctx)
+        router = ReplicaRouter([replica], max_lag=5)
+        await router.check_all()
+        monkeypatch.setattr(database, "replica_router", router)
+
+        gen = database.get_read_db()
+        assert await gen.__anext__() is session
+        await gen.aclose()
+        session.close.assert_awaited()
+
+    @pytest.mark.asyncio
+    async def test_primary_when_no_replicas(self, monkeypatch):
+        """Without replicas the primary session maker is used"""
+        monkeypatch.setattr(database, "replica_router", ReplicaRouter([], max_lag=5))
+        session = MagicMock(close=AsyncMock())
+        primary = MagicMock(return_value=MagicMock(
+            __aenter__=AsyncMock(return_value=session), __aexit__=AsyncMock(return_value=False)
+        ))
+        monkeypatch.setattr(database, "async_session_maker", primary)
+        gen = database.get_read_db()
+        assert await gen.__anext__() is session
+        await gen.aclose()
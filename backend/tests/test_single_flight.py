@@ -0,0 +1,168 @@
+"""
+Single-Flight Tests
+"""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+
+from app.core.redis import RedisClient
+from app.core.single_flight import SingleFlight
+from app.services.user_cache import UserAuthCache
+
+
+def _counting(result="v", delay=0.02):
+    calls = []
+
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        return result
+
+    return load, calls
+
+
+class TestSingleFlight:
+    """Tests for in-process coalescing"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_load(self):
+        """Ten concurrent callers of one key run the load once"""
+        sf = SingleFlight(MagicMock())
+        load, calls = _counting()
+        results = await asyncio.gather(*(sf.do("k", load) for _ in range(10)))
+        assert results == ["v"] * 10
+        assert len(calls) == 1
+        assert sf.stats() == {"in_flight": 0, "leaders": 1, "coalesced": 9}
+
+    @pytest.mark.asyncio
+    async def test_distinct_keys_and_later_calls_run_again(self):
+        """Coalescing is per key and only while a load is in flight"""
+        sf = SingleFlight(MagicMock())
+        load, calls = _counting()
+        await asyncio.gather(sf.do("a", load), sf.do("b", load))
+        await sf.do("a", load)
+        assert len(calls) == 3
+
+    @pytest.mark.asyncio
+    async def test_error_reaches_every_caller(self):
+        """A failing load raises in the leader and all followers"""
+        sf = SingleFlight(MagicMock())
+
+        async def boom():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("db down")
+
+        results = await asyncio.gather(*(sf.do("k", boom) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_leader_hands_over(self):
+        """If the leader is cancelled, a follower runs the load instead of failing"""
+        sf = SingleFlight(MagicMock())
+        load, calls = _counting(delay=0.05)
+        leader = asyncio.create_task(sf.do("k", load))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(sf.do("k", load))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        assert await follower == "v"
+        assert len(calls) == 2
+
+
+    @pytest.mark.asyncio
+    async def test_forget_starts_a_fresh_load(self):
+        """After forget, new callers do not join a load that predates a write"""
+        sf = SingleFlight(MagicMock())
+        load, calls = _counting(delay=0.05)
+        before = asyncio.create_task(sf.do("k", load))
+        await asyncio.sleep(0)
+        sf.forget("k")
+        after = asyncio.create_task(sf.do("k", load))
+        await asyncio.sleep(0)
+        joined = asyncio.create_task(sf.do("k", load))
+        assert await asyncio.gather(before, after, joined) == ["v"] * 3
+        assert len(calls) == 2
+        assert sf.stats()["in_flight"] == 0
+
+class TestSharedMode:
+    """Tests for the cross-worker Redis lock"""
+
+    @pytest.mark.asyncio
+    async def test_lock_holder_elsewhere_is_awaited(self):
+        """A worker that loses the lock waits for it to clear before loading"""
+        redis = RedisClient(auto_pipeline=False, fallback=True)
+        other, here = SingleFlight(redis, shared=True), SingleFlight(redis, shared=True)
+        order = []
+
+        async def slow():
+            await asyncio.sleep(0.05)
+            order.append("other")
+            return "v"
+
+        async def fast():
+            order.append("here")
+            return "v"
+
+        first = asyncio.create_task(other.do("k", slow))
+        await asyncio.sleep(0.01)
+        await asyncio.gather(first, here.do("k", fast))
+        assert order == ["other", "here"]
+        assert not await redis.exists("sf:k")
+
+    @pytest.mark.asyncio
+    async def test_worker_local_calls_skip_the_lock(self):
+        """shared=False never touches Redis"""
+        redis = MagicMock()
+        redis.set_nx = AsyncMock()
+        sf = SingleFlight(redis, shared=True)
+        load, _ = _counting()
+        await sf.do("k", load, shared=False)
+        redis.set_nx.assert_not_called()
+
+
+class TestUserCacheCoalescing:
+    """Concurrent auth guards for one user issue one lookup"""
+
+    @pytest.mark.asyncio
+    async def test_one_db_query_for_a_burst(self):
+        """A burst of requests for an uncached user reaches the database once"""
+        redis = RedisClient(auto_pipeline=False, fallback=True)
+        cache = UserAuthCache(redis)
+        uid = uuid4()
+        row = MagicMock(id=uid, phone_number="+998901234567", is_active=True)
+        db = MagicMock()
+
+        async def execute(stmt, params=None):
+            await asyncio.sleep(0.01)
+            return MagicMock(one_or_none=MagicMock(return_value=row))
+
+        db.execute = AsyncMock(side_effect=execute)
+        records = await asyncio.gather(*(cache.get(uid, db) for _ in range(5)))
+        assert {r.id for r in records} == {uid}
+        assert db.execute.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_invalidate_drops_load_in_flight(self):
+        """A read after invalidate does not join a DB load that started before it"""
+        redis = RedisClient(auto_pipeline=False, fallback=True)
+        cache = UserAuthCache(redis)
+        uid = uuid4()
+        rows = iter([True, False])
+        db = MagicMock()
+
+        async def execute(stmt, params=None):
+            active = next(rows)
+            await asyncio.sleep(0.02)
+            return MagicMock(one_or_none=MagicMock(return_value=MagicMock(
+                id=uid, phone_number="+998901234567", is_active=active,
+            )))
+
+        db.execute = AsyncMock(side_effect=execute)
+        stale = asyncio.create_task(cache.get(uid, db))
+        await asyncio.sleep(0.01)
+        await cache.invalidate(uid)  # e.g. the user was just deactivated
+        fresh = await cache.get(uid, db)
+        assert not fresh.is_active
+        assert (await stale).is_active
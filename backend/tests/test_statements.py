@@ -0,0 +1,34 @@
+"""
+Precompiled Statement Tests
+"""
+from sqlalchemy.dialects import postgresql
+
+from app.services import statements
+
+
+class TestStatements:
+    """Tests for the hot-path statement registry"""
+
+    def test_cache_key_memoized(self):
+        """A registry statement's cache key is computed once and reused"""
+        key = statements.ACTIVE_OTP._generate_cache_key()
+        assert statements.ACTIVE_OTP._generate_cache_key() is key
+
+    def test_named_parameters(self):
+        """Statements take their values as named bind parameters"""
+        cases = {
+            statements.USER_AUTH_BY_ID: {"uid"},
+            statements.USER_BY_PHONE: {"phone"},
+            statements.ACTIVE_OTP: {"phone"},
+            statements.RETIRE_OTPS: {"phone"},
+            statements.REFRESH_TOKEN_BY_HASH: {"token_hash"},
+            statements.ADMIN_BY_LOGIN: {"login"},
+            statements.ADMIN_SESSION_BY_TOKEN: {"token"},
+        }
+        for stmt, names in cases.items():
+            compiled = stmt.compile(dialect=postgresql.dialect())
+            assert names <= set(compiled.params), stmt
+
+    def test_retire_otps_syncs_session(self):
+        """The bulk update refreshes loaded rows instead of evaluating unbound parameters"""
+        assert statements.RETIRE_OTPS.get_execution_options()["synchronize_session"] == "fetch"
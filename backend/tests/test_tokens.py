@@ -0,0 +1,112 @@
+"""
+Access Token Verification Tests
+"""
+import json
+import time
+from datetime import timedelta
+
+from app.core.config import settings
+from app.core.jwks import KeyRing, SigningKey, _b64encode, generate_key
+from app.core.security import (
+    _jwt_decode,
+    access_token_cache,
+    create_access_token,
+    create_refresh_token,
+    decode_access_token,
+)
+from app.core.token_cache import HS256Verifier, VerifiedTokenCache
+
+
+class TestHS256Verifier:
+    """Tests for the precompiled HS256 verifier"""
+
+    def test_matches_jose(self):
+        """Fast path returns the same claims as python-jose"""
+        token = create_access_token({"sub": "abc", "phone": "+998901234567"})
+        fast = HS256Verifier(settings.JWT_ACCESS_SECRET).verify(token)
+        assert fast == _jwt_decode(token, settings.JWT_ACCESS_SECRET, "access")
+
+    def test_rejects_tampered_and_expired(self):
+        """Bad signatures, wrong keys and expired tokens are rejected"""
+        verifier = HS256Verifier(settings.JWT_ACCESS_SECRET)
+        token = create_access_token({"sub": "abc"})
+        head, body, sig = token.split(".")
+        assert verifier.verify(f"{head}.{body}.{sig[:-2]}AA") is None
+        assert HS256Verifier("x" * 32).verify(token) is None
+        assert verifier.verify("not-a-token") is None
+        expired = create_access_token({"sub": "abc"}, timedelta(seconds=-1))
+        assert verifier.verify(expired) is None
+
+
+class TestVerifiedTokenCache:
+    """Tests for the verified-token LRU"""
+
+    def test_decode_rejects_refresh_token(self):
+        """Refresh tokens never pass as access tokens"""
+        assert decode_access_token(create_refresh_token({"sub": "abc"})) is None
+
+    def test_cache_hit_and_expiry(self):
+        """Cached claims are served until exp, then evicted"""
+        access_token_cache.clear()
+        token = create_access_token({"sub": "abc"})
+        assert decode_access_token(token)["sub"] == "abc"
+        assert access_token_cache.get(token) is not None
+        assert access_token_cache.get(token, now=time.time() + 3600) is None
+        assert len(access_token_cache) == 0
+
+    def test_cached_claims_are_copies(self):
+        """Mutating returned claims does not change the cached entry"""
+        cache = VerifiedTokenCache(maxsize=10)
+        payload = {"sub": "abc", "exp": time.time() + 60}
+        cache.put("t", payload)
+        payload["sub"] = "put-side"
+        cache.get("t")["sub"] = "get-side"
+        assert cache.get("t")["sub"] == "abc"
+
+    def test_lru_bound(self):
+        """Oldest entries are evicted past maxsize"""
+        cache = VerifiedTokenCache(maxsize=2)
+        exp = time.time() + 60
+        for t in ("a", "b", "c"):
+            cache.put(t, {"exp": exp})
+        assert len(cache) == 2
+        assert cache.get("a") is None and cache.get("c") is not None
+
+
+class TestKeyRing:
+    """Tests for asymmetric access-token signing"""
+
+    def _ring(self, alg, *kids):
+        return KeyRing(alg, [SigningKey(k, alg, generate_key(alg)) for k in kids])
+
+    def test_roundtrip_both_algorithms(self):
+        """EdDSA and ES256 tokens verify with their own ring only"""
+        exp = int(time.time()) + 60
+        for alg in ("EdDSA", "ES256"):
+            ring = self._ring(alg, "k1")
+            token = ring.encode({"sub": "abc", "exp": exp, "type": "access"})
+            assert ring.decode(token)["sub"] == "abc"
+            assert self._ring(alg, "k1").decode(token) is None
+
+    def test_rotation_keeps_old_kid_valid(self):
+        """Tokens from a retired key verify while it stays in the ring"""
+        old = SigningKey("old", "EdDSA", generate_key("EdDSA"))
+        new = SigningKey("new", "EdDSA", generate_key("EdDSA"))
+        token = KeyRing("EdDSA", [old]).encode({"sub": "abc", "exp": int(time.time()) + 60})
+        rotated = KeyRing("EdDSA", [new, old])
+        assert rotated.decode(token)["sub"] == "abc"
+        assert [k["kid"] for k in json.loads(rotated.jwks_bytes())["keys"]] == ["new", "old"]
+
+    def test_rejects_expired_and_alg_mismatch(self):
+        """Expired tokens and HS256 tokens are rejected"""
+        ring = self._ring("ES256", "k1")
+        assert ring.decode(ring.encode({"exp": int(time.time()) - 1})) is None
+        assert ring.decode(create_access_token({"sub": "abc"})) is None
+
+    def test_rejects_malformed_kid(self):
+        """A non-string kid is rejected, not raised"""
+        ring = self._ring("EdDSA", "k1")
+        _, body, sig = ring.encode({"exp": int(time.time()) + 60}).split(".")
+        for kid in (["k1"], {"a": 1}, 1, None):
+            header = _b64encode(json.dumps({"alg": "EdDSA", "kid": kid}).encode())
+            assert ring.decode(f"{header}.{body}.{sig}") is None
@@ -0,0 +1,157 @@
+"""
+User Auth Cache Tests
+"""
+import time
+import uuid
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.core.cache import TTLCache
+from app.core.redis import RedisClient
+from app.services.user_cache import UserAuthCache, UserAuthRecord
+
+
+class TestTTLCache:
+    """Tests for the in-process TTL LRU"""
+
+    def test_expiry_and_bound(self):
+        """Entries expire after ttl and the oldest are evicted"""
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2, ttl=-1)
+        assert cache.get("b") is None
+        cache.set("c", 3)
+        cache.set("d", 4)
+        assert cache.get("a") is None and cache.get("d") == 4
+
+
+class TestUserAuthCache:
+    """Tests for the two-level user record cache"""
+
+    def _redis(self):
+        redis = MagicMock()
+        redis.get = AsyncMock(return_value=None)
+        redis.fetch = AsyncMock(return_value=(None, True))
+        redis.setex = AsyncMock()
+        redis.delete = AsyncMock()
+        redis.eval_script = AsyncMock()
+        redis.publish = AsyncMock()
+        return redis
+
+    @pytest.mark.asyncio
+    async def test_redis_hit_skips_db(self):
+        """A Redis hit fills the local cache without touching the DB"""
+        uid = uuid.uuid4()
+        redis = self._redis()
+        redis.get.return_value = UserAuthRecord(uid, "+998901234567", True).to_json()
+        cache = UserAuthCache(redis)
+        db = MagicMock()
+        db.execute = AsyncMock()
+
+        record = await cache.get(uid, db)
+        assert record.is_active and record.id == uid
+        await cache.get(uid, db)
+        db.execute.assert_not_called()
+        redis.get.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_invalidate_publishes(self):
+        """Invalidation clears both levels and notifies other workers"""
+        uid = uuid.uuid4()
+        redis = self._redis()
+        cache = UserAuthCache(redis)
+        cache.local.set(uid, UserAuthRecord(uid, "+998901234567", True))
+
+        await cache.invalidate(uid)
+        assert cache.local.get(uid) is None
+        key, _, tombstone = redis.setex.await_args.args
+        assert key == f"user:auth:{uid}" and tombstone.startswith("~")
+        redis.publish.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_epoch_revokes_older_tokens(self):
+        """Tokens issued before a bump are revoked, later ones are not"""
+        uid = uuid.uuid4()
+        redis = self._redis()
+        cache = UserAuthCache(redis)
+        now = int(time.time())
+        assert not await cache.is_revoked(uid, now)
+
+        await cache.bump_epoch(uid)
+        assert redis.setex.await_args_list[0].args[0] == f"user:epoch:{uid}"
+        assert await cache.is_revoked(uid, now)
+        assert not await cache.is_revoked(uid, now + 5)
+        assert await cache.is_revoked(uid, None)
+
+    @pytest.mark.asyncio
+    async def test_local_epoch_not_cached(self):
+        """An epoch answered by the local store is asked for again next time"""
+        uid = uuid.uuid4()
+        redis = self._redis()
+        redis.fetch.return_value = (None, False)
+        cache = UserAuthCache(redis)
+
+        assert await cache.epoch(uid) == 0
+        assert cache.epochs.get(uid) is None
+        redis.fetch.return_value = ("1.5", True)
+        assert await cache.epoch(uid) == 1.5
+        assert cache.epochs.get(uid) == 1.5
+
+    @pytest.mark.asyncio
+    async def test_token_issued_after_bump_in_same_second_valid(self):
+        """A re-login right after a revocation is not caught by it"""
+        uid = uuid.uuid4()
+        cache = UserAuthCache(self._redis())
+        before = time.time()
+        await cache.bump_epoch(uid)
+        after = time.time()
+        assert await cache.is_revoked(uid, before)
+        assert await cache.is_revoked(uid, int(before))
+        assert not await cache.is_revoked(uid, after)
+
+    @pytest.mark.asyncio
+    async def test_fill_loses_to_invalidation_during_db_read(self):
+        """A record read before an invalidation is not written back over it"""
+        uid = uuid.uuid4()
+        redis = RedisClient(auto_pipeline=False, fallback=True)
+        cache = UserAuthCache(redis)
+        other_worker = UserAuthCache(redis)
+
+        async def slow_read(*args, **kwargs):
+            # Another worker deactivates the user while this one reads the old row.
+            await other_worker.invalidate(uid)
+            result = MagicMock()
+            result.one_or_none.return_value = MagicMock(id=uid, phone_number="+998901234567", is_active=True)
+            return result
+
+        db = MagicMock()
+        db.execute = slow_read
+        record = await cache.get(uid, db)
+        assert record.is_active
+        assert redis.memory.get(f"user:auth:{uid}").startswith("~")
+
+        db.execute = AsyncMock(return_value=MagicMock(
+            one_or_none=MagicMock(return_value=MagicMock(id=uid, phone_number="+998901234567", is_active=False))
+        ))
+        cache.local.pop(uid)
+        assert not (await cache.get(uid, db)).is_active
+        assert not UserAuthRecord.from_json(redis.memory.get(f"user:auth:{uid}")).is_active
+
+    @pytest.mark.asyncio
+    async def test_local_fill_skipped_after_invalidation(self):
+        """An invalidation seen by this worker mid-load keeps the old record out of memory"""
+        uid = uuid.uuid4()
+        cache = UserAuthCache(self._redis())
+
+        async def slow_read(*args, **kwargs):
+            await cache.invalidate(uid)
+            result = MagicMock()
+            result.one_or_none.return_value = MagicMock(id=uid, phone_number="+998901234567", is_active=True)
+            return result
+
+        db = MagicMock()
+        db.execute = slow_read
+        await cache.get(uid, db)
+        assert cache.local.get(uid) is None
+        cache.redis.eval_script.assert_not_called()